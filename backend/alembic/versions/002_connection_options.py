@@ -0,0 +1,28 @@
+"""Add per-connection options
+
+Revision ID: 002_connection_options
+Revises: 001_initial
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "002_connection_options"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add options column to database connections."""
+    op.add_column("database_connections", sa.Column("options_json", sa.Text))
+
+
+def downgrade() -> None:
+    """Drop options column from database connections."""
+    with op.batch_alter_table("database_connections") as batch_op:
+        batch_op.drop_column("options_json")
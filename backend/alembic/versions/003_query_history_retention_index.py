@@ -0,0 +1,30 @@
+"""Add composite index for query history retention
+
+Revision ID: 003_history_index
+Revises: 002_connection_options
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_history_index"
+down_revision: Union[str, None] = "002_connection_options"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index query history by database and execution time."""
+    op.create_index(
+        "ix_query_history_database_name_executed_at",
+        "query_history",
+        ["database_name", "executed_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the query history composite index."""
+    op.drop_index("ix_query_history_database_name_executed_at", table_name="query_history")
@@ -0,0 +1,28 @@
+"""Add read replicas to database connections
+
+Revision ID: 004_connection_replicas
+Revises: 003_history_index
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "004_connection_replicas"
+down_revision: Union[str, None] = "003_history_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add replicas column to database connections."""
+    op.add_column("database_connections", sa.Column("replicas_json", sa.Text))
+
+
+def downgrade() -> None:
+    """Drop replicas column from database connections."""
+    with op.batch_alter_table("database_connections") as batch_op:
+        batch_op.drop_column("replicas_json")
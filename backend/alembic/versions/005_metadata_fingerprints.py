@@ -0,0 +1,30 @@
+"""Add schema version and relation fingerprints to database metadata
+
+Revision ID: 005_metadata_fingerprints
+Revises: 004_connection_replicas
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "005_metadata_fingerprints"
+down_revision: Union[str, None] = "004_connection_replicas"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add schema version and fingerprint columns to database metadata."""
+    op.add_column("database_metadata", sa.Column("schema_version", sa.String(128)))
+    op.add_column("database_metadata", sa.Column("fingerprints_json", sa.Text))
+
+
+def downgrade() -> None:
+    """Drop schema version and fingerprint columns from database metadata."""
+    with op.batch_alter_table("database_metadata") as batch_op:
+        batch_op.drop_column("fingerprints_json")
+        batch_op.drop_column("schema_version")
@@ -9,6 +9,7 @@ from app.models.database import DatabaseConnection, DatabaseType, ConnectionStat
 from app.models.schemas import (
     DatabaseConnectionInput,
     DatabaseConnectionResponse,
+    ReplicaEndpoint,
     DatabaseMetadataResponse,
     ErrorResponse,
     ErrorDetail,
@@ -16,14 +17,17 @@ from app.models.schemas import (
 from app.services.db_connection import (
     parse_database_url,
     test_connection,
-    create_engine_for_database,
     ConnectionError,
 )
+from app.services.engine_registry import engine_registry
+from app.services.replica_router import replica_router
+from app.services.result_cache import result_cache
 from app.services.metadata import (
-    extract_metadata,
+    delete_cached_metadata,
     get_cached_metadata,
-    save_metadata,
+    refresh_metadata_cache,
 )
+from app.services.query_plan import invalidate_table_rows
 import json
 from datetime import datetime
 
@@ -106,16 +110,40 @@ async def create_or_update_database(
             },
         )
     
+    # Parse and test read replicas
+    replicas_json = None
+    if input_data.replicas:
+        replicas_json = json.dumps(
+            await _check_replicas(input_data.replicas, database_type)
+        )
+    
     # Check if connection exists
     stmt = select(DatabaseConnection).where(DatabaseConnection.name == name)
     result = await session.execute(stmt)
     existing = result.scalar_one_or_none()
     
     if existing:
+        # Drop pooled connections and cached results of the previous target
+        replicas_changed = (
+            input_data.replicas is not None and existing.replicas_json != replicas_json
+        )
+        if existing.url != normalized_url or replicas_changed:
+            await engine_registry.invalidate(name)
+            replica_router.invalidate(name)
+        if existing.url != normalized_url:
+            await result_cache.invalidate(name)
+            # Metadata, schema version and fingerprints were read from the previous target
+            await delete_cached_metadata(session, name)
+            invalidate_table_rows(name)
+        
         # Update existing
         existing.url = normalized_url
         existing.database_type = database_type
         existing.description = input_data.description
+        if input_data.options is not None:
+            existing.options_json = input_data.options.model_dump_json(exclude_unset=True)
+        if input_data.replicas is not None:
+            existing.replicas_json = replicas_json
         existing.updated_at = datetime.utcnow()
         existing.last_connected_at = datetime.utcnow()
         existing.status = ConnectionStatus.ACTIVE
@@ -131,6 +159,11 @@ async def create_or_update_database(
             description=input_data.description,
             last_connected_at=datetime.utcnow(),
             status=ConnectionStatus.ACTIVE,
+            options_json=(
+                input_data.options.model_dump_json(exclude_unset=True)
+                if input_data.options is not None else None
+            ),
+            replicas_json=replicas_json,
         )
         session.add(new_connection)
         await session.commit()
@@ -177,19 +210,15 @@ async def get_database_metadata(
     
     # Fetch fresh metadata
     try:
-        engine = create_engine_for_database(connection.url, connection.database_type)
-        metadata_dict = await extract_metadata(engine, connection.database_type)
-        await engine.dispose()
-        
-        # Save to cache
-        saved_metadata = await save_metadata(session, name, metadata_dict)
+        # Extract and save to cache (shared with concurrent refreshes)
+        metadata_dict, fetched_at = await refresh_metadata_cache(connection)
         
         return DatabaseMetadataResponse(
             database_name=name,
             database_type=connection.database_type,
             tables=metadata_dict.get("tables", []),
             views=metadata_dict.get("views", []),
-            fetched_at=saved_metadata.fetched_at,
+            fetched_at=fetched_at,
             is_stale=False,
         )
     except Exception as e:
@@ -227,16 +256,16 @@ async def delete_database(
         )
     
     # Delete metadata
-    from app.models.metadata import DatabaseMetadata
-    metadata_stmt = select(DatabaseMetadata).where(DatabaseMetadata.database_name == name)
-    metadata_result = await session.execute(metadata_stmt)
-    metadata = metadata_result.scalar_one_or_none()
-    if metadata:
-        await session.delete(metadata)
+    await delete_cached_metadata(session, name)
     
     # Delete connection
     await session.delete(connection)
     await session.commit()
+    
+    # Drop pooled connections and cached results of the deleted target
+    await engine_registry.invalidate(name)
+    replica_router.invalidate(name)
+    await result_cache.invalidate(name)
 
 
 @router.post("/dbs/{name}/refresh", response_model=DatabaseMetadataResponse)
@@ -263,19 +292,15 @@ async def refresh_metadata(
     
     # Fetch fresh metadata
     try:
-        engine = create_engine_for_database(connection.url, connection.database_type)
-        metadata_dict = await extract_metadata(engine, connection.database_type)
-        await engine.dispose()
-        
-        # Save to cache
-        saved_metadata = await save_metadata(session, name, metadata_dict)
+        # Extract and save to cache (shared with concurrent refreshes)
+        metadata_dict, fetched_at = await refresh_metadata_cache(connection)
         
         return DatabaseMetadataResponse(
             database_name=name,
             database_type=connection.database_type,
             tables=metadata_dict.get("tables", []),
             views=metadata_dict.get("views", []),
-            fetched_at=saved_metadata.fetched_at,
+            fetched_at=fetched_at,
             is_stale=False,
         )
     except Exception as e:
@@ -290,3 +315,69 @@ async def refresh_metadata(
             },
         )
 
+
+async def _check_replicas(
+    replicas: list[ReplicaEndpoint],
+    database_type: DatabaseType,
+) -> list[dict[str, Any]]:
+    """Parse and test the read replicas of a connection.
+
+    Args:
+        replicas: Replica URLs and weights
+        database_type: Database type of the primary
+
+    Returns:
+        Replicas with normalized URLs
+
+    Raises:
+        HTTPException: If a replica URL is invalid, duplicated or of another
+            database type, or a replica cannot be reached
+    """
+    checked = []
+    for replica in replicas:
+        try:
+            replica_type, replica_url = parse_database_url(replica.url)
+        except ConnectionError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": f"Invalid replica URL: {e.message}",
+                        "details": e.details,
+                    }
+                },
+            )
+        
+        if replica_type != database_type or any(r["url"] == replica_url for r in checked):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": "Replicas must be distinct databases of the primary's type",
+                        "details": {
+                            "databaseType": database_type.value,
+                            "replicaType": replica_type.value,
+                        },
+                    }
+                },
+            )
+        
+        try:
+            await test_connection(replica_url, replica_type)
+        except ConnectionError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={
+                    "error": {
+                        "code": "CONNECTION_ERROR",
+                        "message": f"Replica: {e.message}",
+                        "details": e.details,
+                    }
+                },
+            )
+        
+        checked.append({"url": replica_url, "weight": replica.weight})
+    
+    return checked
@@ -1,45 +1,253 @@
 """Query execution API endpoints."""
 
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+import json
+from collections.abc import Awaitable
+from typing import Any
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from pydantic import BaseModel
 
-from app.models.schemas import QueryInput, QueryResult, QueryHistoryEntry, ErrorResponse
+from app.models.schemas import (
+    QueryInput,
+    QueryResult,
+    ColumnarQueryResult,
+    QueryHistoryEntry,
+    RunningQueryEntry,
+    QueryPlanInput,
+    QueryPlanResult,
+    QueryJobInput,
+    QueryJobStatus,
+    QueryJobResultPage,
+    ErrorResponse,
+)
 from app.models.database import DatabaseConnection
 from app.models.query import QuerySource
 from app.services.query import (
     execute_query,
+    execute_query_page,
+    encode_rows,
+    stream_query,
     get_query_history,
-    QueryExecutionError
+    QueryExecutionError,
+    QueryTimeoutError
+)
+from app.services.sql_validator import (
+    DEFAULT_ROW_LIMIT,
+    SQLValidationError,
+    validate_and_transform_sql,
 )
-from app.services.sql_validator import SQLValidationError
+from app.services.query_plan import (
+    explain_query,
+    evaluate_guardrails,
+    get_table_rows,
+    QueryRejectedError,
+)
+from app.services.replica_router import replica_router
+from app.services.db_connection import get_connection_options
 from app.services.nl2sql import generate_sql_from_natural_language, NL2SQLError
-from app.services.metadata import get_database_metadata
+from app.services.metadata import get_database_metadata, get_cached_metadata, get_keyset_columns
+from app.services.pagination import PaginationError, spill_store
+from app.services.spool import ResultSpool
+from app.services.result_cache import CacheMissError
+from app.services.query_registry import query_registry, QueryCancelledError
+from app.services.admission import AdmissionError
 from app.services.export import export_service, ExportFormat
+from app.services.query_jobs import query_job_manager, QueryJobError
+from app.services.response_encoding import encode_result
+from app.services.cpu_offload import cpu_offloader
 from app.database import get_session
+from app.config import settings
 
 router = APIRouter()
 
+# How often a running query checks whether its HTTP client is still connected
+DISCONNECT_POLL_INTERVAL_SECONDS = 0.5
+
+
+async def _get_connection_or_404(session: AsyncSession, name: str) -> DatabaseConnection:
+    """Get database connection by name or raise 404."""
+    statement = select(DatabaseConnection).where(DatabaseConnection.name == name)
+    result = await session.execute(statement)
+    db_connection = result.scalar_one_or_none()
+
+    if not db_connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": {
+                    "code": "DATABASE_NOT_FOUND",
+                    "message": f"Database '{name}' not found",
+                    "details": {"databaseName": name}
+                }
+            }
+        )
+
+    return db_connection
+
+
+def _admission_http_error(e: AdmissionError) -> HTTPException:
+    """Map an admission error to 429 (queue full) or 503 (queue wait timed out)."""
+    queue_full = e.details.get("reason") == "queue_full"
+    return HTTPException(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS if queue_full
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        detail={
+            "error": {
+                "code": "QUERY_QUEUE_FULL" if queue_full else "QUERY_QUEUE_TIMEOUT",
+                "message": e.message,
+                "details": e.details
+            }
+        },
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _rejected_http_error(e: QueryRejectedError) -> HTTPException:
+    """Map a guardrail rejection to 422."""
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={
+            "error": {
+                "code": "QUERY_REJECTED",
+                "message": e.message,
+                "details": e.details
+            }
+        },
+    )
+
+
+def _job_http_error(e: QueryJobError) -> HTTPException:
+    """Map a job error to 404 (unknown or expired), 429 (queue full) or 409 (no result yet)."""
+    reason = e.details.get("reason")
+    if reason == "not_found":
+        status_code, code = status.HTTP_404_NOT_FOUND, "JOB_NOT_FOUND"
+    elif reason == "queue_full":
+        status_code, code = status.HTTP_429_TOO_MANY_REQUESTS, "JOB_QUEUE_FULL"
+    elif reason == "not_finished":
+        status_code, code = status.HTTP_409_CONFLICT, "JOB_NOT_FINISHED"
+    else:
+        status_code, code = status.HTTP_409_CONFLICT, "JOB_HAS_NO_RESULT"
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": {
+                "code": code,
+                "message": e.message,
+                "details": e.details
+            }
+        },
+    )
+
+
+def _export_spool_response(
+    spool: ResultSpool,
+    columns: list[dict[str, Any]],
+    format: ExportFormat,
+) -> StreamingResponse:
+    """Stream a spooled result as a CSV or JSON file download."""
+    from datetime import datetime
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"query_result_{timestamp}.{format.value}"
+
+    # Starlette iterates the synchronous generator in a worker thread; batches
+    # are read large enough for the CPU offloader to encode them in worker processes
+    batch_rows = max(
+        settings.job_spool_batch_rows, settings.offload_min_cells // max(len(columns), 1)
+    )
+    content = export_service.export_stream(
+        columns, spool.iter_batches(batch_rows), format, spool.row_count
+    )
+    return StreamingResponse(
+        content,
+        media_type="text/csv" if format == ExportFormat.CSV else "application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _check_query_id_free(name: str, query_id: str | None) -> None:
+    """Raise 409 if a client-supplied query id belongs to a running query."""
+    if query_id is not None and query_registry.get(name, query_id) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": {
+                    "code": "QUERY_ID_IN_USE",
+                    "message": f"Query '{query_id}' is already running",
+                    "details": {"queryId": query_id}
+                }
+            }
+        )
+
+
+async def _run_until_disconnect(
+    request: Request, work: Awaitable[dict[str, Any]]
+) -> dict[str, Any]:
+    """Run a query, cancelling it if the HTTP client disconnects first.
+
+    Raises:
+        QueryCancelledError: If the client disconnected
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise QueryCancelledError("Client disconnected", {"reason": "disconnected"})
+    finally:
+        if not task.done():
+            # Cancelling the task makes the query registry stop the statement
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
 
 @router.post(
     "/dbs/{name}/query",
-    response_model=QueryResult,
+    response_model=QueryResult | ColumnarQueryResult,
     responses={
-        400: {"model": ErrorResponse, "description": "SQL validation error"},
+        202: {"model": QueryJobStatus, "description": "Query submitted as a job"},
+        400: {"model": ErrorResponse, "description": "Invalid SQL or continuation token"},
         404: {"model": ErrorResponse, "description": "Database not found"},
-        500: {"model": ErrorResponse, "description": "Query execution error"}
+        409: {"model": ErrorResponse, "description": "Query cancelled or query id in use"},
+        410: {"model": ErrorResponse, "description": "Continuation token expired"},
+        422: {"model": ErrorResponse, "description": "Query rejected by cost guardrails"},
+        429: {"model": ErrorResponse, "description": "Query queue full or too many cursors"},
+        500: {"model": ErrorResponse, "description": "Query execution error"},
+        503: {"model": ErrorResponse, "description": "Timed out waiting in the query queue"},
+        504: {"model": ErrorResponse, "description": "Statement timeout or no cached result"}
     },
     summary="Execute SQL query",
     description="Execute a SELECT query against the specified database. "
-                "Query will be validated and LIMIT 1000 will be added if missing."
+                "Query will be validated and LIMIT 1000 will be added if missing. "
+                "pageSize or continuationToken pages the full result instead. "
+                "cache selects how cached results are used; format=columnar returns "
+                "one array per column. "
+                "params holds the values of :name placeholders. "
+                "A running query can be cancelled by its queryId. "
+                "Results over the memory budget are spilled to disk and paged. "
+                "With explainPolicy=job, queries over the guardrails run as jobs (202)."
 )
-async def execute_sql_query(name: str, query_input: QueryInput, session: AsyncSession = Depends(get_session)):
+async def execute_sql_query(
+    name: str,
+    query_input: QueryInput,
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
     """Execute SQL query against target database.
 
     Args:
         name: Database connection name
         query_input: Query input with SQL text
+        request: HTTP request, watched for client disconnects
         session: Database session
 
     Returns:
@@ -48,32 +256,205 @@ async def execute_sql_query(name: str, query_input: QueryInput, session: AsyncSe
     Raises:
         HTTPException: If database not found or query execution fails
     """
-    # Get database connection
-    statement = select(DatabaseConnection).where(DatabaseConnection.name == name)
-    result = await session.execute(statement)
-    db_connection = result.scalar_one_or_none()
+    db_connection = await _get_connection_or_404(session, name)
 
-    if not db_connection:
+    _check_query_id_free(name, query_input.query_id)
+
+    # Execute query
+    try:
+        if query_input.page_size is not None or query_input.continuation_token is not None:
+            cached = await get_cached_metadata(session, name)
+            work = execute_query_page(
+                db_connection=db_connection,
+                sql=query_input.sql,
+                page_size=query_input.page_size or settings.pagination_default_page_size,
+                continuation_token=query_input.continuation_token,
+                primary_keys=(
+                    get_keyset_columns(json.loads(cached.metadata_json)) if cached else None
+                ),
+                query_source=QuerySource.MANUAL,
+                timeout=query_input.timeout_seconds,
+                result_format=query_input.format,
+                query_id=query_input.query_id,
+                params=query_input.params
+            )
+        else:
+            work = execute_query(
+                db_connection=db_connection,
+                sql=query_input.sql,
+                query_source=QuerySource.MANUAL,
+                cache_mode=query_input.cache,
+                timeout=query_input.timeout_seconds,
+                result_format=query_input.format,
+                query_id=query_input.query_id,
+                params=query_input.params
+            )
+
+        result = await _run_until_disconnect(request, work)
+
+        schema = ColumnarQueryResult if query_input.format == "columnar" else QueryResult
+        return Response(content=await encode_result(schema, result), media_type="application/json")
+
+    except AdmissionError as e:
+        raise _admission_http_error(e)
+
+    except QueryRejectedError as e:
+        paged = query_input.page_size is not None or query_input.continuation_token is not None
+        if e.details.get("policy") != "job" or paged:
+            raise _rejected_http_error(e)
+
+        # The job returns the rows the query would have returned here
+        try:
+            job = query_job_manager.submit(
+                db_connection, query_input.sql, params=query_input.params, limit=DEFAULT_ROW_LIMIT
+            )
+        except QueryJobError as job_error:
+            raise _job_http_error(job_error)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=QueryJobStatus(**job.to_dict()).model_dump(mode="json", by_alias=True),
+        )
+
+    except QueryCancelledError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=status.HTTP_409_CONFLICT,
             detail={
                 "error": {
-                    "code": "DATABASE_NOT_FOUND",
-                    "message": f"Database '{name}' not found",
-                    "details": {"databaseName": name}
+                    "code": "QUERY_CANCELLED",
+                    "message": e.message,
+                    "details": e.details
                 }
             }
         )
 
-    # Execute query
+    except QueryTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "error": {
+                    "code": "QUERY_TIMEOUT",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    except CacheMissError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "error": {
+                    "code": "CACHE_MISS",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    except PaginationError as e:
+        if e.details.get("reason") == "too_many_cursors":
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": {
+                        "code": "TOO_MANY_CURSORS",
+                        "message": e.message,
+                        "details": e.details
+                    }
+                },
+                headers={"Retry-After": "1"},
+            )
+        expired = e.details.get("reason") in ("expired", "consumed")
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE if expired else status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "CONTINUATION_EXPIRED" if expired else "INVALID_CONTINUATION_TOKEN",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    except SQLValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    except QueryExecutionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": {
+                    "code": "EXECUTION_ERROR",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+
+@router.post(
+    "/dbs/{name}/query/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "NDJSON result frames"},
+        400: {"model": ErrorResponse, "description": "SQL validation error"},
+        404: {"model": ErrorResponse, "description": "Database not found"},
+        409: {"model": ErrorResponse, "description": "Query id already in use"},
+        422: {"model": ErrorResponse, "description": "Query rejected by cost guardrails"},
+        429: {"model": ErrorResponse, "description": "Query queue for the database is full"},
+        500: {"model": ErrorResponse, "description": "Query execution error"},
+        503: {"model": ErrorResponse, "description": "Timed out waiting in the query queue"}
+    },
+    summary="Stream SQL query results",
+    description="Execute a SELECT query and stream the result as NDJSON: a header frame with "
+                "column definitions, then batches of rows, then an end frame with the row count. "
+                "Rows are read from a server-side cursor as the client consumes them."
+)
+async def stream_sql_query(
+    name: str,
+    query_input: QueryInput,
+    session: AsyncSession = Depends(get_session)
+):
+    """Stream SQL query results from target database.
+
+    Args:
+        name: Database connection name
+        query_input: Query input with SQL text
+        session: Database session
+
+    Returns:
+        Streaming NDJSON response
+
+    Raises:
+        HTTPException: If database not found, SQL is invalid or the engine cannot be created
+    """
+    db_connection = await _get_connection_or_404(session, name)
+    _check_query_id_free(name, query_input.query_id)
+
     try:
-        result = await execute_query(
+        frames = await stream_query(
             db_connection=db_connection,
             sql=query_input.sql,
-            query_source=QuerySource.MANUAL
+            query_source=QuerySource.MANUAL,
+            timeout=query_input.timeout_seconds,
+            query_id=query_input.query_id,
+            params=query_input.params
         )
 
-        return QueryResult(**result)
+    except AdmissionError as e:
+        raise _admission_http_error(e)
+
+    except QueryRejectedError as e:
+        raise _rejected_http_error(e)
 
     except SQLValidationError as e:
         raise HTTPException(
@@ -99,6 +480,487 @@ async def execute_sql_query(name: str, query_input: QueryInput, session: AsyncSe
             }
         )
 
+    return StreamingResponse(frames, media_type="application/x-ndjson")
+
+
+@router.post(
+    "/dbs/{name}/query/explain",
+    response_model=QueryPlanResult,
+    responses={
+        400: {"model": ErrorResponse, "description": "SQL validation error"},
+        404: {"model": ErrorResponse, "description": "Database not found"},
+        500: {"model": ErrorResponse, "description": "EXPLAIN failed"}
+    },
+    summary="Explain SQL query",
+    description="Validate a SELECT query and return its estimated plan without running it: "
+                "estimated rows and cost (PostgreSQL, MySQL), full table scans with row counts "
+                "from cached metadata, and the warnings the connection's cost guardrails "
+                "(explainPolicy, explainMaxCost, explainMaxRows, largeTableRows) would raise."
+)
+async def explain_sql_query(
+    name: str,
+    plan_input: QueryPlanInput,
+    session: AsyncSession = Depends(get_session)
+):
+    """Get the estimated plan of a query.
+
+    Args:
+        name: Database connection name
+        plan_input: Query plan input with SQL text
+        session: Database session
+
+    Returns:
+        Estimated plan and guardrail warnings
+
+    Raises:
+        HTTPException: If database not found, SQL is invalid or EXPLAIN fails
+    """
+    db_connection = await _get_connection_or_404(session, name)
+
+    try:
+        # Plan the statement exactly as POST /query would run it
+        validated_sql = validate_and_transform_sql(
+            plan_input.sql, database_type=db_connection.database_type, params=plan_input.params
+        )
+        engine = await replica_router.get_engine(db_connection)
+        plan = await explain_query(
+            engine, db_connection, validated_sql, await get_table_rows(name), plan_input.params
+        )
+
+    except SQLValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": {
+                    "code": "EXPLAIN_ERROR",
+                    "message": f"EXPLAIN failed: {str(e)}",
+                    "details": {"error": str(e), "error_type": type(e).__name__}
+                }
+            }
+        )
+
+    return QueryPlanResult(
+        sql=validated_sql,
+        warnings=evaluate_guardrails(db_connection, plan),
+        policy=get_connection_options(db_connection).explain_policy,
+        **plan,
+    )
+
+
+@router.post(
+    "/dbs/{name}/jobs",
+    response_model=QueryJobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {"model": ErrorResponse, "description": "SQL validation error"},
+        404: {"model": ErrorResponse, "description": "Database not found"},
+        429: {"model": ErrorResponse, "description": "Job queue is full"}
+    },
+    summary="Submit query job",
+    description="Validate a SELECT query and run it in the background. "
+                "Jobs spool their rows to disk and may run up to JOB_TIMEOUT_SECONDS "
+                "and return up to JOB_MAX_ROWS rows. "
+                "The result is kept for JOB_RESULT_TTL_SECONDS after the job finishes."
+)
+async def submit_query_job(
+    name: str,
+    job_input: QueryJobInput,
+    session: AsyncSession = Depends(get_session)
+):
+    """Submit a query job.
+
+    Args:
+        name: Database connection name
+        job_input: Job input with SQL text
+        session: Database session
+
+    Returns:
+        Status of the queued job
+
+    Raises:
+        HTTPException: If database not found, SQL is invalid or the job queue is full
+    """
+    db_connection = await _get_connection_or_404(session, name)
+
+    try:
+        job = query_job_manager.submit(
+            db_connection, job_input.sql, timeout=job_input.timeout_seconds,
+            params=job_input.params
+        )
+
+    except QueryJobError as e:
+        raise _job_http_error(e)
+
+    except SQLValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": e.message,
+                    "details": e.details
+                }
+            }
+        )
+
+    return QueryJobStatus(**job.to_dict())
+
+
+@router.get(
+    "/dbs/{name}/jobs",
+    response_model=list[QueryJobStatus],
+    responses={
+        404: {"model": ErrorResponse, "description": "Database not found"}
+    },
+    summary="List query jobs",
+    description="List the queued, running and retained query jobs of the specified database, "
+                "newest first."
+)
+async def list_query_jobs(name: str, session: AsyncSession = Depends(get_session)):
+    """List query jobs of a database.
+
+    Args:
+        name: Database connection name
+        session: Database session
+
+    Returns:
+        List of job statuses
+
+    Raises:
+        HTTPException: If database not found
+    """
+    await _get_connection_or_404(session, name)
+    return [QueryJobStatus(**job.to_dict()) for job in query_job_manager.list_jobs(name)]
+
+
+@router.get(
+    "/dbs/{name}/jobs/{job_id}",
+    response_model=QueryJobStatus,
+    responses={
+        404: {"model": ErrorResponse, "description": "Database or job not found"}
+    },
+    summary="Get query job status",
+    description="Get the status of a query job: queued, running (with the number of rows "
+                "spooled so far), succeeded, failed or cancelled."
+)
+async def get_query_job(name: str, job_id: str, session: AsyncSession = Depends(get_session)):
+    """Get the status of a query job.
+
+    Args:
+        name: Database connection name
+        job_id: Job id
+        session: Database session
+
+    Returns:
+        Job status
+
+    Raises:
+        HTTPException: If database or job not found
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        job = query_job_manager.get(name, job_id)
+    except QueryJobError as e:
+        raise _job_http_error(e)
+    return QueryJobStatus(**job.to_dict())
+
+
+@router.get(
+    "/dbs/{name}/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "NDJSON job status frames"},
+        404: {"model": ErrorResponse, "description": "Database or job not found"}
+    },
+    summary="Follow query job progress",
+    description="Stream the job status as NDJSON, one frame per change (at most two per second, "
+                "and a heartbeat frame every 15 seconds), until the job finishes."
+)
+async def stream_query_job_events(
+    name: str, job_id: str, session: AsyncSession = Depends(get_session)
+):
+    """Stream the status of a query job until it finishes.
+
+    Args:
+        name: Database connection name
+        job_id: Job id
+        session: Database session
+
+    Returns:
+        Streaming NDJSON response
+
+    Raises:
+        HTTPException: If database or job not found
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        job = query_job_manager.get(name, job_id)
+    except QueryJobError as e:
+        raise _job_http_error(e)
+
+    async def frames():
+        async for job_status in query_job_manager.watch(job):
+            yield QueryJobStatus(**job_status).model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/dbs/{name}/jobs/{job_id}/result",
+    response_model=QueryJobResultPage,
+    responses={
+        404: {"model": ErrorResponse, "description": "Database or job not found"},
+        409: {"model": ErrorResponse, "description": "Job not finished, failed or cancelled"}
+    },
+    summary="Get query job result page",
+    description="Read limit rows from offset of a succeeded job's spooled result. "
+                "nextOffset is the offset of the following page, or null after the last row. "
+                "format=columnar returns one value array per column under data."
+)
+async def get_query_job_result(
+    name: str,
+    job_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=settings.pagination_default_page_size, ge=1, le=settings.pagination_max_page_size
+    ),
+    format: str = Query(default="rows", pattern="^(rows|columnar)$"),
+    session: AsyncSession = Depends(get_session)
+):
+    """Get a page of a query job result.
+
+    Args:
+        name: Database connection name
+        job_id: Job id
+        offset: Number of the first row
+        limit: Maximum number of rows
+        format: Row encoding (rows or columnar)
+        session: Database session
+
+    Returns:
+        Result page
+
+    Raises:
+        HTTPException: If database or job not found or the job has no result
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        job = query_job_manager.get(name, job_id)
+        rows = await query_job_manager.read_rows(job, offset, limit)
+    except QueryJobError as e:
+        raise _job_http_error(e)
+
+    next_offset = offset + len(rows)
+    page = {
+        "jobId": job.job_id,
+        "format": format,
+        "columns": job.columns,
+        **await encode_rows(rows, len(job.columns), format),
+        "rowCount": len(rows),
+        "totalRows": job.row_count,
+        "offset": offset,
+        "nextOffset": next_offset if next_offset < job.row_count else None,
+    }
+    return Response(
+        content=await encode_result(QueryJobResultPage, page), media_type="application/json"
+    )
+
+
+@router.get(
+    "/dbs/{name}/jobs/{job_id}/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/csv": {}, "application/json": {}}, "description": "Exported file"},
+        404: {"model": ErrorResponse, "description": "Database or job not found"},
+        409: {"model": ErrorResponse, "description": "Job not finished, failed or cancelled"}
+    },
+    summary="Export query job result",
+    description="Download the full result of a succeeded job as CSV or JSON, read from its "
+                "spool file batch by batch."
+)
+async def export_query_job_result(
+    name: str,
+    job_id: str,
+    format: ExportFormat = ExportFormat.CSV,
+    session: AsyncSession = Depends(get_session)
+):
+    """Export the result of a query job.
+
+    Args:
+        name: Database connection name
+        job_id: Job id
+        format: Export format
+        session: Database session
+
+    Returns:
+        Streaming file download
+
+    Raises:
+        HTTPException: If database or job not found or the job has no result
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        job = query_job_manager.get(name, job_id)
+        query_job_manager.require_result(job)
+    except QueryJobError as e:
+        raise _job_http_error(e)
+
+    return _export_spool_response(job.spool, job.columns, format)
+
+
+@router.delete(
+    "/dbs/{name}/jobs/{job_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {"model": ErrorResponse, "description": "Database or job not found"}
+    },
+    summary="Cancel or discard a query job",
+    description="Cancel a queued or running job and delete the job with its spooled result."
+)
+async def delete_query_job(name: str, job_id: str, session: AsyncSession = Depends(get_session)):
+    """Cancel and delete a query job.
+
+    Args:
+        name: Database connection name
+        job_id: Job id
+        session: Database session
+
+    Raises:
+        HTTPException: If database or job not found
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        await query_job_manager.delete(name, job_id)
+    except QueryJobError as e:
+        raise _job_http_error(e)
+
+
+@router.get(
+    "/dbs/{name}/query/spills/{spill_id}/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/csv": {}, "application/json": {}}, "description": "Exported file"},
+        404: {"model": ErrorResponse, "description": "Database not found"},
+        410: {"model": ErrorResponse, "description": "Spilled result expired"}
+    },
+    summary="Export spilled query result",
+    description="Download the full result of a query that spilled to disk (spillId of its "
+                "response) as CSV or JSON, read from the spill file batch by batch."
+)
+async def export_spilled_result(
+    name: str,
+    spill_id: str,
+    format: ExportFormat = ExportFormat.CSV,
+    session: AsyncSession = Depends(get_session)
+):
+    """Export a spilled query result.
+
+    Args:
+        name: Database connection name
+        spill_id: Spill id from the query response
+        format: Export format
+        session: Database session
+
+    Returns:
+        Streaming file download
+
+    Raises:
+        HTTPException: If database not found or the spilled result expired
+    """
+    await _get_connection_or_404(session, name)
+    try:
+        spilled = spill_store.get(spill_id)
+        if spilled.db_name != name:
+            raise PaginationError("Continuation token has expired", {"reason": "expired"})
+    except PaginationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={
+                "error": {
+                    "code": "SPILL_EXPIRED",
+                    "message": "Spilled result has expired",
+                    "details": e.details
+                }
+            }
+        )
+
+    return _export_spool_response(spilled.spool, spilled.columns, format)
+
+
+@router.get(
+    "/dbs/{name}/queries",
+    response_model=list[RunningQueryEntry],
+    responses={
+        404: {"model": ErrorResponse, "description": "Database not found"}
+    },
+    summary="List running queries",
+    description="List the queries currently executing against the specified database."
+)
+async def list_running_queries(name: str, session: AsyncSession = Depends(get_session)):
+    """List running queries of a database.
+
+    Args:
+        name: Database connection name
+        session: Database session
+
+    Returns:
+        List of running queries
+
+    Raises:
+        HTTPException: If database not found
+    """
+    await _get_connection_or_404(session, name)
+    return [RunningQueryEntry(**entry) for entry in query_registry.list_running(name)]
+
+
+@router.delete(
+    "/dbs/{name}/queries/{query_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {"model": ErrorResponse, "description": "Database or running query not found"}
+    },
+    summary="Cancel a running query",
+    description="Cancel a running query on the target database (pg_cancel_backend on PostgreSQL, "
+                "KILL QUERY on MySQL, interrupt on SQLite). The query's own request then fails "
+                "with QUERY_CANCELLED."
+)
+async def cancel_query(name: str, query_id: str, session: AsyncSession = Depends(get_session)):
+    """Cancel a running query.
+
+    Args:
+        name: Database connection name
+        query_id: Query id
+        session: Database session
+
+    Raises:
+        HTTPException: If database or running query not found
+    """
+    await _get_connection_or_404(session, name)
+
+    if not await query_registry.cancel(name, query_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": {
+                    "code": "QUERY_NOT_FOUND",
+                    "message": f"No running query '{query_id}' on database '{name}'",
+                    "details": {"queryId": query_id}
+                }
+            }
+        )
+
 
 @router.get(
     "/dbs/{name}/history",
@@ -124,22 +986,7 @@ async def get_database_query_history(name: str, limit: int = 50, session: AsyncS
     Raises:
         HTTPException: If database not found
     """
-    # Verify database exists
-    statement = select(DatabaseConnection).where(DatabaseConnection.name == name)
-    result = await session.execute(statement)
-    db_connection = result.scalar_one_or_none()
-
-    if not db_connection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": {
-                    "code": "DATABASE_NOT_FOUND",
-                    "message": f"Database '{name}' not found",
-                    "details": {"databaseName": name}
-                }
-            }
-        )
+    await _get_connection_or_404(session, name)
 
     # Get history
     history = await get_query_history(name, limit=limit)
@@ -185,22 +1032,7 @@ async def generate_sql_from_natural_language_endpoint(name: str, nl_input: Natur
     Raises:
         HTTPException: If database not found or generation fails
     """
-    # Get database connection
-    statement = select(DatabaseConnection).where(DatabaseConnection.name == name)
-    result = await session.execute(statement)
-    db_connection = result.scalar_one_or_none()
-
-    if not db_connection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": {
-                    "code": "DATABASE_NOT_FOUND",
-                    "message": f"Database '{name}' not found",
-                    "details": {"databaseName": name}
-                }
-            }
-        )
+    db_connection = await _get_connection_or_404(session, name)
 
     # Get database metadata
     try:
@@ -299,11 +1131,13 @@ async def export_query_results(name: str, export_input: ExportInput):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             export_input.filename = f"query_result_{timestamp}.{export_input.format.value}"
 
-        # Export data
-        exported_data = export_service.export_data(
-            columns=export_input.columns,
-            rows=export_input.rows,
-            format=export_input.format
+        # Export data, in a worker process for large results
+        exported_data = await cpu_offloader.run(
+            export_service.export_data,
+            len(export_input.rows) * len(export_input.columns),
+            export_input.columns,
+            export_input.rows,
+            export_input.format
         )
 
         return ExportResult(
@@ -0,0 +1,182 @@
+"""Runtime statistics endpoints."""
+
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.services.admission import admission_controller
+from app.services.cpu_offload import cpu_offloader
+from app.services.history_retention import history_retention
+from app.services.history_writer import history_writer
+from app.services.loop_monitor import loop_monitor
+from app.services.pagination import spill_store
+from app.services.query_jobs import query_job_manager
+from app.services.replica_router import replica_router
+from app.services.result_cache import result_cache
+from app.services.row_counts import exact_row_counter
+from app.services.single_flight import metadata_flights, query_flights
+from app.services.sql_validator import sql_parse_cache
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats/cache",
+    response_model=dict[str, Any],
+    summary="Get query result cache statistics",
+    description="Hit, miss and eviction counters and current size of the query result cache."
+)
+async def get_cache_stats() -> dict[str, Any]:
+    """Get query result cache statistics.
+
+    Returns:
+        Cache counters and sizes
+    """
+    return result_cache.stats()
+
+
+@router.get(
+    "/stats/history",
+    response_model=dict[str, Any],
+    summary="Get query history writer statistics",
+    description="Written, dropped and failed entry counters and the current queue length "
+                "of the background query history writer, and history retention counters."
+)
+async def get_history_stats() -> dict[str, Any]:
+    """Get query history writer statistics.
+
+    Returns:
+        Writer counters and queue length, and retention counters
+    """
+    return {**history_writer.stats(), "retention": history_retention.stats()}
+
+
+@router.get(
+    "/stats/admission",
+    response_model=dict[str, Any],
+    summary="Get query admission statistics",
+    description="Per-database running and queued query counts, limits, rejections and "
+                "queue wait times."
+)
+async def get_admission_stats() -> dict[str, Any]:
+    """Get query admission statistics.
+
+    Returns:
+        Admission statistics by database name
+    """
+    return admission_controller.stats()
+
+
+@router.get(
+    "/stats/sql",
+    response_model=dict[str, Any],
+    summary="Get SQL parse cache statistics",
+    description="Hit, miss and eviction counters and current size of the SQL parse and "
+                "validation cache."
+)
+async def get_sql_stats() -> dict[str, Any]:
+    """Get SQL parse cache statistics.
+
+    Returns:
+        Cache counters and sizes
+    """
+    return sql_parse_cache.stats()
+
+
+@router.get(
+    "/stats/jobs",
+    response_model=dict[str, Any],
+    summary="Get query job statistics",
+    description="Submitted, finished and expired job counters, queued and running jobs, "
+                "and the disk space used by spooled results."
+)
+async def get_job_stats() -> dict[str, Any]:
+    """Get query job statistics.
+
+    Returns:
+        Job counters, queue length and spool size
+    """
+    return query_job_manager.stats()
+
+
+@router.get(
+    "/stats/spill",
+    response_model=dict[str, Any],
+    summary="Get result spill statistics",
+    description="Number and total size of query results spilled to disk after exceeding "
+                "the per-query memory budget, and the spill files currently held."
+)
+async def get_spill_stats() -> dict[str, Any]:
+    """Get result spill statistics.
+
+    Returns:
+        Spill counters and disk use
+    """
+    return spill_store.stats()
+
+
+@router.get(
+    "/stats/coalescing",
+    response_model=dict[str, Any],
+    summary="Get request coalescing statistics",
+    description="Execution, coalesced, failed and abandoned counters and the number of "
+                "executions in flight for identical concurrent queries and metadata refreshes."
+)
+async def get_coalescing_stats() -> dict[str, Any]:
+    """Get request coalescing statistics.
+
+    Returns:
+        Single-flight counters for queries and metadata
+    """
+    return {
+        "queries": query_flights.stats(),
+        "metadata": metadata_flights.stats(),
+    }
+
+
+@router.get(
+    "/stats/replicas",
+    response_model=dict[str, Any],
+    summary="Get read replica routing statistics",
+    description="Routed, primary fallback and ejection counters, and the health, replication "
+                "lag and in-flight queries of the replicas of recently used connections."
+)
+async def get_replica_stats() -> dict[str, Any]:
+    """Get read replica routing statistics.
+
+    Returns:
+        Routing counters and replica health
+    """
+    return replica_router.stats()
+
+
+@router.get(
+    "/stats/event-loop",
+    response_model=dict[str, Any],
+    summary="Get event loop lag statistics",
+    description="Event loop lag percentiles over the recent window, the maximum lag, and "
+                "counters of result encoding run inline or offloaded to worker processes."
+)
+async def get_event_loop_stats() -> dict[str, Any]:
+    """Get event loop lag statistics.
+
+    Returns:
+        Loop lag percentiles and CPU offload counters
+    """
+    return {**loop_monitor.stats(), "offload": cpu_offloader.stats()}
+
+
+@router.get(
+    "/stats/row-counts",
+    response_model=dict[str, Any],
+    summary="Get exact row counting statistics",
+    description="Background exact row count runs, tables counted, runs stopped by their time "
+                "budget, failed and superseded runs, and the number of runs in progress."
+)
+async def get_row_count_stats() -> dict[str, Any]:
+    """Get exact row counting statistics.
+
+    Returns:
+        Exact row counter counters
+    """
+    return exact_row_counter.stats()
@@ -22,6 +22,94 @@ class Settings(BaseSettings):
     # Database
     database_url: str = ""
     
+    # Target database engines
+    target_pool_size: int = 2
+    target_max_overflow: int = 10
+    target_engine_idle_timeout_seconds: int = 600
+    target_max_total_connections: int = 100
+    target_application_name: str = "db-query"
+    target_prepared_statement_cache_size: int = 256
+    
+    # Read replicas (reads routed across a connection's replicas, primary as fallback)
+    replica_max_per_connection: int = 16
+    replica_max_lag_seconds: float = 30.0
+    replica_health_interval_seconds: float = 10.0
+    
+    # Streaming query results
+    stream_batch_size: int = 500
+    stream_max_rows: int = 1_000_000
+    
+    # Paged query results
+    pagination_default_page_size: int = 500
+    pagination_max_page_size: int = 10_000
+    pagination_cursor_idle_timeout_seconds: int = 300
+    pagination_max_open_cursors: int = 4
+    
+    # Result spill (per-query memory budget of unpaged results, files under ./db/spill)
+    query_memory_budget_bytes: int = 32 * 1024 * 1024
+    query_spill_max_disk_bytes: int = 2 * 1024 * 1024 * 1024
+    query_spill_idle_timeout_seconds: int = 600
+    
+    # Query result cache
+    query_cache_default_ttl_seconds: int = 0
+    query_cache_max_memory_bytes: int = 64 * 1024 * 1024
+    query_cache_max_entry_bytes: int = 8 * 1024 * 1024
+    query_cache_disk_enabled: bool = False
+    query_cache_max_disk_bytes: int = 512 * 1024 * 1024
+    
+    # Query history writer
+    history_batch_size: int = 100
+    history_flush_interval_seconds: float = 1.0
+    history_max_pending: int = 10_000
+    
+    # Query history retention
+    history_keep_last: int = 50
+    history_max_age_days: int | None = None
+    history_sweep_interval_seconds: int = 300
+    history_sweep_after_writes: int = 500
+    history_archive_enabled: bool = False
+    
+    # SQL validation (row limits of unpaged queries, parse cache size)
+    query_max_rows: int = 10_000
+    sql_parse_cache_max_entries: int = 1024
+    
+    # Statement timeouts (default per connection, cap per request)
+    query_timeout_seconds: int = 30
+    query_max_timeout_seconds: int = 300
+    
+    # Pre-execution cost guardrails (per-connection defaults)
+    explain_policy: str = "off"
+    explain_large_table_rows: int = 1_000_000
+    
+    # Table row counts in metadata (per-connection defaults; "exact" counts in the background)
+    metadata_row_counts: str = "estimated"
+    metadata_exact_count_budget_seconds: int = 60
+    
+    # Asynchronous query jobs (results spooled under ./db/jobs)
+    job_workers: int = 2
+    job_max_queued: int = 100
+    job_timeout_seconds: int = 3600
+    job_max_timeout_seconds: int = 6 * 3600
+    job_max_rows: int = 10_000_000
+    job_spool_batch_rows: int = 1000
+    job_result_ttl_seconds: int = 3600
+    
+    # Query admission control (per target database)
+    admission_max_concurrent_queries: int = 4
+    admission_max_queued_queries: int = 16
+    admission_queue_timeout_seconds: float = 10.0
+    
+    # CPU offload of result encoding (worker processes; 0 encodes in the event loop)
+    offload_workers: int = 2
+    offload_min_cells: int = 200_000
+    offload_chunk_cells: int = 100_000
+    offload_inline_chunk_cells: int = 2_000
+    
+    # Event loop lag monitoring
+    loop_lag_interval_seconds: float = 0.1
+    loop_lag_window_samples: int = 600
+    loop_lag_threshold_ms: float = 100.0
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -8,6 +8,15 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.config import settings
 from app.database import init_db
+from app.services.engine_registry import engine_registry
+from app.services.replica_router import replica_router
+from app.services.pagination import cursor_store, spill_store
+from app.services.history_writer import history_writer
+from app.services.history_retention import history_retention
+from app.services.query_jobs import query_job_manager
+from app.services.cpu_offload import cpu_offloader
+from app.services.loop_monitor import loop_monitor
+from app.services.row_counts import exact_row_counter
 import logging
 
 # Configure logging
@@ -45,6 +54,33 @@ async def startup_event() -> None:
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
         if settings.debug:
             traceback.print_exc()
+    
+    # Start idle eviction for target database engines and held cursors
+    engine_registry.start()
+    replica_router.start()
+    cursor_store.start()
+    spill_store.start()
+    history_writer.start()
+    history_retention.start()
+    query_job_manager.start()
+    cpu_offloader.start()
+    loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Flush query history and dispose pooled target database connections on shutdown."""
+    await query_job_manager.close()
+    await exact_row_counter.close()
+    await history_writer.close()
+    await history_retention.close()
+    await cursor_store.close()
+    await spill_store.close()
+    await replica_router.close()
+    await engine_registry.close()
+    await cpu_offloader.close()
+    await loop_monitor.close()
+    logger.info("Target database engines disposed")
 
 
 @app.exception_handler(Exception)
@@ -124,6 +160,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException)
                 "details": {"status_code": exc.status_code} if settings.debug else None,
             }
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -138,7 +175,8 @@ async def health_check() -> dict[str, str]:
 
 
 # Include routers
-from app.api.v1 import databases, queries
+from app.api.v1 import databases, queries, stats
 app.include_router(databases.router, prefix="/api/v1", tags=["databases"])
 app.include_router(queries.router, prefix="/api/v1", tags=["queries"])
+app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
 
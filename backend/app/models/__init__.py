@@ -6,6 +6,8 @@ from app.models.query import QueryHistory
 from app.models.schemas import (
     BaseSchema,
     to_camel,
+    ConnectionOptions,
+    ReplicaEndpoint,
     DatabaseConnectionInput,
     DatabaseConnectionResponse,
     DatabaseMetadataResponse,
@@ -13,15 +15,26 @@ from app.models.schemas import (
     ColumnMetadata,
     QueryInput,
     QueryResult,
+    ColumnarQueryResult,
+    ColumnVector,
     QueryColumn,
     QueryHistoryEntry,
+    RunningQueryEntry,
+    QueryPlanInput,
+    QueryPlanResult,
+    FullTableScan,
     ErrorResponse,
+    QueryJobInput,
+    QueryJobStatus,
+    QueryJobResultPage,
 )
 
 __all__ = [
     "DatabaseConnection",
     "DatabaseMetadata",
     "QueryHistory",
+    "ConnectionOptions",
+    "ReplicaEndpoint",
     "DatabaseConnectionInput",
     "DatabaseConnectionResponse",
     "DatabaseMetadataResponse",
@@ -29,9 +42,18 @@ __all__ = [
     "ColumnMetadata",
     "QueryInput",
     "QueryResult",
+    "ColumnarQueryResult",
+    "ColumnVector",
     "QueryColumn",
     "QueryHistoryEntry",
+    "RunningQueryEntry",
+    "QueryPlanInput",
+    "QueryPlanResult",
+    "FullTableScan",
     "ErrorResponse",
+    "QueryJobInput",
+    "QueryJobStatus",
+    "QueryJobResultPage",
     "BaseSchema",
     "to_camel",
 ]
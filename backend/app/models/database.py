@@ -1,8 +1,11 @@
 """Database connection model."""
 
-from sqlmodel import SQLModel, Field
+import json
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Text
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
 
 class DatabaseType(str, Enum):
@@ -34,4 +37,16 @@ class DatabaseConnection(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     last_connected_at: datetime | None = None
     status: ConnectionStatus = Field(default=ConnectionStatus.ACTIVE)
+    options_json: str | None = Field(default=None, sa_column=Column(Text))
+    replicas_json: str | None = Field(default=None, sa_column=Column(Text))
+
+    @property
+    def options(self) -> dict[str, Any]:
+        """Get per-connection options."""
+        return json.loads(self.options_json) if self.options_json else {}
+
+    @property
+    def replicas(self) -> list[dict[str, Any]]:
+        """Get read replicas (url and weight of each)."""
+        return json.loads(self.replicas_json) if self.replicas_json else []
 
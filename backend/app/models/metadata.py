@@ -15,6 +15,10 @@ class DatabaseMetadata(SQLModel, table=True):
     metadata_json: str = Field(sa_column=Column(Text))
     fetched_at: datetime = Field(default_factory=datetime.utcnow)
     table_count: int = Field(default=0)
+    # Schema version probe and per-relation column fingerprints at extraction,
+    # for incremental refreshes
+    schema_version: str | None = Field(default=None, max_length=128)
+    fingerprints_json: str | None = Field(default=None, sa_column=Column(Text))
 
     @property
     def is_stale(self) -> bool:
@@ -1,7 +1,7 @@
 """Query history model."""
 
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import Text
+from sqlalchemy import Index, Text
 from datetime import datetime
 from enum import Enum
 
@@ -17,6 +17,9 @@ class QueryHistory(SQLModel, table=True):
     """Query history entity."""
 
     __tablename__ = "query_history"
+    __table_args__ = (
+        Index("ix_query_history_database_name_executed_at", "database_name", "executed_at"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     database_name: str = Field(foreign_key="database_connections.name", max_length=50)
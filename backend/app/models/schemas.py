@@ -1,10 +1,11 @@
 """API request/response schemas."""
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, StringConstraints, model_serializer
 from datetime import datetime
-from typing import Literal, Any
+from typing import Annotated, Literal, Any
 from app.models.database import DatabaseType, ConnectionStatus
 from app.models.query import QuerySource
+from app.config import settings
 
 
 def to_camel(string: str) -> str:
@@ -25,11 +26,48 @@ class BaseSchema(BaseModel):
 
 
 # Database Connection Schemas
+class ConnectionOptions(BaseSchema):
+    """Per-connection options."""
+
+    cache_ttl_seconds: int = Field(default=settings.query_cache_default_ttl_seconds, ge=0)
+    history_keep_last: int = Field(default=settings.history_keep_last, ge=0)
+    history_max_age_days: int | None = Field(default=settings.history_max_age_days, ge=1)
+    max_concurrent_queries: int = Field(default=settings.admission_max_concurrent_queries, ge=1)
+    max_queued_queries: int = Field(default=settings.admission_max_queued_queries, ge=0)
+    statement_timeout_seconds: int = Field(
+        default=settings.query_timeout_seconds, ge=1, le=settings.query_max_timeout_seconds
+    )
+    read_only: bool = True
+    search_path: str | None = Field(default=None, max_length=200)
+    application_name: str = Field(default=settings.target_application_name, max_length=63)
+    sql_mode: str | None = Field(default=None, pattern=r"^[A-Za-z_,]*$")
+    explain_policy: Literal["off", "warn", "reject", "job"] = settings.explain_policy
+    explain_max_cost: float | None = Field(default=None, gt=0)
+    explain_max_rows: int | None = Field(default=None, ge=1)
+    large_table_rows: int = Field(default=settings.explain_large_table_rows, ge=1)
+    replica_max_lag_seconds: float = Field(default=settings.replica_max_lag_seconds, gt=0)
+    row_counts: Literal["estimated", "exact"] = settings.metadata_row_counts
+    exact_count_budget_seconds: int = Field(
+        default=settings.metadata_exact_count_budget_seconds, ge=1
+    )
+
+
+class ReplicaEndpoint(BaseSchema):
+    """Read replica of a database connection."""
+
+    url: str = Field(max_length=500)
+    weight: int = Field(default=1, ge=1, le=1000)
+
+
 class DatabaseConnectionInput(BaseSchema):
     """Input schema for creating/updating database connection."""
 
     url: str = Field(max_length=500)
     description: str | None = Field(default=None, max_length=200)
+    options: ConnectionOptions | None = None
+    replicas: list[ReplicaEndpoint] | None = Field(
+        default=None, max_length=settings.replica_max_per_connection
+    )
 
 
 class DatabaseConnectionResponse(BaseSchema):
@@ -43,6 +81,8 @@ class DatabaseConnectionResponse(BaseSchema):
     updated_at: datetime
     last_connected_at: datetime | None
     status: ConnectionStatus
+    options: ConnectionOptions = Field(default_factory=ConnectionOptions)
+    replicas: list[ReplicaEndpoint] = Field(default_factory=list)
 
 
 # Metadata Schemas
@@ -66,6 +106,7 @@ class TableMetadata(BaseSchema):
     schema_name: str = Field(default="public")
     columns: list[ColumnMetadata]
     row_count: int | None = None
+    row_count_kind: Literal["estimated", "exact"] | None = None
 
 
 class DatabaseMetadataResponse(BaseSchema):
@@ -80,10 +121,25 @@ class DatabaseMetadataResponse(BaseSchema):
 
 
 # Query Schemas
+
+# Values of the named placeholders (:name) of a query, sent as bind parameters
+BindParams = dict[
+    Annotated[str, StringConstraints(pattern=r"^[A-Za-z][A-Za-z0-9_]{0,62}$")],
+    str | int | float | bool | None,
+]
+
+
 class QueryInput(BaseSchema):
     """Input schema for query execution."""
 
     sql: str
+    params: BindParams | None = None
+    cache: Literal["bypass", "prefer", "only"] = "prefer"
+    page_size: int | None = Field(default=None, ge=1, le=settings.pagination_max_page_size)
+    continuation_token: str | None = None
+    format: Literal["rows", "columnar"] = "rows"
+    query_id: str | None = Field(default=None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+    timeout_seconds: int | None = Field(default=None, ge=1, le=settings.query_max_timeout_seconds)
 
 
 class QueryColumn(BaseSchema):
@@ -91,6 +147,9 @@ class QueryColumn(BaseSchema):
 
     name: str
     data_type: str
+    precision: int | None = None
+    scale: int | None = None
+    nullable: bool | None = None
 
 
 class QueryResult(BaseSchema):
@@ -101,6 +160,89 @@ class QueryResult(BaseSchema):
     row_count: int
     execution_time_ms: int
     sql: str
+    continuation_token: str | None = None
+    cached: bool = False
+    cache_age_ms: int | None = None
+    query_id: str | None = None
+    warnings: list[str] | None = None
+    spilled: bool = False
+    spill_id: str | None = None
+    spill_bytes: int | None = None
+    total_rows: int | None = None
+
+
+class ColumnVector(BaseSchema):
+    """Values of one result column in columnar format.
+
+    Either ``values`` or ``dictionary`` and ``indices`` is set. ``nullBitmap``
+    is base64 with bit ``i % 8`` of byte ``i // 8`` set when row ``i`` is null.
+    """
+
+    values: list[Any] | None = None
+    dictionary: list[str] | None = None
+    indices: list[int | None] | None = None
+    null_bitmap: str | None = None
+
+    @model_serializer(mode="wrap")
+    def _omit_unset_parts(self, handler):
+        """Leave out the parts this column does not use."""
+        return {key: value for key, value in handler(self).items() if value is not None}
+
+
+class ColumnarQueryResult(BaseSchema):
+    """Query result schema in columnar format."""
+
+    format: Literal["columnar"] = "columnar"
+    columns: list[QueryColumn]
+    data: list[ColumnVector]
+    row_count: int
+    execution_time_ms: int
+    sql: str
+    continuation_token: str | None = None
+    cached: bool = False
+    cache_age_ms: int | None = None
+    query_id: str | None = None
+    warnings: list[str] | None = None
+    spilled: bool = False
+    spill_id: str | None = None
+    spill_bytes: int | None = None
+    total_rows: int | None = None
+
+
+class RunningQueryEntry(BaseSchema):
+    """Running query schema."""
+
+    query_id: str
+    sql: str
+    started_at: datetime
+    elapsed_ms: int
+    cancelled: bool
+
+
+class QueryPlanInput(BaseSchema):
+    """Input schema for query planning."""
+
+    sql: str
+    params: BindParams | None = None
+
+
+class FullTableScan(BaseSchema):
+    """Full table scan in a query plan."""
+
+    table: str
+    row_count: int | None = None
+
+
+class QueryPlanResult(BaseSchema):
+    """Estimated query plan schema."""
+
+    sql: str
+    estimated_rows: int | None = None
+    estimated_cost: float | None = None
+    full_scans: list[FullTableScan]
+    warnings: list[str]
+    policy: Literal["off", "warn", "reject", "job"]
+    plan: Any
 
 
 class QueryHistoryEntry(BaseSchema):
@@ -131,3 +273,45 @@ class ErrorResponse(BaseSchema):
 
     error: ErrorDetail
 
+
+# Query Job Schemas
+class QueryJobInput(BaseSchema):
+    """Input schema for submitting a query job."""
+
+    sql: str
+    params: BindParams | None = None
+    timeout_seconds: int | None = Field(default=None, ge=1, le=settings.job_max_timeout_seconds)
+
+
+class QueryJobStatus(BaseSchema):
+    """Query job status schema."""
+
+    job_id: str
+    database_name: str
+    sql: str
+    params: BindParams | None = None
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+    columns: list[QueryColumn] | None = None
+    row_count: int = 0
+    execution_time_ms: int | None = None
+    spool_bytes: int | None = None
+    error: ErrorDetail | None = None
+
+
+class QueryJobResultPage(BaseSchema):
+    """Page of a query job result schema."""
+
+    job_id: str
+    format: Literal["rows", "columnar"] = "rows"
+    columns: list[QueryColumn]
+    rows: list[dict[str, Any]] | None = None
+    data: list[ColumnVector] | None = None
+    row_count: int
+    total_rows: int
+    offset: int
+    next_offset: int | None = None
+
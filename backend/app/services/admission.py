@@ -0,0 +1,199 @@
+"""Per-database admission control for query execution."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any
+
+from app.config import settings
+from app.models.database import DatabaseConnection
+from app.services.db_connection import get_connection_options
+
+# Weight of the latest query in the moving average of slot hold times
+_HOLD_TIME_SMOOTHING = 0.2
+
+
+class AdmissionError(Exception):
+    """Query not admitted to a database."""
+
+    def __init__(
+        self,
+        message: str,
+        details: dict[str, Any] | None = None,
+        retry_after: int = 1,
+    ):
+        """Initialize admission error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+        self.retry_after = retry_after
+
+
+class _Gate:
+    """Concurrency limit and FIFO wait queue of one database."""
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        """Initialize gate."""
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.avg_hold_seconds = 0.0
+        self.counters = {
+            "admitted": 0,
+            "queuedTotal": 0,
+            "waited": 0,
+            "rejected": 0,
+            "timedOut": 0,
+            "totalWaitMs": 0,
+            "maxWaitMs": 0,
+        }
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a new request could be admitted."""
+        queued_work = self.avg_hold_seconds * (len(self.waiters) + 1)
+        return max(1, math.ceil(queued_work / self.max_concurrent))
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionTicket:
+    """Execution slot held by one query."""
+
+    def __init__(self, gate: _Gate):
+        """Initialize ticket."""
+        self._gate = gate
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        """Give the slot back. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+
+        held = time.monotonic() - self._admitted_at
+        gate = self._gate
+        gate.avg_hold_seconds += _HOLD_TIME_SMOOTHING * (held - gate.avg_hold_seconds)
+        gate.release()
+
+
+class AdmissionController:
+    """Bounds concurrent query executions per target database.
+
+    Each connection runs at most ``maxConcurrentQueries`` queries at once.
+    Further requests wait in a FIFO queue of at most ``maxQueuedQueries``
+    entries for up to ``queue_timeout`` seconds. A full queue is rejected
+    immediately and a queue timeout fails the request, both with a
+    ``retry_after`` estimate derived from recent slot hold times. Limits
+    are read from the connection options on every request, so changes
+    apply without a restart.
+    """
+
+    def __init__(self, queue_timeout: float):
+        """Initialize admission controller."""
+        self.queue_timeout = queue_timeout
+        self._gates: dict[str, _Gate] = {}
+
+    async def acquire(self, db_connection: DatabaseConnection) -> AdmissionTicket:
+        """Wait for an execution slot on a database.
+
+        Args:
+            db_connection: Database connection object
+
+        Returns:
+            AdmissionTicket, to be released when the query is done
+
+        Raises:
+            AdmissionError: If the wait queue is full or the wait timed out
+        """
+        options = get_connection_options(db_connection)
+        gate = self._gates.get(db_connection.name)
+        if gate is None:
+            gate = self._gates[db_connection.name] = _Gate(
+                options.max_concurrent_queries, options.max_queued_queries
+            )
+        gate.max_concurrent = options.max_concurrent_queries
+        gate.max_queued = options.max_queued_queries
+
+        if gate.active < gate.max_concurrent and not gate.waiters:
+            gate.active += 1
+            gate.counters["admitted"] += 1
+            return AdmissionTicket(gate)
+
+        if len(gate.waiters) >= gate.max_queued:
+            gate.counters["rejected"] += 1
+            raise AdmissionError(
+                f"Too many queries queued for database '{db_connection.name}'",
+                {
+                    "reason": "queue_full",
+                    "maxConcurrentQueries": gate.max_concurrent,
+                    "maxQueuedQueries": gate.max_queued,
+                },
+                retry_after=gate.retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        gate.waiters.append(waiter)
+        gate.counters["queuedTotal"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except TimeoutError:
+            # The slot may have been handed over in the same loop iteration
+            # as the timeout fired (e.g. after a stall); take it rather than
+            # leak it
+            if not waiter.done() or waiter.cancelled():
+                gate.counters["timedOut"] += 1
+                raise AdmissionError(
+                    f"Timed out waiting for a query slot on database '{db_connection.name}'",
+                    {"reason": "timeout", "queueTimeoutSeconds": self.queue_timeout},
+                    retry_after=gate.retry_after(),
+                )
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                gate.release()
+            raise
+        finally:
+            if waiter in gate.waiters:
+                gate.waiters.remove(waiter)
+
+        wait_ms = int((time.monotonic() - started) * 1000)
+        gate.counters["admitted"] += 1
+        gate.counters["waited"] += 1
+        gate.counters["totalWaitMs"] += wait_ms
+        gate.counters["maxWaitMs"] = max(gate.counters["maxWaitMs"], wait_ms)
+        return AdmissionTicket(gate)
+
+    def stats(self) -> dict[str, Any]:
+        """Get live queue depth and wait time statistics per database."""
+        return {
+            name: {
+                "active": gate.active,
+                "queued": len(gate.waiters),
+                "maxConcurrentQueries": gate.max_concurrent,
+                "maxQueuedQueries": gate.max_queued,
+                **gate.counters,
+                "avgWaitMs": (
+                    round(gate.counters["totalWaitMs"] / gate.counters["waited"], 1)
+                    if gate.counters["waited"] else 0
+                ),
+                "avgHoldMs": round(gate.avg_hold_seconds * 1000, 1),
+            }
+            for name, gate in self._gates.items()
+        }
+
+
+# Admission controller instance
+admission_controller = AdmissionController(
+    queue_timeout=settings.admission_queue_timeout_seconds,
+)
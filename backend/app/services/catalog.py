@@ -0,0 +1,365 @@
+"""Catalog queries behind metadata extraction, per database type."""
+
+import hashlib
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.elements import TextClause
+
+from app.models.database import DatabaseType
+
+# Columns by (schema, relation)
+Columns = dict[tuple[str, str], list[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class CatalogReader:
+    """Catalog queries of one database type.
+
+    ``relations`` lists tables and views as rows of (schema, name, "table"
+    or "view", estimated row count or None). ``columns`` gets the columns of
+    all relations, or only of those with the given names. ``schema_version``
+    is a cheap probe whose result changes whenever any relation's columns
+    may have changed, and ``fingerprints`` hashes the column definitions of
+    every relation, so that changed relations can be told apart.
+    """
+
+    relations: Callable[[AsyncConnection], Awaitable[list[tuple]]]
+    columns: Callable[[AsyncConnection, list[str] | None], Awaitable[Columns]]
+    schema_version: Callable[[AsyncConnection], Awaitable[str]]
+    fingerprints: Callable[[AsyncConnection], Awaitable[dict[tuple[str, str], str]]]
+
+
+# Tables (including partitioned) and views, with the planner's row estimates;
+# reltuples is -1 before the first ANALYZE, and 0 for a partitioned table itself
+_POSTGRESQL_RELATIONS = """
+    SELECT
+        n.nspname,
+        c.relname,
+        CASE WHEN c.relkind = 'v' THEN 'view' ELSE 'table' END,
+        CASE
+            WHEN c.relkind = 'r' AND c.reltuples >= 0 THEN CAST(c.reltuples AS bigint)
+            WHEN c.relkind = 'p' THEN (
+                SELECT CAST(SUM(p.reltuples) AS bigint)
+                FROM pg_inherits i
+                JOIN pg_class p ON p.oid = i.inhrelid
+                WHERE i.inhparent = c.oid AND p.reltuples >= 0
+            )
+        END
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p', 'v')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    ORDER BY n.nspname, c.relname
+"""
+
+# Columns; data_type is spelled as in information_schema
+_POSTGRESQL_COLUMNS = """
+    SELECT
+        n.nspname,
+        c.relname,
+        a.attname,
+        CASE
+            WHEN bt.typelem <> 0 AND bt.typlen = -1 THEN 'ARRAY'
+            WHEN btn.nspname = 'pg_catalog' THEN format_type(bt.oid, NULL)
+            ELSE 'USER-DEFINED'
+        END,
+        NOT a.attnotnull,
+        pg_get_expr(d.adbin, d.adrelid),
+        COALESCE(a.attnum = ANY(pk.conkey), false)
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_type t ON t.oid = a.atttypid
+    JOIN pg_type bt ON bt.oid = CASE WHEN t.typtype = 'd' THEN t.typbasetype ELSE t.oid END
+    JOIN pg_namespace btn ON btn.oid = bt.typnamespace
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    LEFT JOIN pg_constraint pk ON pk.conrelid = c.oid AND pk.contype = 'p'
+    WHERE c.relkind IN ('r', 'p', 'v')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    {names_filter}
+    ORDER BY n.nspname, c.relname, a.attnum
+"""
+
+# Catalog rows get a new xmin when DDL changes them (ANALYZE and VACUUM update
+# statistics in place), and rows are added or removed with relations
+_POSTGRESQL_SCHEMA_VERSION = " || ':' || ".join(
+    f"(SELECT count(*) || '.' || COALESCE(max(CAST(CAST(xmin AS text) AS bigint)), 0) FROM {table})"
+    for table in (
+        "pg_namespace", "pg_class", "pg_attribute", "pg_attrdef", "pg_constraint", "pg_type"
+    )
+)
+
+_MYSQL_RELATIONS = """
+    SELECT
+        table_schema,
+        table_name,
+        IF(table_type = 'BASE TABLE', 'table', 'view'),
+        IF(table_type = 'BASE TABLE', table_rows, NULL)
+    FROM information_schema.tables
+    WHERE table_schema NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')
+    AND table_schema = DATABASE()
+    ORDER BY table_name
+"""
+
+_MYSQL_COLUMNS = """
+    SELECT
+        table_schema,
+        table_name,
+        column_name,
+        data_type,
+        is_nullable = 'YES',
+        column_default,
+        column_key = 'PRI'
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE()
+    {names_filter}
+    ORDER BY table_name, ordinal_position
+"""
+
+# Checksum of the extracted column attributes; GROUP_CONCAT would be cut at
+# group_concat_max_len
+_MYSQL_COLUMNS_CHECKSUM = """
+    CONCAT(COUNT(*), '.', IFNULL(SUM(CRC32(CONCAT_WS(
+        '|', table_name, column_name, ordinal_position, data_type, is_nullable, column_default,
+        column_key
+    ))), 0))
+"""
+
+# ALTER TABLE may rebuild a table in place without a new create_time, so the
+# column checksum of the whole schema is part of the version
+_MYSQL_SCHEMA_VERSION = f"""
+    SELECT CONCAT(
+        (SELECT CONCAT(COUNT(*), '.', IFNULL(MAX(create_time), ''))
+         FROM information_schema.tables WHERE table_schema = DATABASE()),
+        ':',
+        (SELECT {_MYSQL_COLUMNS_CHECKSUM}
+         FROM information_schema.columns WHERE table_schema = DATABASE())
+    )
+"""
+
+_MYSQL_FINGERPRINTS = f"""
+    SELECT table_schema, table_name, {_MYSQL_COLUMNS_CHECKSUM}
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE()
+    GROUP BY table_schema, table_name
+"""
+
+_SQLITE_RELATIONS = """
+    SELECT name, type
+    FROM sqlite_master
+    WHERE type IN ('table', 'view')
+    AND name NOT LIKE 'sqlite_%'
+    ORDER BY name
+"""
+
+# Columns, through the table_info table-valued function
+_SQLITE_COLUMNS = """
+    SELECT 'main', m.name, p.name, p.type, NOT p."notnull", p.dflt_value, p.pk > 0
+    FROM sqlite_master m
+    JOIN pragma_table_info(m.name) p
+    WHERE m.type IN ('table', 'view')
+    AND m.name NOT LIKE 'sqlite_%'
+    {names_filter}
+    ORDER BY m.name, p.cid
+"""
+
+# A table's columns are all in its CREATE statement (ALTER TABLE rewrites it);
+# a view's columns also depend on the tables it selects from
+_SQLITE_FINGERPRINTS = """
+    SELECT
+        m.name,
+        m.type || ':' || COALESCE(m.sql, '') || ':' || CASE
+            WHEN m.type = 'view' THEN (
+                SELECT group_concat(p.name || ' ' || p.type, ',') FROM pragma_table_info(m.name) p
+            )
+            ELSE ''
+        END
+    FROM sqlite_master m
+    WHERE m.type IN ('table', 'view')
+    AND m.name NOT LIKE 'sqlite_%'
+"""
+
+
+async def _postgresql_relations(conn: AsyncConnection) -> list[tuple]:
+    """List PostgreSQL tables and views."""
+    return (await conn.execute(text(_POSTGRESQL_RELATIONS))).all()
+
+
+async def _postgresql_columns(conn: AsyncConnection, names: list[str] | None) -> Columns:
+    """Get PostgreSQL columns."""
+    query, params = _filtered(_POSTGRESQL_COLUMNS, "c.relname", names)
+    return _group_columns(await conn.execute(query, params))
+
+
+async def _postgresql_schema_version(conn: AsyncConnection) -> str:
+    """Probe PostgreSQL catalogs for schema changes."""
+    return (await conn.execute(text(f"SELECT {_POSTGRESQL_SCHEMA_VERSION}"))).scalar()
+
+
+async def _postgresql_fingerprints(conn: AsyncConnection) -> dict[tuple[str, str], str]:
+    """Hash the column rows of every PostgreSQL relation in the server."""
+    query = text(f"""
+        SELECT
+            col.nspname,
+            col.relname,
+            md5(string_agg(CAST(col AS text), ',' ORDER BY CAST(col AS text)))
+        FROM ({_POSTGRESQL_COLUMNS.format(names_filter="")}) col
+        GROUP BY col.nspname, col.relname
+    """)
+    return {(schema, name): fingerprint for schema, name, fingerprint in await conn.execute(query)}
+
+
+async def _mysql_relations(conn: AsyncConnection) -> list[tuple]:
+    """List MySQL tables and views."""
+    return (await conn.execute(text(_MYSQL_RELATIONS))).all()
+
+
+async def _mysql_columns(conn: AsyncConnection, names: list[str] | None) -> Columns:
+    """Get MySQL columns."""
+    query, params = _filtered(_MYSQL_COLUMNS, "table_name", names)
+    return _group_columns(await conn.execute(query, params))
+
+
+async def _mysql_schema_version(conn: AsyncConnection) -> str:
+    """Probe MySQL table creation times and column checksums for schema changes."""
+    return (await conn.execute(text(_MYSQL_SCHEMA_VERSION))).scalar()
+
+
+async def _mysql_fingerprints(conn: AsyncConnection) -> dict[tuple[str, str], str]:
+    """Checksum the columns of every MySQL relation."""
+    return {
+        (schema, name): fingerprint
+        for schema, name, fingerprint in await conn.execute(text(_MYSQL_FINGERPRINTS))
+    }
+
+
+async def _sqlite_relations(conn: AsyncConnection) -> list[tuple]:
+    """List SQLite tables and views."""
+    listed = (await conn.execute(text(_SQLITE_RELATIONS))).all()
+    estimates = await _sqlite_row_estimates(conn)
+    for name, kind in listed:
+        if kind == "table" and name not in estimates:
+            estimates[name] = await _sqlite_max_rowid(conn, name)
+    return [("main", name, kind, estimates.get(name)) for name, kind in listed]
+
+
+async def _sqlite_columns(conn: AsyncConnection, names: list[str] | None) -> Columns:
+    """Get SQLite columns."""
+    query, params = _filtered(_SQLITE_COLUMNS, "m.name", names)
+    return _group_columns(await conn.execute(query, params))
+
+
+async def _sqlite_schema_version(conn: AsyncConnection) -> str:
+    """Read the SQLite schema cookie, which every schema change increments."""
+    return str((await conn.execute(text("PRAGMA schema_version"))).scalar())
+
+
+async def _sqlite_fingerprints(conn: AsyncConnection) -> dict[tuple[str, str], str]:
+    """Hash the definition of every SQLite relation."""
+    return {
+        ("main", name): hashlib.md5(definition.encode()).hexdigest()
+        for name, definition in await conn.execute(text(_SQLITE_FINGERPRINTS))
+    }
+
+
+async def _sqlite_row_estimates(conn: AsyncConnection) -> dict[str, int]:
+    """Get SQLite row estimates from sqlite_stat1, if ANALYZE has been run.
+
+    The first number of each statistics row is the row count of the table
+    or index; partial indexes cover fewer rows, so the largest wins.
+    """
+    exists_query = text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    )
+    if (await conn.execute(exists_query)).first() is None:
+        return {}
+
+    estimates: dict[str, int] = {}
+    for table, stat in await conn.execute(text("SELECT tbl, stat FROM sqlite_stat1")):
+        rows = int((stat or "0").split()[0])
+        estimates[table] = max(rows, estimates.get(table, 0))
+    return estimates
+
+
+async def _sqlite_max_rowid(conn: AsyncConnection, table: str) -> int | None:
+    """Estimate the rows of a SQLite table without statistics from its largest rowid.
+
+    SQLite reads max(rowid) from the end of the table's b-tree, so this is
+    cheap at any size; deleted rows make it an overestimate. WITHOUT ROWID
+    and virtual tables have no rowid and get no estimate.
+    """
+    quoted = table.replace('"', '""')
+    try:
+        return (await conn.execute(text(f'SELECT max(rowid) FROM "{quoted}"'))).scalar() or 0
+    except DBAPIError:
+        return None
+
+
+def _filtered(
+    sql: str, name_column: str, names: list[str] | None
+) -> tuple[TextClause, dict[str, Any]]:
+    """Restrict a catalog query to relations with the given names, if any are given."""
+    if names is None:
+        return text(sql.format(names_filter="")), {}
+    query = text(sql.format(names_filter=f"AND {name_column} IN :names"))
+    return query.bindparams(bindparam("names", expanding=True)), {"names": names}
+
+
+def _group_columns(rows) -> Columns:
+    """Group catalog column rows by relation.
+
+    Args:
+        rows: Rows of (schema, relation, column, data type, nullable,
+            default, primary key), in column order within each relation
+
+    Returns:
+        Mapping of (schema, relation) to its columns
+    """
+    columns: Columns = defaultdict(list)
+    for schema, relation, name, data_type, nullable, default, primary_key in rows:
+        columns[(schema, relation)].append({
+            "name": name,
+            "dataType": data_type,
+            "nullable": bool(nullable),
+            "primaryKey": bool(primary_key),
+            "defaultValue": default,
+        })
+    return columns
+
+
+_READERS = {
+    DatabaseType.POSTGRESQL: CatalogReader(
+        _postgresql_relations,
+        _postgresql_columns,
+        _postgresql_schema_version,
+        _postgresql_fingerprints,
+    ),
+    DatabaseType.MYSQL: CatalogReader(
+        _mysql_relations, _mysql_columns, _mysql_schema_version, _mysql_fingerprints
+    ),
+    DatabaseType.SQLITE: CatalogReader(
+        _sqlite_relations, _sqlite_columns, _sqlite_schema_version, _sqlite_fingerprints
+    ),
+}
+
+
+def get_catalog_reader(database_type: DatabaseType) -> CatalogReader:
+    """Get the catalog queries of a database type.
+
+    Args:
+        database_type: Database type
+
+    Returns:
+        CatalogReader of the database type
+    """
+    if database_type not in _READERS:
+        raise ValueError(f"Unsupported database type: {database_type}")
+    return _READERS[database_type]
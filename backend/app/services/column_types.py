@@ -0,0 +1,173 @@
+"""Result column type resolution from driver cursor metadata."""
+
+from typing import Any
+
+from app.models.database import DatabaseType
+
+# PostgreSQL built-in type OIDs (pg_type.oid), named as information_schema does
+POSTGRESQL_TYPE_OIDS: dict[int, str] = {
+    16: "boolean",
+    17: "bytea",
+    18: "char",
+    19: "name",
+    20: "bigint",
+    21: "smallint",
+    23: "integer",
+    25: "text",
+    26: "oid",
+    114: "json",
+    142: "xml",
+    650: "cidr",
+    700: "real",
+    701: "double precision",
+    790: "money",
+    829: "macaddr",
+    869: "inet",
+    1042: "character",
+    1043: "character varying",
+    1082: "date",
+    1083: "time without time zone",
+    1114: "timestamp without time zone",
+    1184: "timestamp with time zone",
+    1186: "interval",
+    1266: "time with time zone",
+    1560: "bit",
+    1562: "bit varying",
+    1700: "numeric",
+    2950: "uuid",
+    3802: "jsonb",
+    # Arrays
+    199: "ARRAY",
+    1000: "ARRAY",
+    1005: "ARRAY",
+    1007: "ARRAY",
+    1009: "ARRAY",
+    1015: "ARRAY",
+    1016: "ARRAY",
+    1021: "ARRAY",
+    1022: "ARRAY",
+    1115: "ARRAY",
+    1182: "ARRAY",
+    1231: "ARRAY",
+    2951: "ARRAY",
+    3807: "ARRAY",
+}
+
+# MySQL protocol field types (FIELD_TYPE constants)
+MYSQL_FIELD_TYPES: dict[int, str] = {
+    0: "decimal",
+    1: "tinyint",
+    2: "smallint",
+    3: "int",
+    4: "float",
+    5: "double",
+    6: "null",
+    7: "timestamp",
+    8: "bigint",
+    9: "mediumint",
+    10: "date",
+    11: "time",
+    12: "datetime",
+    13: "year",
+    14: "date",
+    15: "varchar",
+    16: "bit",
+    245: "json",
+    246: "decimal",
+    247: "enum",
+    248: "set",
+    253: "varchar",
+    254: "char",
+    255: "geometry",
+}
+
+# Python value types to SQL types, for drivers without type metadata
+_VALUE_TYPES = {
+    "int": "integer",
+    "float": "real",
+    "str": "text",
+    "bool": "boolean",
+    "date": "date",
+    "datetime": "timestamp",
+    "bytes": "blob",
+}
+
+_NUMERIC_TYPES = {"numeric", "decimal"}
+
+
+def get_cursor_description(result: Any) -> list[tuple] | None:
+    """Get the DBAPI cursor description of a result.
+
+    Works for buffered results after they were fetched and for streamed
+    (server-side cursor) async results.
+
+    Args:
+        result: CursorResult or AsyncResult
+
+    Returns:
+        DBAPI description sequence, or None if unavailable
+    """
+    result = getattr(result, "_real_result", result)
+    context = getattr(result, "context", None)
+    cursor = getattr(context, "cursor", None)
+    return getattr(cursor, "description", None)
+
+
+def describe_columns(
+    columns: list[str],
+    description: list[tuple] | None,
+    database_type: DatabaseType,
+    rows: list,
+) -> list[dict[str, Any]]:
+    """Build result column definitions.
+
+    Types come from the driver's cursor description: asyncpg type OIDs on
+    PostgreSQL and field types on MySQL, which also report precision, scale
+    and nullability. SQLite reports no types, and neither do unknown or
+    ambiguous codes (user-defined PostgreSQL types, MySQL BLOB/TEXT), so
+    those fall back to the first non-null value in the column.
+
+    Args:
+        columns: Result column names
+        description: DBAPI cursor description, if available
+        database_type: Database type
+        rows: Fetched rows, used only for the fallback
+
+    Returns:
+        List of column definitions
+    """
+    column_defs = []
+    for index, name in enumerate(columns):
+        entry = description[index] if description and index < len(description) else None
+        type_code = entry[1] if entry else None
+
+        if database_type == DatabaseType.POSTGRESQL:
+            data_type = POSTGRESQL_TYPE_OIDS.get(type_code)
+        elif database_type == DatabaseType.MYSQL:
+            data_type = MYSQL_FIELD_TYPES.get(type_code)
+        else:
+            data_type = None
+
+        column = {"name": name, "dataType": data_type or _infer_type_from_values(rows, index)}
+
+        if entry and database_type == DatabaseType.MYSQL:
+            precision, scale, null_ok = entry[4], entry[5], entry[6]
+            if data_type in _NUMERIC_TYPES:
+                column["precision"] = precision
+                column["scale"] = scale
+            if null_ok is not None:
+                column["nullable"] = bool(null_ok)
+
+        column_defs.append(column)
+
+    return column_defs
+
+
+def _infer_type_from_values(rows: list, index: int) -> str:
+    """Infer a column type from the first non-null value at a tuple index."""
+    for row in rows:
+        value = row[index]
+        if value is not None:
+            return _VALUE_TYPES.get(type(value).__name__, "text")
+
+    return "text"  # Default to text if can't infer
@@ -0,0 +1,78 @@
+"""Columnar encoding of query results."""
+
+import base64
+from typing import Any
+
+# Dictionary-encode string columns with at most this share of distinct values
+DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+DICTIONARY_MIN_ROWS = 16
+
+
+def encode_columnar(rows: list, column_count: int) -> list[dict[str, Any]]:
+    """Encode fetched row tuples as one vector per column.
+
+    Each vector has either ``values`` (one entry per row) or, for
+    low-cardinality string columns, a ``dictionary`` of distinct values plus
+    per-row ``indices`` into it. Null positions hold null in ``values`` or
+    ``indices`` and are also flagged in ``nullBitmap``: base64 of a bitmap
+    where bit ``i % 8`` of byte ``i // 8`` is set when row ``i`` is null. The
+    bitmap is omitted for columns without nulls.
+
+    Args:
+        rows: Fetched rows (tuples or Row objects)
+        column_count: Number of result columns
+
+    Returns:
+        List of column vectors, in result column order
+    """
+    if not rows:
+        return [{"values": []} for _ in range(column_count)]
+
+    return encode_columns(list(zip(*rows)))
+
+
+def encode_columns(columns: list[tuple]) -> list[dict[str, Any]]:
+    """Encode the values of each column (the transposed rows) as a column vector."""
+    return [_encode_vector(list(values)) for values in columns]
+
+
+def _encode_vector(values: list) -> dict[str, Any]:
+    """Encode one column."""
+    vector: dict[str, Any] = {}
+
+    null_positions = [i for i, value in enumerate(values) if value is None]
+    if null_positions:
+        bitmap = bytearray((len(values) + 7) // 8)
+        for i in null_positions:
+            bitmap[i >> 3] |= 1 << (i & 7)
+        vector["nullBitmap"] = base64.b64encode(bytes(bitmap)).decode("ascii")
+
+    dictionary = _build_dictionary(values, len(values) - len(null_positions))
+    if dictionary is None:
+        vector["values"] = values
+        return vector
+
+    positions = {value: index for index, value in enumerate(dictionary)}
+    vector["dictionary"] = dictionary
+    vector["indices"] = [None if value is None else positions[value] for value in values]
+    return vector
+
+
+def _build_dictionary(values: list, non_null_count: int) -> list[str] | None:
+    """Get the distinct values of a low-cardinality string column, or None."""
+    if non_null_count < DICTIONARY_MIN_ROWS:
+        return None
+
+    max_distinct = int(non_null_count * DICTIONARY_MAX_DISTINCT_RATIO)
+    distinct: dict[str, None] = {}
+    for value in values:
+        if value is None:
+            continue
+        if type(value) is not str:
+            return None
+        if value not in distinct:
+            if len(distinct) >= max_distinct:
+                return None
+            distinct[value] = None
+
+    return list(distinct)
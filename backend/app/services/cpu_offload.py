@@ -0,0 +1,237 @@
+"""Offloading of CPU-heavy result processing to worker processes."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Workers run at lower priority so the event loop wins contended cores
+WORKER_NICENESS = 10
+
+# Values of other types (Decimal, datetime, ...) pickle through a reduce call
+# each, which costs more than encoding them where they are
+_CHEAP_TYPES = frozenset({int, float, str, bool, type(None)})
+
+
+def cheap_to_ship(values: Iterable) -> bool:
+    """Check whether values pickle quickly enough to be worth sending to a worker.
+
+    Args:
+        values: Sample values, such as the first row of a result
+
+    Returns:
+        True if every value is a plain int, float, str, bool or None
+    """
+    return all(type(value) in _CHEAP_TYPES for value in values)
+
+
+class CpuOffloader:
+    """Keeps encoding of large results from stalling the event loop.
+
+    Encoding a multi-megabyte result holds the GIL for hundreds of
+    milliseconds, stalling every other request on the worker. Work on at
+    least ``min_cells`` values (rows times columns) whose items are cheap
+    to pickle is split into chunks of about ``chunk_cells`` values that
+    worker processes encode in parallel; rows are handed over as plain
+    tuples. Other work larger than ``inline_chunk_cells`` runs in the event
+    loop in chunks of that size, one encoding at a time, yielding between
+    chunks, so concurrent requests wait about one chunk. Smaller work runs
+    in one call.
+
+    Chunk functions must be importable module-level functions taking the
+    chunk as their first argument, and their results must be combinable by
+    the caller in chunk order. Without a running pool (not started, or
+    ``workers`` is 0) nothing is sent to worker processes.
+    """
+
+    def __init__(self, workers: int, min_cells: int, chunk_cells: int, inline_chunk_cells: int):
+        """Initialize CPU offloader."""
+        self.workers = workers
+        self.min_cells = min_cells
+        self.chunk_cells = chunk_cells
+        self.inline_chunk_cells = inline_chunk_cells
+        self._pool: ProcessPoolExecutor | None = None
+        self._inline_turn: asyncio.Lock | None = None
+        self._inline_turn_loop: asyncio.AbstractEventLoop | None = None
+        self._counters = {
+            "inlineCalls": 0,
+            "chunkedCalls": 0,
+            "offloadedCalls": 0,
+            "offloadedChunks": 0,
+            "offloadedCells": 0,
+            "poolRestarts": 0,
+        }
+
+    async def map(
+        self,
+        fn: Callable[..., T],
+        items: list,
+        cells_per_item: int,
+        *args: Any,
+        offloadable: bool = True,
+    ) -> list[T]:
+        """Apply fn to chunks of items without blocking the event loop for long.
+
+        Args:
+            fn: Chunk function, called as fn(chunk, *args)
+            items: Items to process (rows or columns)
+            cells_per_item: Number of values in each item
+            *args: Further arguments of fn
+            offloadable: Whether items are cheap enough to pickle for a worker
+
+        Returns:
+            Results of fn, one per chunk, in item order
+        """
+        cells = len(items) * max(cells_per_item, 1)
+
+        if offloadable and self._offloads(cells):
+            chunks = self._split(items, cells_per_item, self.chunk_cells)
+            self._count_offload(len(chunks), cells)
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.gather(*(
+                    loop.run_in_executor(self._pool, fn, chunk, *args) for chunk in chunks
+                ))
+            except BrokenProcessPool:
+                self._restart()
+
+        if cells <= self.inline_chunk_cells:
+            self._counters["inlineCalls"] += 1
+            return [fn(items, *args)]
+
+        self._counters["chunkedCalls"] += 1
+        results = []
+        # Other work then waits for one chunk, not one per running encoding
+        async with self._turn():
+            for chunk in self._split(items, cells_per_item, self.inline_chunk_cells):
+                results.append(fn(chunk, *args))
+                await asyncio.sleep(0)
+        return results
+
+    def map_sync(
+        self,
+        fn: Callable[..., T],
+        items: list,
+        cells_per_item: int,
+        *args: Any,
+        offloadable: bool = True,
+    ) -> list[T]:
+        """Blocking variant of map, for code running in a worker thread.
+
+        Waiting on the pool releases the GIL, so the event loop keeps running
+        while a thread (such as a streaming response) waits for its chunks.
+        Work that stays in the thread runs in one call.
+        """
+        cells = len(items) * max(cells_per_item, 1)
+
+        if offloadable and self._offloads(cells):
+            chunks = self._split(items, cells_per_item, self.chunk_cells)
+            self._count_offload(len(chunks), cells)
+            futures: list[Future] = [self._pool.submit(fn, chunk, *args) for chunk in chunks]
+            try:
+                return [future.result() for future in futures]
+            except BrokenProcessPool:
+                self._restart()
+
+        self._counters["inlineCalls"] += 1
+        return [fn(items, *args)]
+
+    async def run(self, fn: Callable[..., T], cells: int, *args: Any) -> T:
+        """Call fn in a worker process when it works on at least min_cells values.
+
+        Args:
+            fn: Function to call, as fn(*args); args must be cheap to pickle
+            cells: Number of values fn works on
+            *args: Arguments of fn
+
+        Returns:
+            Result of fn
+        """
+        if self._offloads(cells):
+            self._count_offload(1, cells)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+            except BrokenProcessPool:
+                self._restart()
+
+        self._counters["inlineCalls"] += 1
+        return fn(*args)
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._pool is None and self.workers > 0:
+            # Forking a process with running threads and an event loop is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=os.nice,
+                initargs=(WORKER_NICENESS,),
+            )
+
+    async def close(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Get offload counters."""
+        return {
+            **self._counters,
+            "workers": self.workers if self._pool is not None else 0,
+            "minCells": self.min_cells,
+            "chunkCells": self.chunk_cells,
+            "inlineChunkCells": self.inline_chunk_cells,
+        }
+
+    def _turn(self) -> asyncio.Lock:
+        """Get the lock taking turns at chunked encoding in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._inline_turn_loop is not loop:
+            self._inline_turn = asyncio.Lock()
+            self._inline_turn_loop = loop
+        return self._inline_turn
+
+    def _offloads(self, cells: int) -> bool:
+        """Check whether work of this size goes to the pool."""
+        return self._pool is not None and cells >= self.min_cells
+
+    def _count_offload(self, chunks: int, cells: int) -> None:
+        """Count work sent to the pool."""
+        self._counters["offloadedCalls"] += 1
+        self._counters["offloadedChunks"] += chunks
+        self._counters["offloadedCells"] += cells
+
+    @staticmethod
+    def _split(items: list, cells_per_item: int, chunk_cells: int) -> list[list]:
+        """Split items into chunks of about chunk_cells values."""
+        size = max(1, chunk_cells // max(cells_per_item, 1))
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _restart(self) -> None:
+        """Replace a pool whose worker died; the caller then runs the work itself."""
+        logger.warning("CPU offload worker died; restarting the pool")
+        self._counters["poolRestarts"] += 1
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.start()
+
+
+# CPU offloader instance
+cpu_offloader = CpuOffloader(
+    workers=settings.offload_workers,
+    min_cells=settings.offload_min_cells,
+    chunk_cells=settings.offload_chunk_cells,
+    inline_chunk_cells=settings.offload_inline_chunk_cells,
+)
@@ -1,12 +1,19 @@
 """Database connection management service."""
 
+import time
+from dataclasses import dataclass
 from urllib.parse import urlparse
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncEngine
+from sqlalchemy import event, make_url, text
+from sqlalchemy.util import await_only
 from typing import Any
-from app.models.database import DatabaseType
+from app.models.database import DatabaseConnection, DatabaseType
+from app.models.schemas import ConnectionOptions
 from app.config import settings
 
+# SQLite VM instructions between statement deadline checks
+SQLITE_PROGRESS_STEPS = 1000
+
 
 class ConnectionError(Exception):
     """Database connection error."""
@@ -18,6 +25,103 @@ class ConnectionError(Exception):
         self.details = details or {}
 
 
+@dataclass(frozen=True)
+class SessionSettings:
+    """Session state applied once when a pooled connection is opened."""
+
+    statement_timeout_seconds: int
+    read_only: bool
+    search_path: str | None
+    application_name: str
+    sql_mode: str | None
+
+    @classmethod
+    def from_options(cls, options: ConnectionOptions) -> "SessionSettings":
+        """Get the session settings of a connection's options."""
+        return cls(
+            statement_timeout_seconds=options.statement_timeout_seconds,
+            read_only=options.read_only,
+            search_path=options.search_path,
+            application_name=options.application_name,
+            sql_mode=options.sql_mode,
+        )
+
+
+class SQLiteDeadline:
+    """Statement deadline enforced by a SQLite progress handler.
+
+    SQLite calls the handler every ``SQLITE_PROGRESS_STEPS`` VM instructions
+    and interrupts the running statement once it returns non-zero, which
+    surfaces as ``sqlite3.OperationalError: interrupted``.
+    """
+
+    def __init__(self):
+        """Initialize deadline (disarmed)."""
+        self.expires_at: float | None = None
+
+    def arm(self, timeout: float) -> None:
+        """Start the deadline for the next statement."""
+        self.expires_at = time.monotonic() + timeout
+
+    def disarm(self) -> None:
+        """Stop enforcing a deadline."""
+        self.expires_at = None
+
+    def __call__(self) -> int:
+        """Progress handler: non-zero interrupts the statement."""
+        return 1 if self.expires_at is not None and time.monotonic() > self.expires_at else 0
+
+
+async def get_sqlite_deadline(conn: AsyncConnection) -> SQLiteDeadline | None:
+    """Get the statement deadline of a pooled SQLite connection.
+
+    Args:
+        conn: Connection from an engine made by create_engine_for_database
+
+    Returns:
+        SQLiteDeadline, or None for other databases
+    """
+    raw = await conn.get_raw_connection()
+    return raw.info.get("sqlite_deadline")
+
+
+async def set_statement_timeout(
+    conn: AsyncConnection,
+    database_type: DatabaseType,
+    timeout: int,
+) -> None:
+    """Apply a statement timeout to the next statement on a target connection.
+
+    Pooled connections already carry the connection's default timeout from
+    connect time, so a round trip is only made for a per-request override:
+    ``SET LOCAL`` on PostgreSQL, which ends with the transaction, and ``SET
+    SESSION`` on MySQL, which is restored when the connection is checked in.
+    SQLite deadlines are armed in-process for every statement.
+    """
+    raw = await conn.get_raw_connection()
+
+    if database_type == DatabaseType.SQLITE:
+        raw.info["sqlite_deadline"].arm(timeout)
+        return
+
+    if timeout == raw.info["session"].statement_timeout_seconds:
+        return
+
+    if database_type == DatabaseType.POSTGRESQL:
+        await conn.execute(text(f"SET LOCAL statement_timeout = {timeout * 1000}"))
+    elif database_type == DatabaseType.MYSQL:
+        raw.info["timeout_overridden"] = True
+        await conn.execute(text(f"SET SESSION max_execution_time = {timeout * 1000}"))
+
+
+def describe_url(url: str) -> str:
+    """Get a database URL with its password hidden, for logs and statistics."""
+    try:
+        return make_url(url).render_as_string(hide_password=True)
+    except Exception:
+        return urlparse(url).scheme + "://..."
+
+
 def parse_database_url(url: str) -> tuple[DatabaseType, str]:
     """Parse database URL and infer database type.
     
@@ -116,16 +220,32 @@ async def test_connection(url: str, database_type: DatabaseType) -> None:
         )
 
 
-def create_engine_for_database(url: str, database_type: DatabaseType) -> AsyncEngine:
+def create_engine_for_database(
+    url: str,
+    database_type: DatabaseType,
+    pool_size: int = 2,
+    max_overflow: int = 10,
+    session: SessionSettings | None = None,
+) -> AsyncEngine:
     """Create SQLAlchemy engine for database.
+
+    Session settings are part of the connection handshake where the driver
+    supports it (asyncpg ``server_settings``, aiomysql ``init_command``) and
+    applied by a connect event otherwise, so queries never pay for them.
+    Every pooled connection carries its settings in ``info["session"]``.
     
     Args:
         url: Database connection URL
         database_type: Database type
+        pool_size: Number of connections kept open in the pool
+        max_overflow: Extra connections allowed beyond pool_size
+        session: Session settings (default: those of default connection options)
         
     Returns:
         AsyncEngine instance
     """
+    session = session or SessionSettings.from_options(ConnectionOptions())
+
     # Ensure async driver is used
     if database_type == DatabaseType.POSTGRESQL:
         if not url.startswith("postgresql+asyncpg://"):
@@ -137,10 +257,108 @@ def create_engine_for_database(url: str, database_type: DatabaseType) -> AsyncEn
         if not url.startswith("sqlite+aiosqlite://"):
             url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
     
-    return create_async_engine(
+    engine = create_async_engine(
         url,
         pool_pre_ping=True,
-        pool_size=2,
-        max_overflow=10,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args=_session_connect_args(database_type, session),
     )
 
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["session"] = session
+
+    if database_type == DatabaseType.MYSQL:
+        _install_mysql_session_reset(engine)
+    elif database_type == DatabaseType.SQLITE:
+        _install_sqlite_session(engine, session)
+
+    return engine
+
+
+def _session_connect_args(database_type: DatabaseType, session: SessionSettings) -> dict[str, Any]:
+    """Get the driver connect arguments that establish the session settings."""
+    timeout_ms = session.statement_timeout_seconds * 1000
+
+    if database_type == DatabaseType.POSTGRESQL:
+        server_settings = {
+            "application_name": session.application_name,
+            "statement_timeout": str(timeout_ms),
+            "default_transaction_read_only": "on" if session.read_only else "off",
+        }
+        if session.search_path:
+            server_settings["search_path"] = session.search_path
+        return {
+            "server_settings": server_settings,
+            # Prepared statements, and the plans PostgreSQL caches for them, are
+            # reused per connection
+            "prepared_statement_cache_size": settings.target_prepared_statement_cache_size,
+        }
+
+    if database_type == DatabaseType.MYSQL:
+        assignments = [
+            f"SESSION max_execution_time = {timeout_ms}",
+            f"SESSION transaction_read_only = {'ON' if session.read_only else 'OFF'}",
+        ]
+        if session.sql_mode is not None:
+            assignments.append(f"SESSION sql_mode = '{session.sql_mode}'")
+        return {
+            "init_command": "SET " + ", ".join(assignments),
+            "program_name": session.application_name,
+        }
+
+    return {}
+
+
+def _install_mysql_session_reset(engine: AsyncEngine) -> None:
+    """Restore the pooled statement timeout after a per-request override."""
+
+    @event.listens_for(engine.sync_engine, "reset")
+    def _on_reset(dbapi_connection, connection_record, reset_state):
+        if connection_record is None or not connection_record.info.pop("timeout_overridden", False):
+            return
+        # Runs as the connection is checked in; a failure invalidates it instead
+        session = connection_record.info["session"]
+        cursor = dbapi_connection.cursor()
+        cursor.execute(
+            f"SET SESSION max_execution_time = {session.statement_timeout_seconds * 1000}"
+        )
+        cursor.close()
+
+
+def _install_sqlite_session(engine: AsyncEngine, session: SessionSettings) -> None:
+    """Give every SQLite connection its session settings and a progress-handler deadline."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        deadline = SQLiteDeadline()
+        # Runs inside SQLAlchemy's greenlet; the adapter has no await helper of its own in 2.1
+        await_only(
+            dbapi_connection.driver_connection.set_progress_handler(deadline, SQLITE_PROGRESS_STEPS)
+        )
+        connection_record.info["sqlite_deadline"] = deadline
+
+        if session.read_only:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only = ON")
+            cursor.close()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        # A deadline armed for a previous statement must not leak into other work
+        deadline = connection_record.info.get("sqlite_deadline")
+        if deadline is not None:
+            deadline.disarm()
+
+
+def get_connection_options(db_connection: DatabaseConnection) -> ConnectionOptions:
+    """Get per-connection options, with defaults for unset fields.
+    
+    Args:
+        db_connection: Database connection object
+        
+    Returns:
+        ConnectionOptions instance
+    """
+    return ConnectionOptions.model_validate(db_connection.options)
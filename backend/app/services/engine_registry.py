@@ -0,0 +1,270 @@
+"""Process-wide registry of long-lived engines for target databases."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.models.database import DatabaseConnection
+from app.services.db_connection import (
+    ConnectionError,
+    SessionSettings,
+    create_engine_for_database,
+    describe_url,
+    get_connection_options,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EngineEntry:
+    """Registered engine and its bookkeeping."""
+
+    engine: AsyncEngine
+    capacity: int
+    last_used: float
+    session: SessionSettings
+
+
+class EngineRegistry:
+    """Lazily created, shared engines keyed by connection name and URL.
+
+    Engines are reused by the query, metadata and NL2SQL paths so pooled
+    connections survive between requests. A connection with read replicas
+    has one engine per URL. The sum of every engine's pool
+    capacity (``pool_size + max_overflow``) is kept within a global budget,
+    engines that stay idle are disposed by a background sweeper, and
+    connection changes invalidate the affected engines. An engine is also
+    replaced when the connection's session settings change, since pooled
+    connections carry them from connect time.
+    """
+
+    def __init__(
+        self,
+        pool_size: int,
+        max_overflow: int,
+        idle_timeout: float,
+        max_total_connections: int,
+    ):
+        """Initialize engine registry."""
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.idle_timeout = idle_timeout
+        self.max_total_connections = max_total_connections
+        self._entries: dict[tuple[str, str], _EngineEntry] = {}
+        self._lock = asyncio.Lock()
+        self._sweeper: asyncio.Task | None = None
+
+    async def get_engine(
+        self,
+        db_connection: DatabaseConnection,
+        url: str | None = None,
+    ) -> AsyncEngine:
+        """Get the shared engine for a connection, creating it on first use.
+
+        Args:
+            db_connection: Database connection object
+            url: One of the connection's replica URLs (default: its primary URL)
+
+        Returns:
+            AsyncEngine instance
+
+        Raises:
+            ConnectionError: If the global connection budget is exhausted
+        """
+        url = url or db_connection.url
+        key = (db_connection.name, url)
+        session = SessionSettings.from_options(get_connection_options(db_connection))
+        entry = self._entries.get(key)
+        if entry is not None and entry.session == session:
+            entry.last_used = time.monotonic()
+            return entry.engine
+
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.session != session:
+                # URLs the connection no longer has, or a session change, leave engines behind
+                urls = {db_connection.url, *(r["url"] for r in db_connection.replicas)}
+                await self._dispose_matching(
+                    lambda k: k[0] == db_connection.name
+                    and (k[1] not in urls or self._entries[k].session != session)
+                )
+                entry = await self._create_entry(db_connection, url, session)
+                self._entries[key] = entry
+            entry.last_used = time.monotonic()
+            return entry.engine
+
+    def checked_out(self, name: str, url: str) -> int:
+        """Get the number of connections in use on one URL of a connection.
+
+        Args:
+            name: Database connection name
+            url: Primary or replica URL
+
+        Returns:
+            Checked-out connections (0 if no engine is registered)
+        """
+        entry = self._entries.get((name, url))
+        return _checked_out(entry.engine) if entry is not None else 0
+
+    async def invalidate(self, name: str) -> None:
+        """Dispose every engine registered for a connection name.
+
+        Args:
+            name: Database connection name
+        """
+        async with self._lock:
+            await self._dispose_matching(lambda k: k[0] == name)
+
+    async def evict_idle(self) -> int:
+        """Dispose engines that have been idle longer than the idle timeout.
+
+        Returns:
+            Number of engines disposed
+        """
+        now = time.monotonic()
+        async with self._lock:
+            return await self._dispose_matching(
+                lambda k: now - self._entries[k].last_used > self.idle_timeout
+                and _checked_out(self._entries[k].engine) == 0
+            )
+
+    def start(self) -> None:
+        """Start the background idle sweeper."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def close(self) -> None:
+        """Stop the sweeper and dispose all engines."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        async with self._lock:
+            await self._dispose_matching(lambda k: True)
+
+    def stats(self) -> dict[str, Any]:
+        """Get registry statistics."""
+        now = time.monotonic()
+        return {
+            "engineCount": len(self._entries),
+            "totalCapacity": self._total_capacity(),
+            "maxTotalConnections": self.max_total_connections,
+            "engines": [
+                {
+                    "name": name,
+                    "url": describe_url(url),
+                    "capacity": entry.capacity,
+                    "checkedOut": _checked_out(entry.engine),
+                    "idleSeconds": round(now - entry.last_used, 1),
+                }
+                for (name, url), entry in self._entries.items()
+            ],
+        }
+
+    async def _create_entry(
+        self,
+        db_connection: DatabaseConnection,
+        url: str,
+        session: SessionSettings,
+    ) -> _EngineEntry:
+        """Create an engine that fits into the remaining connection budget."""
+        wanted = self.pool_size + self.max_overflow
+        available = self.max_total_connections - self._total_capacity()
+
+        if available < wanted:
+            await self._evict_lru(wanted - available)
+            available = self.max_total_connections - self._total_capacity()
+
+        if available < 1:
+            raise ConnectionError(
+                "Connection budget exhausted",
+                {
+                    "maxTotalConnections": self.max_total_connections,
+                    "registeredEngines": len(self._entries),
+                },
+            )
+
+        pool_size = min(self.pool_size, available)
+        max_overflow = max(0, min(self.max_overflow, available - pool_size))
+        engine = create_engine_for_database(
+            url,
+            db_connection.database_type,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            session=session,
+        )
+        logger.info(
+            f"Created engine for '{db_connection.name}' at {describe_url(url)} "
+            f"(pool_size={pool_size}, max_overflow={max_overflow})"
+        )
+        return _EngineEntry(
+            engine=engine,
+            capacity=pool_size + max_overflow,
+            last_used=time.monotonic(),
+            session=session,
+        )
+
+    async def _evict_lru(self, needed: int) -> None:
+        """Dispose least recently used idle engines until enough capacity is free."""
+        idle = sorted(
+            (k for k, e in self._entries.items() if _checked_out(e.engine) == 0),
+            key=lambda k: self._entries[k].last_used,
+        )
+        freed = 0
+        for key in idle:
+            if freed >= needed:
+                break
+            freed += self._entries[key].capacity
+            await self._dispose_matching(lambda k, key=key: k == key)
+
+    async def _dispose_matching(self, predicate) -> int:
+        """Remove and dispose engines whose key matches the predicate."""
+        keys = [k for k in self._entries if predicate(k)]
+        for key in keys:
+            entry = self._entries.pop(key)
+            try:
+                await entry.engine.dispose()
+            except Exception as e:
+                logger.warning(f"Failed to dispose engine for '{key[0]}': {e}")
+        return len(keys)
+
+    def _total_capacity(self) -> int:
+        """Get the pool capacity reserved by all registered engines."""
+        return sum(entry.capacity for entry in self._entries.values())
+
+    async def _sweep_forever(self) -> None:
+        """Periodically evict idle engines."""
+        interval = max(1.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = await self.evict_idle()
+                if evicted:
+                    logger.info(f"Evicted {evicted} idle engine(s)")
+            except Exception as e:
+                logger.warning(f"Idle engine sweep failed: {e}")
+
+
+def _checked_out(engine: AsyncEngine) -> int:
+    """Get the number of connections currently checked out of an engine's pool."""
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+# Engine registry instance
+engine_registry = EngineRegistry(
+    pool_size=settings.target_pool_size,
+    max_overflow=settings.target_max_overflow,
+    idle_timeout=settings.target_engine_idle_timeout_seconds,
+    max_total_connections=settings.target_max_total_connections,
+)
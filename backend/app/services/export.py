@@ -8,9 +8,12 @@ import json
 from datetime import datetime, date
 from decimal import Decimal
 from io import StringIO
+from collections.abc import Iterable, Iterator
 from typing import Any, Dict, List, Optional
 from enum import Enum
 
+from app.services.cpu_offload import cpu_offloader, cheap_to_ship
+
 
 class ExportFormat(str, Enum):
     """支持的导出格式"""
@@ -163,6 +166,97 @@ class ExportService:
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
+    @staticmethod
+    def export_stream(
+        columns: list[dict[str, Any]],
+        batches: Iterable[list[tuple]],
+        format: ExportFormat,
+        row_count: int
+    ) -> Iterator[str]:
+        """
+        分批导出查询结果，逐块生成导出内容（用于落盘的大结果集）
+
+        Args:
+            columns: 列定义列表
+            batches: 按批读取的数据行（元组，顺序与列定义一致）
+            format: 导出格式
+            row_count: 总行数
+
+        Yields:
+            导出内容片段，拼接后与 export_data 的非格式化输出一致
+        """
+        column_names = [col["name"] for col in columns]
+
+        if format == ExportFormat.CSV:
+            if not row_count:
+                return
+            yield ExportService._csv_chunk([column_names])
+            for batch in batches:
+                # 大批次（值易于序列化时）交给工作进程编码
+                chunk = "".join(cpu_offloader.map_sync(
+                    ExportService._csv_chunk, batch, len(column_names),
+                    offloadable=not batch or cheap_to_ship(batch[0])
+                ))
+                if chunk:
+                    yield chunk
+
+        elif format == ExportFormat.JSON:
+            yield '{"columns": ' + json.dumps(columns, ensure_ascii=False) + ', "rows": ['
+            separator = ""
+            for batch in batches:
+                chunk = ", ".join(part for part in cpu_offloader.map_sync(
+                    ExportService._json_chunk, batch, len(column_names), column_names,
+                    offloadable=not batch or cheap_to_ship(batch[0])
+                ) if part)
+                if chunk:
+                    yield separator + chunk
+                    separator = ", "
+            exported_at = datetime.now().isoformat()
+            yield '], "rowCount": ' + str(row_count) + ', "exportedAt": "' + exported_at + '"}'
+
+        else:
+            raise ValueError(f"Unsupported export format: {format}")
+
+    @staticmethod
+    def _csv_chunk(rows: list[tuple]) -> str:
+        """
+        将一批数据行编码为CSV文本（可在工作进程中执行）
+
+        Args:
+            rows: 数据行（元组，顺序与列定义一致）
+
+        Returns:
+            CSV文本
+        """
+        output = StringIO()
+        writer = csv.writer(output)
+        for row in rows:
+            writer.writerow([ExportService._serialize_value(value) for value in row])
+        return output.getvalue()
+
+    @staticmethod
+    def _json_chunk(rows: list[tuple], column_names: list[str]) -> str:
+        """
+        将一批数据行编码为以逗号分隔的JSON对象（可在工作进程中执行）
+
+        Args:
+            rows: 数据行（元组，顺序与列定义一致）
+            column_names: 列名列表
+
+        Returns:
+            JSON对象文本，以 ", " 分隔
+        """
+        return ", ".join(
+            json.dumps(
+                {
+                    name: ExportService._serialize_value(value)
+                    for name, value in zip(column_names, row)
+                },
+                ensure_ascii=False
+            )
+            for row in rows
+        )
+
 
 # 导出服务实例
 export_service = ExportService()
@@ -0,0 +1,255 @@
+"""Query history retention and archiving."""
+
+import asyncio
+import gzip
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import and_, or_
+from sqlmodel import delete, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.database import DatabaseConnection
+from app.models.query import QueryHistory
+from app.services.db_connection import get_connection_options
+
+logger = logging.getLogger(__name__)
+
+# Rows moved to the archive per transaction
+ARCHIVE_CHUNK_SIZE = 5000
+
+
+class HistoryRetention:
+    """Enforces per-database history retention outside the query path.
+
+    Each connection keeps its ``historyKeepLast`` most recent entries and,
+    if ``historyMaxAgeDays`` is set, nothing older than that. A database is
+    swept once ``sweep_after_writes`` entries have been written for it since
+    its last sweep, and every database is swept every ``sweep_interval``
+    seconds. Both bounds are located through the ``(database_name,
+    executed_at)`` index. With an archive directory, removed entries are
+    appended to gzip NDJSON files with one file per database and day instead
+    of being discarded.
+    """
+
+    def __init__(
+        self,
+        sweep_interval: float,
+        sweep_after_writes: int,
+        archive_dir: Path | None = None,
+    ):
+        """Initialize history retention."""
+        self.sweep_interval = sweep_interval
+        self.sweep_after_writes = sweep_after_writes
+        self.archive_dir = archive_dir
+        self._writes: dict[str, int] = defaultdict(int)
+        self._due: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._counters = {"sweeps": 0, "deleted": 0, "archived": 0}
+
+    def note_writes(self, counts: dict[str, int]) -> None:
+        """Count newly written entries and schedule sweeps that became due.
+
+        Args:
+            counts: Number of entries written per database name
+        """
+        for db_name, count in counts.items():
+            self._writes[db_name] += count
+            if self._writes[db_name] >= self.sweep_after_writes:
+                self._due.add(db_name)
+
+        if self._due:
+            self._wakeup.set()
+
+    async def sweep(self, db_names: Iterable[str] | None = None) -> int:
+        """Apply retention to some or all databases.
+
+        Args:
+            db_names: Database names to sweep, or None for every connection
+
+        Returns:
+            Number of history entries removed
+        """
+        async with self._lock:
+            async with async_session_maker() as session:
+                statement = select(DatabaseConnection)
+                if db_names is not None:
+                    statement = statement.where(DatabaseConnection.name.in_(list(db_names)))
+                connections = (await session.execute(statement)).scalars().all()
+
+            removed = 0
+            for db_connection in connections:
+                try:
+                    removed += await self._sweep_database(db_connection)
+                except Exception as e:
+                    logger.warning(f"History retention failed for '{db_connection.name}': {e}")
+            return removed
+
+    def start(self) -> None:
+        """Start the background sweeper."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_forever())
+
+    async def close(self) -> None:
+        """Stop the background sweeper."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get retention statistics."""
+        return {**self._counters, "archiveEnabled": self.archive_dir is not None}
+
+    async def _sweep_database(self, db_connection: DatabaseConnection) -> int:
+        """Remove the entries of one database that fall outside its retention."""
+        db_name = db_connection.name
+        options = get_connection_options(db_connection)
+        self._writes[db_name] = 0
+        self._due.discard(db_name)
+
+        async with async_session_maker() as session:
+            expired = await _expired_condition(
+                session, db_name, options.history_keep_last, options.history_max_age_days
+            )
+            if expired is None:
+                return 0
+
+            if self.archive_dir is None:
+                result = await session.execute(delete(QueryHistory).where(expired))
+                await session.commit()
+                removed = result.rowcount or 0
+            else:
+                removed = await self._archive(session, db_name, expired)
+
+        self._counters["sweeps"] += 1
+        self._counters["deleted"] += removed
+        return removed
+
+    async def _archive(self, session, db_name: str, expired) -> int:
+        """Move expired entries into daily archive files, chunk by chunk."""
+        moved = 0
+        while True:
+            statement = (
+                select(QueryHistory)
+                .where(expired)
+                .order_by(QueryHistory.executed_at, QueryHistory.id)
+                .limit(ARCHIVE_CHUNK_SIZE)
+            )
+            entries = (await session.execute(statement)).scalars().all()
+            if not entries:
+                return moved
+
+            by_day: dict[str, list[str]] = defaultdict(list)
+            for entry in entries:
+                by_day[entry.executed_at.date().isoformat()].append(_archive_line(entry))
+            await asyncio.to_thread(self._append_archive, db_name, by_day)
+
+            ids = [entry.id for entry in entries]
+            await session.execute(delete(QueryHistory).where(QueryHistory.id.in_(ids)))
+            await session.commit()
+
+            moved += len(ids)
+            self._counters["archived"] += len(ids)
+
+    def _append_archive(self, db_name: str, by_day: dict[str, list[str]]) -> None:
+        """Append archive lines to each day's file."""
+        db_dir = self.archive_dir / db_name
+        db_dir.mkdir(parents=True, exist_ok=True)
+        for day, lines in by_day.items():
+            # Appending adds a gzip member; readers decompress the members in sequence
+            with gzip.open(db_dir / f"{day}.ndjson.gz", "at", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    async def _sweep_forever(self) -> None:
+        """Sweep due databases as they come up and all databases periodically."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sweep_interval)
+                db_names = list(self._due)
+            except TimeoutError:
+                db_names = None
+            self._wakeup.clear()
+
+            try:
+                removed = await self.sweep(db_names)
+                if removed:
+                    logger.info(f"Removed {removed} query history entries")
+            except Exception as e:
+                logger.warning(f"History retention sweep failed: {e}")
+
+
+async def _expired_condition(
+    session,
+    db_name: str,
+    keep_last: int,
+    max_age_days: int | None,
+):
+    """Build the condition matching a database's expired entries, or None if there are none."""
+    conditions = []
+
+    # Newest entry that no longer fits into keep_last
+    statement = (
+        select(QueryHistory.executed_at, QueryHistory.id)
+        .where(QueryHistory.database_name == db_name)
+        .order_by(QueryHistory.executed_at.desc(), QueryHistory.id.desc())
+        .offset(keep_last)
+        .limit(1)
+    )
+    boundary = (await session.execute(statement)).first()
+    if boundary is not None:
+        executed_at, entry_id = boundary
+        conditions.append(or_(
+            QueryHistory.executed_at < executed_at,
+            and_(QueryHistory.executed_at == executed_at, QueryHistory.id <= entry_id),
+        ))
+
+    if max_age_days is not None:
+        conditions.append(
+            QueryHistory.executed_at < datetime.utcnow() - timedelta(days=max_age_days)
+        )
+
+    if not conditions:
+        return None
+
+    return and_(QueryHistory.database_name == db_name, or_(*conditions))
+
+
+def _archive_line(entry: QueryHistory) -> str:
+    """Serialize a history entry as one archive line."""
+    return json.dumps({
+        "id": entry.id,
+        "executedAt": entry.executed_at.isoformat(),
+        "sqlText": entry.sql_text,
+        "executionTimeMs": entry.execution_time_ms,
+        "rowCount": entry.row_count,
+        "success": entry.success,
+        "errorMessage": entry.error_message,
+        "querySource": entry.query_source.value,
+    }, ensure_ascii=False) + "\n"
+
+
+def _archive_dir() -> Path | None:
+    """Get the history archive directory, if enabled."""
+    if not settings.history_archive_enabled:
+        return None
+    return Path(__file__).parent.parent.parent / "db" / "history_archive"
+
+
+# History retention instance
+history_retention = HistoryRetention(
+    sweep_interval=settings.history_sweep_interval_seconds,
+    sweep_after_writes=settings.history_sweep_after_writes,
+    archive_dir=_archive_dir(),
+)
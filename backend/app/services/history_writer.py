@@ -0,0 +1,116 @@
+"""Background writer that records query history in batched transactions."""
+
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Any
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.query import QueryHistory
+from app.services.history_retention import history_retention
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """In-process queue of query history entries drained by a background task.
+
+    Recording an entry only appends it to the queue, so query latency does
+    not include app database writes. The drain task writes everything queued
+    in one transaction once ``batch_size`` entries are waiting or
+    ``flush_interval`` seconds have passed, and reports the written counts
+    to history retention. At most ``max_pending`` entries are held; when
+    writes fall behind, the oldest entries are dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+    ):
+        """Initialize history writer."""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: deque[dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._counters = {"written": 0, "batches": 0, "dropped": 0, "failed": 0}
+
+    def record(self, **entry: Any) -> None:
+        """Queue a history entry.
+
+        Args:
+            **entry: QueryHistory field values
+        """
+        self._pending.append(entry)
+        if len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self._counters["dropped"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every queued entry."""
+        async with self._lock:
+            while self._pending:
+                count = min(len(self._pending), self.batch_size)
+                batch = [self._pending.popleft() for _ in range(count)]
+                await self._write(batch)
+
+    def start(self) -> None:
+        """Start the background drain task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain_forever())
+
+    async def close(self) -> None:
+        """Stop the drain task and write what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        """Get writer statistics."""
+        return {**self._counters, "pending": len(self._pending)}
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        """Insert a batch in a single transaction."""
+        try:
+            async with async_session_maker() as session:
+                session.add_all([QueryHistory(**entry) for entry in batch])
+                await session.commit()
+        except Exception as e:
+            self._counters["failed"] += len(batch)
+            logger.warning(f"Failed to write {len(batch)} query history entries: {e}")
+            return
+
+        self._counters["written"] += len(batch)
+        self._counters["batches"] += 1
+        history_retention.note_writes(Counter(entry["database_name"] for entry in batch))
+
+    async def _drain_forever(self) -> None:
+        """Flush when a batch fills up or the flush interval elapses."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+# History writer instance
+history_writer = HistoryWriter(
+    batch_size=settings.history_batch_size,
+    flush_interval=settings.history_flush_interval_seconds,
+    max_pending=settings.history_max_pending,
+)
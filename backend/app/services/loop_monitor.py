@@ -0,0 +1,86 @@
+"""Measurement of event loop lag."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs scheduled callbacks.
+
+    A background task sleeps for ``interval`` seconds at a time; how much
+    later than that it wakes up is the lag every other request saw at that
+    moment, caused by code holding the loop (or the GIL) without yielding.
+    Percentiles cover the last ``window`` samples. Lags above
+    ``threshold_ms`` are counted and logged.
+    """
+
+    def __init__(self, interval: float, window: int, threshold_ms: float):
+        """Initialize loop lag monitor."""
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self._samples: deque[float] = deque(maxlen=window)
+        self._max_ms = 0.0
+        self._over_threshold = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample_forever())
+
+    async def close(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get lag percentiles over the window and the maximum since start."""
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> float | None:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            "samples": len(samples),
+            "intervalMs": self.interval * 1000,
+            "p50Ms": percentile(0.5),
+            "p99Ms": percentile(0.99),
+            "windowMaxMs": round(samples[-1], 2) if samples else None,
+            "maxMs": round(self._max_ms, 2),
+            "thresholdMs": self.threshold_ms,
+            "overThreshold": self._over_threshold,
+        }
+
+    async def _sample_forever(self) -> None:
+        """Record the lag of each wake-up."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - started - self.interval) * 1000)
+            self._samples.append(lag_ms)
+            self._max_ms = max(self._max_ms, lag_ms)
+            if lag_ms > self.threshold_ms:
+                self._over_threshold += 1
+                logger.warning(f"Event loop blocked for {lag_ms:.0f} ms")
+
+
+# Loop lag monitor instance
+loop_monitor = LoopLagMonitor(
+    interval=settings.loop_lag_interval_seconds,
+    window=settings.loop_lag_window_samples,
+    threshold_ms=settings.loop_lag_threshold_ms,
+)
@@ -1,14 +1,52 @@
 """Metadata extraction service for multiple database types."""
 
 import json
+import logging
+import re
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from app.models.database import DatabaseType
 from app.models.metadata import DatabaseMetadata
 from app.models.schemas import TableMetadata, ColumnMetadata
-from app.services.db_connection import create_engine_for_database, ConnectionError
+from app.services.catalog import CatalogReader, get_catalog_reader
+from app.services.db_connection import ConnectionError
+from app.services.replica_router import replica_router
+from app.services.row_counts import exact_row_counter
+from app.services.single_flight import metadata_flights
+from app.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Integer and string key types; interval, point, tinytext and the like do not qualify
+_KEYSET_TYPE_PATTERN = re.compile(
+    r"^(?:(?:tiny|small|medium|big)?int(?:eger)?|(?:var)?char(?:acter)?|(?:small|big)?serial)"
+    r"(?![a-z])|^text$",
+    re.IGNORECASE,
+)
+
+# Above this many changed relations, reading all columns beats a long IN list
+_MAX_FILTERED_RELATIONS = 500
+
+
+@dataclass
+class MetadataChanges:
+    """Result of an incremental metadata extraction.
+
+    Attributes:
+        metadata: Complete metadata dictionary
+        schema_version: Schema version probe at extraction
+        fingerprints: Column fingerprints by (schema, relation) at extraction
+        changed: Number of added or changed relations whose columns were read
+        dropped: Number of cached relations that no longer exist
+    """
+
+    metadata: dict[str, Any]
+    schema_version: str
+    fingerprints: dict[tuple[str, str], str]
+    changed: int
+    dropped: int
 
 
 async def extract_metadata_postgresql(engine: AsyncEngine) -> dict[str, Any]:
@@ -20,58 +58,7 @@ async def extract_metadata_postgresql(engine: AsyncEngine) -> dict[str, Any]:
     Returns:
         Dictionary with tables and views metadata
     """
-    tables_metadata = []
-    views_metadata = []
-    
-    async with engine.connect() as conn:
-        # Get all tables
-        tables_query = text("""
-            SELECT schemaname, tablename
-            FROM pg_tables
-            WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
-            ORDER BY schemaname, tablename
-        """)
-        tables_result = await conn.execute(tables_query)
-        
-        for row in tables_result:
-            schema_name = row[0]
-            table_name = row[1]
-            columns = await _get_postgresql_columns(conn, schema_name, table_name)
-            row_count = await _get_postgresql_row_count(conn, schema_name, table_name)
-            
-            tables_metadata.append({
-                "name": table_name,
-                "type": "table",
-                "schemaName": schema_name,
-                "columns": columns,
-                "rowCount": row_count,
-            })
-        
-        # Get all views
-        views_query = text("""
-            SELECT schemaname, viewname
-            FROM pg_views
-            WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
-            ORDER BY schemaname, viewname
-        """)
-        views_result = await conn.execute(views_query)
-        
-        for row in views_result:
-            schema_name = row[0]
-            view_name = row[1]
-            columns = await _get_postgresql_columns(conn, schema_name, view_name)
-            
-            views_metadata.append({
-                "name": view_name,
-                "type": "view",
-                "schemaName": schema_name,
-                "columns": columns,
-            })
-    
-    return {
-        "tables": tables_metadata,
-        "views": views_metadata,
-    }
+    return await _extract_all(engine, get_catalog_reader(DatabaseType.POSTGRESQL))
 
 
 async def extract_metadata_mysql(engine: AsyncEngine) -> dict[str, Any]:
@@ -83,50 +70,7 @@ async def extract_metadata_mysql(engine: AsyncEngine) -> dict[str, Any]:
     Returns:
         Dictionary with tables and views metadata
     """
-    tables_metadata = []
-    views_metadata = []
-    
-    async with engine.connect() as conn:
-        # Get database name from connection
-        db_query = text("SELECT DATABASE()")
-        db_result = await conn.execute(db_query)
-        db_name = db_result.scalar()
-        
-        # Get all tables and views
-        tables_query = text("""
-            SELECT table_schema, table_name, table_type
-            FROM information_schema.tables
-            WHERE table_schema NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')
-            AND table_schema = :db_name
-            ORDER BY table_name
-        """)
-        tables_result = await conn.execute(tables_query, {"db_name": db_name})
-        
-        for row in tables_result:
-            schema_name = row[0]
-            table_name = row[1]
-            table_type = row[2]
-            
-            columns = await _get_mysql_columns(conn, schema_name, table_name)
-            
-            metadata = {
-                "name": table_name,
-                "type": "table" if table_type == "BASE TABLE" else "view",
-                "schemaName": schema_name,
-                "columns": columns,
-            }
-            
-            if table_type == "BASE TABLE":
-                row_count = await _get_mysql_row_count(conn, schema_name, table_name)
-                metadata["rowCount"] = row_count
-                tables_metadata.append(metadata)
-            else:
-                views_metadata.append(metadata)
-    
-    return {
-        "tables": tables_metadata,
-        "views": views_metadata,
-    }
+    return await _extract_all(engine, get_catalog_reader(DatabaseType.MYSQL))
 
 
 async def extract_metadata_sqlite(engine: AsyncEngine) -> dict[str, Any]:
@@ -138,44 +82,7 @@ async def extract_metadata_sqlite(engine: AsyncEngine) -> dict[str, Any]:
     Returns:
         Dictionary with tables and views metadata
     """
-    tables_metadata = []
-    views_metadata = []
-    
-    async with engine.connect() as conn:
-        # Get all tables
-        tables_query = text("""
-            SELECT name, type
-            FROM sqlite_master
-            WHERE type IN ('table', 'view')
-            AND name NOT LIKE 'sqlite_%'
-            ORDER BY name
-        """)
-        tables_result = await conn.execute(tables_query)
-        
-        for row in tables_result:
-            table_name = row[0]
-            table_type = row[1]
-            
-            columns = await _get_sqlite_columns(conn, table_name)
-            
-            metadata = {
-                "name": table_name,
-                "type": table_type,
-                "schemaName": "main",
-                "columns": columns,
-            }
-            
-            if table_type == "table":
-                row_count = await _get_sqlite_row_count(conn, table_name)
-                metadata["rowCount"] = row_count
-                tables_metadata.append(metadata)
-            else:
-                views_metadata.append(metadata)
-    
-    return {
-        "tables": tables_metadata,
-        "views": views_metadata,
-    }
+    return await _extract_all(engine, get_catalog_reader(DatabaseType.SQLITE))
 
 
 async def extract_metadata(engine: AsyncEngine, database_type: DatabaseType) -> dict[str, Any]:
@@ -188,121 +95,193 @@ async def extract_metadata(engine: AsyncEngine, database_type: DatabaseType) ->
     Returns:
         Dictionary with tables and views metadata
     """
-    if database_type == DatabaseType.POSTGRESQL:
-        return await extract_metadata_postgresql(engine)
-    elif database_type == DatabaseType.MYSQL:
-        return await extract_metadata_mysql(engine)
-    elif database_type == DatabaseType.SQLITE:
-        return await extract_metadata_sqlite(engine)
-    else:
-        raise ValueError(f"Unsupported database type: {database_type}")
-
-
-async def _get_postgresql_columns(conn: AsyncSession, schema: str, table: str) -> list[dict[str, Any]]:
-    """Get PostgreSQL table columns."""
-    query = text("""
-        SELECT
-            column_name,
-            data_type,
-            is_nullable,
-            column_default
-        FROM information_schema.columns
-        WHERE table_schema = :schema AND table_name = :table
-        ORDER BY ordinal_position
-    """)
-    result = await conn.execute(query, {"schema": schema, "table": table})
-    
-    # Get primary keys
-    pk_query = text("""
-        SELECT kcu.column_name
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-            ON tc.constraint_name = kcu.constraint_name
-        WHERE tc.table_schema = :schema
-            AND tc.table_name = :table
-            AND tc.constraint_type = 'PRIMARY KEY'
-    """)
-    pk_result = await conn.execute(pk_query, {"schema": schema, "table": table})
-    primary_keys = {row[0] for row in pk_result}
-    
-    columns = []
-    for row in result:
-        columns.append({
-            "name": row[0],
-            "dataType": row[1],
-            "nullable": row[2] == "YES",
-            "primaryKey": row[0] in primary_keys,
-            "defaultValue": row[3],
-        })
-    
-    return columns
-
-
-async def _get_postgresql_row_count(conn: AsyncSession, schema: str, table: str) -> int:
-    """Get PostgreSQL table row count."""
-    query = text(f'SELECT COUNT(*) FROM "{schema}"."{table}"')
-    result = await conn.execute(query)
-    return result.scalar() or 0
-
-
-async def _get_mysql_columns(conn: AsyncSession, schema: str, table: str) -> list[dict[str, Any]]:
-    """Get MySQL table columns."""
-    query = text("""
-        SELECT
-            column_name,
-            data_type,
-            is_nullable,
-            column_default,
-            column_key
-        FROM information_schema.columns
-        WHERE table_schema = :schema AND table_name = :table
-        ORDER BY ordinal_position
-    """)
-    result = await conn.execute(query, {"schema": schema, "table": table})
-    
-    columns = []
-    for row in result:
-        columns.append({
-            "name": row[0],
-            "dataType": row[1],
-            "nullable": row[2] == "YES",
-            "primaryKey": "PRI" in (row[4] or ""),
-            "defaultValue": row[3],
-        })
-    
-    return columns
+    return await _extract_all(engine, get_catalog_reader(database_type))
+
 
+async def extract_metadata_changes(
+    engine: AsyncEngine,
+    database_type: DatabaseType,
+    cached: DatabaseMetadata | None,
+) -> MetadataChanges:
+    """Extract metadata, re-reading only the columns of changed relations.
 
-async def _get_mysql_row_count(conn: AsyncSession, schema: str, table: str) -> int:
-    """Get MySQL table row count."""
-    query = text(f"SELECT COUNT(*) FROM `{schema}`.`{table}`")
-    result = await conn.execute(query)
-    return result.scalar() or 0
+    A cheap schema version probe tells whether anything may have changed
+    since the cached metadata was extracted. If so, per-relation
+    fingerprints single out the relations whose columns changed, and only
+    their columns are read; the other relations keep their cached columns.
+    The relation listing, with its row estimates, is read every time, so
+    added and dropped relations are picked up and estimates stay current.
+
+    Args:
+        engine: SQLAlchemy async engine
+        database_type: Database type
+        cached: Cached metadata of the connection, stale or not, if any
 
+    Returns:
+        MetadataChanges with the complete metadata and what was re-read
+    """
+    catalog = get_catalog_reader(database_type)
+    previous_columns: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    previous_fingerprints: dict[tuple[str, str], str] = {}
+    if cached is not None and cached.fingerprints_json:
+        previous = json.loads(cached.metadata_json)
+        for relation in previous.get("tables", []) + previous.get("views", []):
+            key = (relation.get("schemaName"), relation["name"])
+            previous_columns[key] = relation.get("columns", [])
+        previous_fingerprints = {
+            (schema, name): fingerprint
+            for schema, name, fingerprint in json.loads(cached.fingerprints_json)
+        }
 
-async def _get_sqlite_columns(conn: AsyncSession, table: str) -> list[dict[str, Any]]:
-    """Get SQLite table columns."""
-    query = text(f"PRAGMA table_info({table})")
-    result = await conn.execute(query)
+    async with engine.connect() as conn:
+        # Probe before reading the catalog: a change made in between then
+        # shows in the next refresh instead of being recorded as seen
+        schema_version = await catalog.schema_version(conn)
+        if previous_fingerprints and schema_version == cached.schema_version:
+            fingerprints = previous_fingerprints
+        else:
+            fingerprints = await catalog.fingerprints(conn)
+
+        relations = await catalog.relations(conn)
+        listed = {(schema, name) for schema, name, _, _ in relations}
+        changed = {
+            key for key in listed
+            if key not in previous_columns
+            or fingerprints.get(key) != previous_fingerprints.get(key)
+        }
+        names = sorted({name for _, name in changed})
+        if len(names) > _MAX_FILTERED_RELATIONS:
+            columns = await catalog.columns(conn, None)
+        elif names:
+            columns = await catalog.columns(conn, names)
+        else:
+            columns = {}
+
+    for key in listed - changed:
+        columns[key] = previous_columns[key]
+
+    return MetadataChanges(
+        metadata=_assemble_metadata(relations, columns),
+        schema_version=schema_version,
+        fingerprints={key: value for key, value in fingerprints.items() if key in listed},
+        changed=len(changed),
+        dropped=len(previous_columns.keys() - listed),
+    )
+
+
+async def _extract_all(engine: AsyncEngine, catalog: CatalogReader) -> dict[str, Any]:
+    """Extract the metadata of all relations with the given catalog queries."""
+    async with engine.connect() as conn:
+        relations = await catalog.relations(conn)
+        columns = await catalog.columns(conn, None)
+    return _assemble_metadata(relations, columns)
+
+
+def _assemble_metadata(
+    relations: list,
+    columns: dict[tuple[str, str], list[dict[str, Any]]],
+) -> dict[str, Any]:
+    """Build the metadata dictionary from catalog query results.
+
+    Args:
+        relations: Rows of (schema, name, "table" or "view", estimated row
+            count or None), in listing order
+        columns: Columns by (schema, name)
+
+    Returns:
+        Dictionary with tables and views metadata
+    """
+    tables_metadata = []
+    views_metadata = []
     
-    columns = []
-    for row in result:
-        columns.append({
-            "name": row[1],
-            "dataType": row[2],
-            "nullable": not row[3],
-            "primaryKey": bool(row[5]),
-            "defaultValue": row[4],
-        })
+    for schema_name, name, relation_type, row_estimate in relations:
+        metadata = {
+            "name": name,
+            "type": relation_type,
+            "schemaName": schema_name,
+            "columns": columns.get((schema_name, name), []),
+        }
+        
+        if relation_type == "table":
+            metadata["rowCount"] = row_estimate
+            metadata["rowCountKind"] = "estimated" if row_estimate is not None else None
+            tables_metadata.append(metadata)
+        else:
+            views_metadata.append(metadata)
     
-    return columns
+    return {
+        "tables": tables_metadata,
+        "views": views_metadata,
+    }
+
+
+def get_keyset_columns(metadata_dict: dict[str, Any]) -> dict[str, list[str]]:
+    """Map tables to primary key columns usable for keyset pagination.
+
+    Tables are keyed by lowercase ``schema.table`` and, when the name is
+    unique across schemas, by lowercase ``table``. Only integer and string
+    keys qualify, since their values round-trip through a JSON token.
+
+    Args:
+        metadata_dict: Metadata dictionary
+
+    Returns:
+        Mapping of table name to ordered primary key column names
+    """
+    keys: dict[str, list[str]] = {}
+    seen_names: dict[str, int] = {}
+
+    for table in metadata_dict.get("tables", []):
+        columns = table.get("columns", [])
+        pk_columns = [col for col in columns if col.get("primaryKey")]
+        if not pk_columns or not all(
+            _KEYSET_TYPE_PATTERN.search(col.get("dataType") or "") for col in pk_columns
+        ):
+            continue
+
+        name = table["name"].lower()
+        pk_names = [col["name"] for col in pk_columns]
+        keys[f"{table.get('schemaName', '').lower()}.{name}"] = pk_names
+        seen_names[name] = seen_names.get(name, 0) + 1
+        keys.setdefault(name, pk_names)
+
+    for name, count in seen_names.items():
+        if count > 1:
+            keys.pop(name, None)
+
+    return keys
+
 
+def get_table_row_counts(metadata_dict: dict[str, Any]) -> dict[str, int]:
+    """Map tables to their row counts from extracted metadata.
 
-async def _get_sqlite_row_count(conn: AsyncSession, table: str) -> int:
-    """Get SQLite table row count."""
-    query = text(f"SELECT COUNT(*) FROM {table}")
-    result = await conn.execute(query)
-    return result.scalar() or 0
+    Tables are keyed like in get_keyset_columns: by lowercase
+    ``schema.table`` and, when the name is unique across schemas, by
+    lowercase ``table``.
+
+    Args:
+        metadata_dict: Metadata dictionary
+
+    Returns:
+        Mapping of table name to row count, for tables with a known count
+    """
+    counts: dict[str, int] = {}
+    seen_names: dict[str, int] = {}
+
+    for table in metadata_dict.get("tables", []):
+        if table.get("rowCount") is None:
+            continue
+
+        name = table["name"].lower()
+        counts[f"{table.get('schemaName', '').lower()}.{name}"] = table["rowCount"]
+        seen_names[name] = seen_names.get(name, 0) + 1
+        counts.setdefault(name, table["rowCount"])
+
+    for name, count in seen_names.items():
+        if count > 1:
+            counts.pop(name, None)
+
+    return counts
 
 
 async def get_cached_metadata(session: AsyncSession, database_name: str) -> DatabaseMetadata | None:
@@ -315,11 +294,7 @@ async def get_cached_metadata(session: AsyncSession, database_name: str) -> Data
     Returns:
         DatabaseMetadata if found and not stale, None otherwise
     """
-    from sqlalchemy import select
-    
-    stmt = select(DatabaseMetadata).where(DatabaseMetadata.database_name == database_name)
-    result = await session.execute(stmt)
-    metadata = result.scalar_one_or_none()
+    metadata = await _get_metadata_row(session, database_name)
     
     if metadata and not metadata.is_stale:
         return metadata
@@ -327,10 +302,37 @@ async def get_cached_metadata(session: AsyncSession, database_name: str) -> Data
     return None
 
 
+async def _get_metadata_row(session: AsyncSession, database_name: str) -> DatabaseMetadata | None:
+    """Get the cached metadata row of a connection, stale or not."""
+    from sqlalchemy import select
+    
+    stmt = select(DatabaseMetadata).where(DatabaseMetadata.database_name == database_name)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def delete_cached_metadata(session: AsyncSession, database_name: str) -> None:
+    """Delete the cached metadata of a connection, without committing.
+
+    Used when a connection is removed or points to another target: its
+    schema version and fingerprints describe the previous target and must
+    not be compared with the new one's.
+
+    Args:
+        session: Database session
+        database_name: Database connection name
+    """
+    metadata = await _get_metadata_row(session, database_name)
+    if metadata:
+        await session.delete(metadata)
+
+
 async def save_metadata(
     session: AsyncSession,
     database_name: str,
     metadata_dict: dict[str, Any],
+    schema_version: str | None = None,
+    fingerprints: dict[tuple[str, str], str] | None = None,
 ) -> DatabaseMetadata:
     """Save metadata to database.
     
@@ -338,24 +340,29 @@ async def save_metadata(
         session: Database session
         database_name: Database connection name
         metadata_dict: Metadata dictionary
+        schema_version: Schema version probe at extraction
+        fingerprints: Column fingerprints by (schema, relation) at extraction
         
     Returns:
         Saved DatabaseMetadata instance
     """
-    from sqlalchemy import select
-    
     metadata_json = json.dumps(metadata_dict)
     table_count = len(metadata_dict.get("tables", [])) + len(metadata_dict.get("views", []))
+    fingerprints_json = None
+    if fingerprints is not None:
+        fingerprints_json = json.dumps(
+            [[schema, name, fp] for (schema, name), fp in fingerprints.items()]
+        )
     
     # Check if metadata exists
-    stmt = select(DatabaseMetadata).where(DatabaseMetadata.database_name == database_name)
-    result = await session.execute(stmt)
-    existing = result.scalar_one_or_none()
+    existing = await _get_metadata_row(session, database_name)
     
     if existing:
         existing.metadata_json = metadata_json
         existing.fetched_at = datetime.utcnow()
         existing.table_count = table_count
+        existing.schema_version = schema_version
+        existing.fingerprints_json = fingerprints_json
         await session.commit()
         await session.refresh(existing)
         return existing
@@ -365,6 +372,8 @@ async def save_metadata(
             metadata_json=metadata_json,
             fetched_at=datetime.utcnow(),
             table_count=table_count,
+            schema_version=schema_version,
+            fingerprints_json=fingerprints_json,
         )
         session.add(new_metadata)
         await session.commit()
@@ -372,10 +381,49 @@ async def save_metadata(
         return new_metadata
 
 
+async def refresh_metadata_cache(db_connection) -> tuple[dict[str, Any], datetime]:
+    """Extract fresh metadata for a connection and save it to the cache.
+
+    Concurrent refreshes of the same connection share one extraction, and
+    every caller gets its result. Only relations whose columns changed since
+    the cached metadata, stale or not, are re-read (see
+    extract_metadata_changes). Row counts are estimates; connections with
+    ``rowCounts`` set to ``exact`` have them counted in the background.
+
+    Args:
+        db_connection: DatabaseConnection instance
+
+    Returns:
+        Metadata dictionary and the time it was fetched
+    """
+    name = db_connection.name
+
+    async def refresh() -> tuple[dict[str, Any], datetime]:
+        engine = await replica_router.get_engine(db_connection)
+        async with async_session_maker() as session:
+            cached = await _get_metadata_row(session, name)
+        changes = await extract_metadata_changes(engine, db_connection.database_type, cached)
+        logger.info(
+            f"Metadata refresh of {name}: {changes.changed} relations re-read, "
+            f"{changes.dropped} dropped"
+        )
+
+        metadata_dict = changes.metadata
+        async with async_session_maker() as session:
+            saved = await save_metadata(
+                session, name, metadata_dict, changes.schema_version, changes.fingerprints
+            )
+        exact_row_counter.schedule(db_connection, metadata_dict, saved.fetched_at)
+        return metadata_dict, saved.fetched_at
+
+    return await metadata_flights.do(name, refresh)
+
+
 async def get_database_metadata(db_connection) -> dict[str, Any]:
-    """Get database metadata for a connection (from cache or fresh extraction).
+    """Get fresh database metadata for a connection.
 
     This is a convenience function for getting metadata to pass to NL2SQL service.
+    The extracted metadata also refreshes the cache.
 
     Args:
         db_connection: DatabaseConnection instance
@@ -383,14 +431,5 @@ async def get_database_metadata(db_connection) -> dict[str, Any]:
     Returns:
         Metadata dictionary with tables and views
     """
-    from app.services.db_connection import create_engine_for_database
-
-    # Create engine for target database
-    engine = create_engine_for_database(db_connection.url, db_connection.database_type)
-
-    try:
-        # Extract metadata
-        metadata_dict = await extract_metadata(engine, db_connection.database_type)
-        return metadata_dict
-    finally:
-        await engine.dispose()
+    metadata_dict, _ = await refresh_metadata_cache(db_connection)
+    return metadata_dict
@@ -81,7 +81,9 @@ async def generate_sql_from_natural_language(
 
         # Validate generated SQL
         try:
-            validated_sql = validate_and_transform_sql(sql)
+            validated_sql = validate_and_transform_sql(
+                sql, database_type=db_connection.database_type
+            )
         except SQLValidationError as e:
             raise NL2SQLError(
                 f"Generated SQL failed validation: {e.message}",
@@ -0,0 +1,359 @@
+"""Continuation tokens, held server-side cursors and spilled results for paged query results."""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import secrets
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncResult
+
+from app.config import settings
+from app.services.spool import ResultSpool, claim_process_dir
+
+logger = logging.getLogger(__name__)
+
+KEYSET_MODE = "keyset"
+CURSOR_MODE = "cursor"
+SPILL_MODE = "spill"
+
+
+class PaginationError(Exception):
+    """Continuation token error."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize pagination error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+def sql_hash(sql: str, params: dict[str, Any] | None = None) -> str:
+    """Get a short hash identifying the SQL and bind values a token was issued for."""
+    if params:
+        sql += "\0" + json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_token(payload: dict[str, Any]) -> str:
+    """Encode a continuation token payload as an opaque string."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_token(
+    token: str,
+    db_name: str,
+    validated_sql: str,
+    params: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Decode a continuation token and check it belongs to this query.
+
+    Args:
+        token: Continuation token from a previous page
+        db_name: Database connection name of the current request
+        validated_sql: Validated SQL of the current request
+        params: Bind parameter values of the current request
+
+    Returns:
+        Token payload
+
+    Raises:
+        PaginationError: If the token is malformed or issued for another query
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise PaginationError(
+            "Malformed continuation token",
+            {"reason": "malformed", "error": str(e)}
+        )
+
+    modes = (KEYSET_MODE, CURSOR_MODE, SPILL_MODE)
+    if not isinstance(payload, dict) or payload.get("m") not in modes:
+        raise PaginationError("Malformed continuation token", {"reason": "malformed"})
+
+    if payload.get("db") != db_name or payload.get("h") != sql_hash(validated_sql, params):
+        raise PaginationError(
+            "Continuation token was issued for a different query",
+            {"reason": "mismatch"}
+        )
+
+    return payload
+
+
+@dataclass
+class HeldCursor:
+    """Open server-side cursor waiting for its next page to be requested."""
+
+    db_name: str
+    conn: AsyncConnection
+    result: AsyncResult
+    columns: list[str]
+    description: list | None
+    last_used: float
+    rows_served: int = 0
+    pending: list = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class CursorStore:
+    """Server-side cursors held open between page requests.
+
+    Each held cursor pins one pooled connection, so cursors are closed after
+    an idle timeout and the number held per database is capped, closing the
+    least recently used cursor that is not serving a page when a new one
+    would exceed the cap.
+    """
+
+    def __init__(self, idle_timeout: float, max_open_per_database: int):
+        """Initialize cursor store."""
+        self.idle_timeout = idle_timeout
+        self.max_open_per_database = max_open_per_database
+        self._cursors: dict[str, HeldCursor] = {}
+        self._sweeper: asyncio.Task | None = None
+
+    async def hold(self, cursor: HeldCursor) -> str:
+        """Register an open cursor and return its id.
+
+        Raises:
+            PaginationError: If the database has its maximum of cursors open
+                and all of them are serving a page
+        """
+        open_for_db = [cid for cid, c in self._cursors.items() if c.db_name == cursor.db_name]
+        idle = sorted(
+            (cid for cid in open_for_db if not self._cursors[cid].lock.locked()),
+            key=lambda cid: self._cursors[cid].last_used,
+        )
+        excess = len(open_for_db) - self.max_open_per_database + 1
+        if excess > len(idle):
+            raise PaginationError(
+                f"Too many open cursors on database '{cursor.db_name}'",
+                {"reason": "too_many_cursors", "maxOpenCursors": self.max_open_per_database},
+            )
+        for cursor_id in idle[:max(excess, 0)]:
+            await self.release(cursor_id)
+
+        cursor_id = secrets.token_urlsafe(16)
+        self._cursors[cursor_id] = cursor
+        return cursor_id
+
+    def get(self, cursor_id: str) -> HeldCursor:
+        """Get a held cursor.
+
+        Raises:
+            PaginationError: If the cursor expired or never existed
+        """
+        cursor = self._cursors.get(cursor_id)
+        if cursor is None:
+            raise PaginationError(
+                "Continuation token has expired",
+                {"reason": "expired", "idleTimeoutSeconds": self.idle_timeout}
+            )
+        cursor.last_used = time.monotonic()
+        return cursor
+
+    async def release(self, cursor_id: str) -> None:
+        """Close a held cursor and return its connection to the pool."""
+        cursor = self._cursors.pop(cursor_id, None)
+        if cursor is None:
+            return
+        try:
+            await cursor.result.close()
+            await cursor.conn.close()
+        except Exception as e:
+            logger.warning(f"Failed to close held cursor for '{cursor.db_name}': {e}")
+
+    async def evict_idle(self) -> int:
+        """Close cursors idle longer than the idle timeout."""
+        now = time.monotonic()
+        expired = [
+            cid for cid, c in self._cursors.items()
+            if now - c.last_used > self.idle_timeout and not c.lock.locked()
+        ]
+        for cursor_id in expired:
+            await self.release(cursor_id)
+        return len(expired)
+
+    def start(self) -> None:
+        """Start the background idle sweeper."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def close(self) -> None:
+        """Stop the sweeper and close all held cursors."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        for cursor_id in list(self._cursors):
+            await self.release(cursor_id)
+
+    async def _sweep_forever(self) -> None:
+        """Periodically close idle cursors."""
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.warning(f"Held cursor sweep failed: {e}")
+
+
+@dataclass
+class SpilledResult:
+    """Query result spilled to disk, waiting for its pages to be requested."""
+
+    db_name: str
+    spool: ResultSpool
+    columns: list[dict[str, Any]]
+    last_used: float
+
+
+class SpillStore:
+    """Query results that outgrew their memory budget, kept on local disk.
+
+    Spilled results are removed after an idle timeout, and the total size of
+    the spill files is capped, removing the least recently used results when
+    a new one would exceed the cap. Each process spills into its own
+    directory under ``spill_dir`` (see claim_process_dir).
+    """
+
+    def __init__(self, idle_timeout: float, max_disk_bytes: int, spill_dir: Path):
+        """Initialize spill store."""
+        self.idle_timeout = idle_timeout
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_dir = spill_dir
+        self._dir: Path | None = None
+        self._results: dict[str, SpilledResult] = {}
+        self._sweeper: asyncio.Task | None = None
+        self._counters = {"spilled": 0, "spilledBytes": 0, "evicted": 0}
+
+    def new_spool(self) -> tuple[str, ResultSpool]:
+        """Create an empty spool file for a result that is about to spill.
+
+        Returns:
+            Tuple of (spill_id, spool)
+        """
+        spill_id = secrets.token_urlsafe(16)
+        return spill_id, ResultSpool(self._process_dir() / f"{spill_id}.spool")
+
+    async def hold(self, spill_id: str, result: SpilledResult) -> None:
+        """Register a finished spilled result."""
+        by_age = sorted(self._results, key=lambda sid: self._results[sid].last_used)
+        while by_age and self._disk_bytes() + result.spool.size_bytes > self.max_disk_bytes:
+            await self.release(by_age.pop(0))
+            self._counters["evicted"] += 1
+
+        self._results[spill_id] = result
+        self._counters["spilled"] += 1
+        self._counters["spilledBytes"] += result.spool.size_bytes
+
+    def get(self, spill_id: str) -> SpilledResult:
+        """Get a spilled result.
+
+        Raises:
+            PaginationError: If the result expired or never existed
+        """
+        result = self._results.get(spill_id)
+        if result is None:
+            raise PaginationError(
+                "Continuation token has expired",
+                {"reason": "expired", "idleTimeoutSeconds": self.idle_timeout}
+            )
+        result.last_used = time.monotonic()
+        return result
+
+    async def release(self, spill_id: str) -> None:
+        """Delete a spilled result."""
+        result = self._results.pop(spill_id, None)
+        if result is not None:
+            await asyncio.to_thread(result.spool.remove)
+
+    async def evict_idle(self) -> int:
+        """Delete spilled results idle longer than the idle timeout."""
+        now = time.monotonic()
+        expired = [
+            sid for sid, r in self._results.items()
+            if now - r.last_used > self.idle_timeout
+        ]
+        for spill_id in expired:
+            await self.release(spill_id)
+        return len(expired)
+
+    def start(self) -> None:
+        """Claim this process's spill directory and start the idle sweeper."""
+        if self._sweeper is None or self._sweeper.done():
+            self._process_dir()
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def close(self) -> None:
+        """Stop the sweeper and delete all spilled results."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        for spill_id in list(self._results):
+            await self.release(spill_id)
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get spill counters and current disk use."""
+        return {
+            **self._counters,
+            "held": len(self._results),
+            "diskBytes": self._disk_bytes(),
+            "maxDiskBytes": self.max_disk_bytes,
+        }
+
+    def _process_dir(self) -> Path:
+        """Get this process's spill directory, claiming it on first use."""
+        if self._dir is None:
+            self._dir = claim_process_dir(self.spill_dir)
+        return self._dir
+
+    def _disk_bytes(self) -> int:
+        """Get the total size of the held spill files."""
+        return sum(r.spool.size_bytes for r in self._results.values())
+
+    async def _sweep_forever(self) -> None:
+        """Periodically delete idle spilled results."""
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.warning(f"Spilled result sweep failed: {e}")
+
+
+# Cursor store instance
+cursor_store = CursorStore(
+    idle_timeout=settings.pagination_cursor_idle_timeout_seconds,
+    max_open_per_database=settings.pagination_max_open_cursors,
+)
+
+# Spill store instance
+spill_store = SpillStore(
+    idle_timeout=settings.query_spill_idle_timeout_seconds,
+    max_disk_bytes=settings.query_spill_max_disk_bytes,
+    spill_dir=Path(__file__).parent.parent.parent / "db" / "spill",
+)
@@ -1,16 +1,56 @@
 """Query execution service."""
 
+import asyncio
+import json
+import sys
 import time
+import weakref
+from collections.abc import AsyncIterator, Callable
 from typing import Any
+from decimal import Decimal
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncResult
+from datetime import date, datetime, time as dt_time, timedelta
 
-from app.services.sql_validator import validate_and_transform_sql, SQLValidationError
-from app.services.db_connection import create_engine_for_database, ConnectionError
+from app.services.sql_validator import (
+    validate_and_transform_sql,
+    get_single_table_select,
+    SQLValidationError,
+)
+from app.services.db_connection import (
+    ConnectionError,
+    get_connection_options,
+    get_sqlite_deadline,
+    set_statement_timeout,
+)
+from app.services.replica_router import replica_router
+from app.services.result_cache import CacheMissError, connection_version, result_cache
+from app.services.column_types import describe_columns, get_cursor_description
+from app.services.columnar import encode_columnar, encode_columns
+from app.services.cpu_offload import cpu_offloader, cheap_to_ship
+from app.services.history_writer import history_writer
+from app.services.query_registry import query_registry, QueryCancelledError, RunningQuery
+from app.services.admission import admission_controller, AdmissionTicket
+from app.services.query_plan import check_guardrails, QueryRejectedError
+from app.services.spool import ResultSpool
+from app.services.single_flight import query_flights
+from app.services.pagination import (
+    cursor_store,
+    spill_store,
+    decode_token,
+    encode_token,
+    sql_hash,
+    HeldCursor,
+    SpilledResult,
+    PaginationError,
+    CURSOR_MODE,
+    KEYSET_MODE,
+    SPILL_MODE,
+)
 from app.models.database import DatabaseConnection, DatabaseType
 from app.models.query import QueryHistory, QuerySource
 from app.database import async_session_maker
+from app.config import settings
 
 
 class QueryExecutionError(Exception):
@@ -23,33 +63,104 @@ class QueryExecutionError(Exception):
         self.details = details or {}
 
 
+class QueryTimeoutError(Exception):
+    """Query exceeded its statement timeout."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize query timeout error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+# Error text each driver reports when a statement hits its timeout
+_TIMEOUT_MESSAGES = {
+    DatabaseType.POSTGRESQL: "canceling statement due to statement timeout",
+    DatabaseType.MYSQL: "maximum statement execution time exceeded",
+    DatabaseType.SQLITE: "interrupted",
+}
+
+
 async def execute_query(
     db_connection: DatabaseConnection,
     sql: str,
     query_source: QuerySource = QuerySource.MANUAL,
-    timeout: int = 30
+    timeout: int | None = None,
+    cache_mode: str = "prefer",
+    result_format: str = "rows",
+    query_id: str | None = None,
+    params: dict[str, Any] | None = None
 ) -> dict[str, Any]:
     """Execute SQL query against target database.
 
+    Results are cached per connection for the connection's cache TTL.
+    ``cache_mode`` selects how the cache is used: ``prefer`` serves a fresh
+    cached result if there is one, ``bypass`` always executes and refreshes
+    the cache, and ``only`` never executes.
+
+    With ``result_format="columnar"`` the rows are returned as one vector per
+    column under ``data`` instead of a list of row objects.
+
+    While the statement runs it is registered under ``query_id`` and can be
+    cancelled through the query registry.
+
+    Uncached queries are planned first if the connection has an
+    ``explainPolicy``; exceeded guardrails are returned under ``warnings``
+    or reject the query.
+
+    Rows are held in memory up to ``query_memory_budget_bytes``. A larger
+    result is spilled to a spool file instead: the response then has the
+    first page of rows, ``spilled``, ``spillBytes``, ``totalRows`` and a
+    continuation token serving the remaining pages from the file. Spilled
+    results are not cached.
+
+    With ``cache_mode="prefer"`` and no ``query_id`` given, a query identical
+    to one already executing on the connection (same normalized SQL, format
+    and timeout) waits for that execution and gets its result, including its
+    ``queryId``, instead of running again.
+
+    Values for ``:name`` placeholders are given in ``params`` and sent to the
+    driver as bind parameters. The statement text stays the same for other
+    values, so it is validated from the parse cache and, on PostgreSQL, runs
+    as a prepared statement cached on the pooled connection.
+
     Args:
         db_connection: Database connection object
         sql: SQL query to execute
         query_source: Source of the query (manual or natural_language)
-        timeout: Query timeout in seconds (default 30)
+        timeout: Statement timeout in seconds (default: the connection's
+            statementTimeoutSeconds)
+        cache_mode: Cache mode (prefer, bypass or only)
+        result_format: Row encoding (rows or columnar)
+        query_id: Query id (generated if not given)
+        params: Bind parameter values by name
 
     Returns:
-        Query result dictionary with columns, rows, metadata
+        Query result dictionary with columns, rows (tuples in column order),
+        metadata
 
     Raises:
         SQLValidationError: If SQL validation fails
+        CacheMissError: If cache_mode is only and no fresh result is cached
+        QueryRejectedError: If the connection's cost guardrails reject the query
+        AdmissionError: If no execution slot could be obtained
+        QueryCancelledError: If the query was cancelled
+        QueryTimeoutError: If the statement timeout was exceeded
         QueryExecutionError: If query execution fails
     """
+    options = get_connection_options(db_connection)
+    timeout = timeout or options.statement_timeout_seconds
+    coalesce = cache_mode == "prefer" and query_id is None
+    query_id = query_id or query_registry.new_query_id()
+
     # Validate and transform SQL
     try:
-        validated_sql = validate_and_transform_sql(sql)
+        validated_sql = validate_and_transform_sql(
+            sql, database_type=db_connection.database_type, params=params
+        )
     except SQLValidationError as e:
         # Save failed query to history
-        await _save_query_history(
+        _save_query_history(
             db_name=db_connection.name,
             sql_text=sql,
             execution_time_ms=0,
@@ -60,75 +171,360 @@ async def execute_query(
         )
         raise
 
-    # Create engine for target database
+    # Serve from cache when allowed
+    cache_ttl = options.cache_ttl_seconds
+    cache_key = result_cache.make_key(
+        db_connection.name,
+        validated_sql,
+        result_format,
+        db_connection.database_type,
+        params,
+        connection_version(db_connection),
+    )
+    if cache_mode != "bypass":
+        cached = await result_cache.get(cache_key, cache_ttl) if cache_ttl else None
+        if cached is not None:
+            _save_query_history(
+                db_name=db_connection.name,
+                sql_text=validated_sql,
+                execution_time_ms=0,
+                row_count=cached.value["rowCount"],
+                success=True,
+                error_message=None,
+                query_source=query_source
+            )
+            return {
+                **cached.value,
+                "cached": True,
+                "cacheAgeMs": cached.age_ms,
+                "queryId": query_id,
+            }
+        if cache_mode == "only":
+            raise CacheMissError(
+                "No fresh cached result for this query",
+                {"cacheTtlSeconds": cache_ttl}
+            )
+
+    def execute():
+        return _execute_uncached(
+            db_connection, sql, validated_sql, params, query_source, timeout,
+            cache_key, cache_ttl, result_format, query_id
+        )
+
+    # Identical queries already running share that execution and its result
+    if coalesce:
+        return await query_flights.do((cache_key, timeout), execute)
+    return await execute()
+
+
+async def _execute_uncached(
+    db_connection: DatabaseConnection,
+    sql: str,
+    validated_sql: str,
+    params: dict[str, Any] | None,
+    query_source: QuerySource,
+    timeout: int,
+    cache_key: str,
+    cache_ttl: int,
+    result_format: str,
+    query_id: str,
+) -> dict[str, Any]:
+    """Execute a validated query and cache its result."""
+    # Get shared engine for target database
     try:
-        engine = create_engine_for_database(db_connection.url, db_connection.database_type)
+        engine = await replica_router.get_engine(db_connection)
     except Exception as e:
         raise QueryExecutionError(
             f"Failed to create database engine: {str(e)}",
             {"error": str(e)}
         )
 
+    # Wait for an execution slot on the target database; planning runs in it too
+    ticket = await admission_controller.acquire(db_connection)
+
+    # Plan the query first when the connection has a plan policy
+    try:
+        warnings = await check_guardrails(engine, db_connection, validated_sql, params)
+    except BaseException as e:
+        ticket.release()
+        if isinstance(e, QueryRejectedError):
+            _save_query_history(
+                db_name=db_connection.name,
+                sql_text=validated_sql,
+                execution_time_ms=0,
+                row_count=0,
+                success=False,
+                error_message=e.message,
+                query_source=query_source
+            )
+        raise
+
     # Execute query
     start_time = time.time()
     try:
         async with engine.connect() as conn:
             # Set statement timeout (database-specific)
-            if db_connection.database_type == DatabaseType.POSTGRESQL:
-                await conn.execute(text(f"SET statement_timeout = {timeout * 1000}"))
-            elif db_connection.database_type == DatabaseType.MYSQL:
-                await conn.execute(text(f"SET SESSION max_execution_time = {timeout * 1000}"))
+            await set_statement_timeout(conn, db_connection.database_type, timeout)
 
             # Execute query
-            result = await conn.execute(text(validated_sql))
-            rows = result.fetchall()
-            columns = result.keys()
+            async with query_registry.track(
+                query_id, db_connection, engine, conn, validated_sql
+            ) as running:
+                result = await running.guard(conn.stream(text(validated_sql), params))
+                columns = list(result.keys())
+                description = get_cursor_description(result)
+                rows, sample, spill_id, spool = await _fetch_within_budget(running, result)
 
         execution_time_ms = int((time.time() - start_time) * 1000)
 
         # Transform result to JSON format
-        column_defs = [
-            {"name": col, "dataType": _infer_column_type(col, rows)}
-            for col in columns
-        ]
-        row_data = [dict(row._mapping) for row in rows]
+        column_defs = describe_columns(
+            columns, description, db_connection.database_type, sample
+        )
 
         # Save successful query to history
-        await _save_query_history(
+        _save_query_history(
             db_name=db_connection.name,
             sql_text=validated_sql,
             execution_time_ms=execution_time_ms,
-            row_count=len(row_data),
+            row_count=spool.row_count if spool is not None else len(rows),
             success=True,
             error_message=None,
             query_source=query_source
         )
 
-        # Cleanup query history (keep last 50)
-        await _cleanup_query_history(db_connection.name)
+        if spool is not None:
+            return await _first_spilled_page(
+                db_connection, sql, validated_sql, params, column_defs, spill_id, spool,
+                execution_time_ms, result_format, query_id, warnings
+            )
 
-        return {
+        query_result = {
             "columns": column_defs,
-            "rows": row_data,
-            "rowCount": len(row_data),
+            **await encode_rows(rows, len(columns), result_format),
+            "rowCount": len(rows),
             "executionTimeMs": execution_time_ms,
             "sql": validated_sql
         }
+        if cache_ttl:
+            await result_cache.put(cache_key, query_result)
+
+        return {
+            **query_result,
+            "cached": False,
+            "queryId": query_id,
+            "warnings": warnings or None,
+        }
+
+    except (QueryCancelledError, asyncio.CancelledError) as e:
+        # Cancelled through the API, or the caller went away (client disconnect)
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        _save_query_history(
+            db_name=db_connection.name,
+            sql_text=validated_sql,
+            execution_time_ms=execution_time_ms,
+            row_count=0,
+            success=False,
+            error_message="Query cancelled",
+            query_source=query_source
+        )
+        if isinstance(e, QueryCancelledError):
+            e.details["executionTimeMs"] = execution_time_ms
+        raise
 
     except Exception as e:
         execution_time_ms = int((time.time() - start_time) * 1000)
+        timeout_error = _as_timeout_error(
+            e, db_connection.database_type, timeout, execution_time_ms
+        )
 
         # Save failed query to history
-        await _save_query_history(
+        _save_query_history(
             db_name=db_connection.name,
             sql_text=validated_sql,
             execution_time_ms=execution_time_ms,
             row_count=0,
             success=False,
-            error_message=str(e),
+            error_message=timeout_error.message if timeout_error else str(e),
             query_source=query_source
         )
 
+        if timeout_error is not None:
+            raise timeout_error from e
+
+        raise QueryExecutionError(
+            f"Query execution failed: {str(e)}",
+            {
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "executionTimeMs": execution_time_ms
+            }
+        )
+
+    finally:
+        ticket.release()
+
+
+async def execute_query_page(
+    db_connection: DatabaseConnection,
+    sql: str,
+    page_size: int,
+    continuation_token: str | None = None,
+    primary_keys: dict[str, list[str]] | None = None,
+    query_source: QuerySource = QuerySource.MANUAL,
+    timeout: int | None = None,
+    result_format: str = "rows",
+    query_id: str | None = None,
+    params: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Execute one page of a SQL query and return a continuation token.
+
+    Plain single-table SELECTs whose primary key is known and present in the
+    output are paged with a keyset predicate (``WHERE pk > :last ORDER BY
+    pk``), which stays index-backed on every page and keeps no server state.
+    Any other query is paged from a server-side cursor held open between
+    requests until it is exhausted or idles out. No LIMIT is added, so every
+    row is reachable. Tokens of a result spilled by ``execute_query`` are
+    served from its spool file without touching the database.
+
+    Args:
+        db_connection: Database connection object
+        sql: SQL query to execute
+        page_size: Maximum number of rows in the page
+        continuation_token: Token returned with the previous page, if any
+        primary_keys: Primary key columns by table name, from cached metadata
+        query_source: Source of the query (manual or natural_language)
+        timeout: Statement timeout in seconds (default: the connection's
+            statementTimeoutSeconds)
+        result_format: Row encoding (rows or columnar)
+        query_id: Query id for cancellation (generated if not given)
+        params: Bind parameter values by name; continuation tokens are only
+            accepted with the values of the first page
+
+    Returns:
+        Query result dictionary with columns, rows, metadata and the
+        continuation token for the next page (None on the last page)
+
+    Raises:
+        SQLValidationError: If SQL validation fails
+        PaginationError: If the continuation token is invalid or expired, or
+            the database has too many cursors open to hold another
+        QueryRejectedError: If the connection's cost guardrails reject the query
+        AdmissionError: If no execution slot could be obtained
+        QueryCancelledError: If the query was cancelled
+        QueryTimeoutError: If the statement timeout was exceeded
+        QueryExecutionError: If query execution fails
+    """
+    first_page = continuation_token is None
+    timeout = timeout or get_connection_options(db_connection).statement_timeout_seconds
+    query_id = query_id or query_registry.new_query_id()
+
+    try:
+        validated_sql = validate_and_transform_sql(
+            sql, limit=None, database_type=db_connection.database_type, params=params
+        )
+    except SQLValidationError as e:
+        if first_page:
+            _save_query_history(
+                db_name=db_connection.name,
+                sql_text=sql,
+                execution_time_ms=0,
+                row_count=0,
+                success=False,
+                error_message=e.message,
+                query_source=query_source
+            )
+        raise
+
+    token = None if first_page else decode_token(
+        continuation_token, db_connection.name, validated_sql, params
+    )
+
+    # Pages of a spilled result come from its spool file, not the database
+    if token is not None and token["m"] == SPILL_MODE:
+        return await _fetch_spill_page(token, page_size, validated_sql, result_format, query_id)
+
+    try:
+        engine = await replica_router.get_engine(db_connection)
+    except Exception as e:
+        raise QueryExecutionError(
+            f"Failed to create database engine: {str(e)}",
+            {"error": str(e)}
+        )
+
+    # Wait for an execution slot on the target database; planning runs in it too
+    ticket = await admission_controller.acquire(db_connection)
+
+    # Plan the query first when the connection has a plan policy
+    warnings = []
+    if first_page:
+        try:
+            warnings = await check_guardrails(engine, db_connection, validated_sql, params)
+        except BaseException as e:
+            ticket.release()
+            if isinstance(e, QueryRejectedError):
+                _save_query_history(
+                    db_name=db_connection.name,
+                    sql_text=validated_sql,
+                    execution_time_ms=0,
+                    row_count=0,
+                    success=False,
+                    error_message=e.message,
+                    query_source=query_source
+                )
+            raise
+
+    start_time = time.time()
+    try:
+        if token is not None and token["m"] == CURSOR_MODE:
+            columns, description, rows, next_token = await _fetch_cursor_page(
+                token, page_size, timeout
+            )
+        else:
+            key_columns = token["k"] if token else _get_keyset_key(
+                validated_sql, primary_keys, db_connection.database_type
+            )
+            if key_columns:
+                columns, description, rows, next_token = await _fetch_keyset_page(
+                    engine, db_connection, validated_sql, params, key_columns,
+                    token["a"] if token else None, page_size, timeout, query_id
+                )
+            else:
+                columns, description, rows, next_token = await _open_cursor_page(
+                    engine, db_connection, validated_sql, params, page_size, timeout, query_id
+                )
+
+    except PaginationError:
+        raise
+
+    except (asyncio.CancelledError, Exception) as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        cancelled = isinstance(e, (QueryCancelledError, asyncio.CancelledError))
+        timeout_error = None if cancelled else _as_timeout_error(
+            e, db_connection.database_type, timeout, execution_time_ms
+        )
+
+        if first_page:
+            if cancelled:
+                error_message = "Query cancelled"
+            else:
+                error_message = timeout_error.message if timeout_error else str(e)
+            _save_query_history(
+                db_name=db_connection.name,
+                sql_text=validated_sql,
+                execution_time_ms=execution_time_ms,
+                row_count=0,
+                success=False,
+                error_message=error_message,
+                query_source=query_source
+            )
+
+        if cancelled:
+            raise
+
+        if timeout_error is not None:
+            raise timeout_error from e
+
         raise QueryExecutionError(
             f"Query execution failed: {str(e)}",
             {
@@ -137,8 +533,713 @@ async def execute_query(
                 "executionTimeMs": execution_time_ms
             }
         )
+
     finally:
-        await engine.dispose()
+        ticket.release()
+
+    execution_time_ms = int((time.time() - start_time) * 1000)
+
+    # Only the first page is an execution worth recording
+    if first_page:
+        _save_query_history(
+            db_name=db_connection.name,
+            sql_text=validated_sql,
+            execution_time_ms=execution_time_ms,
+            row_count=len(rows),
+            success=True,
+            error_message=None,
+            query_source=query_source
+        )
+
+    return {
+        "columns": describe_columns(
+            columns, description, db_connection.database_type, rows
+        ),
+        **await encode_rows(rows, len(columns), result_format),
+        "rowCount": len(rows),
+        "executionTimeMs": execution_time_ms,
+        "sql": validated_sql,
+        "continuationToken": next_token,
+        "queryId": query_id,
+        "warnings": warnings or None,
+    }
+
+
+async def encode_rows(rows: list, column_count: int, result_format: str) -> dict[str, Any]:
+    """Encode fetched rows or spooled row tuples for a result.
+
+    Rows are kept as plain tuples in column order, which the response
+    encoder writes as row objects; for columnar they are encoded as column
+    vectors, by the CPU offloader for large results.
+
+    Args:
+        rows: Fetched rows (tuples or Row objects)
+        column_count: Number of result columns
+        result_format: Row encoding (rows or columnar)
+
+    Returns:
+        Result fields holding the rows
+    """
+    if result_format == "columnar":
+        if not rows:
+            return {"format": "columnar", "data": encode_columnar(rows, column_count)}
+        chunks = await cpu_offloader.map(
+            encode_columns, list(zip(*rows)), len(rows), offloadable=cheap_to_ship(rows[0])
+        )
+        return {"format": "columnar", "data": [vector for chunk in chunks for vector in chunk]}
+    return {"rows": [tuple(row) for row in rows]}
+
+
+async def _fetch_within_budget(
+    running: RunningQuery,
+    result: AsyncResult,
+) -> tuple[list, list, str | None, ResultSpool | None]:
+    """Fetch all rows, moving them to a spool file once they outgrow the memory budget.
+
+    Returns:
+        Tuple of (rows held in memory, first batch for type inference,
+        spill id, finished spool), the last two None if nothing spilled
+    """
+    rows: list = []
+    sample: list = []
+    held_bytes = 0
+    spill_id, spool = None, None
+
+    try:
+        while partition := await running.guard(result.fetchmany(settings.stream_batch_size)):
+            if not sample:
+                sample = partition
+            if spool is not None:
+                await asyncio.to_thread(spool.append, [tuple(row) for row in partition])
+                continue
+
+            rows.extend(partition)
+            held_bytes += _estimate_rows_bytes(partition)
+            if held_bytes > settings.query_memory_budget_bytes:
+                spill_id, spool = spill_store.new_spool()
+                await asyncio.to_thread(spool.append, [tuple(row) for row in rows])
+                rows = []
+
+        if spool is not None:
+            await asyncio.to_thread(spool.finish)
+    except BaseException:
+        if spool is not None:
+            spool.remove()
+        raise
+
+    return rows, sample, spill_id, spool
+
+
+def _estimate_rows_bytes(rows: list) -> int:
+    """Estimate the memory held by the values of fetched rows."""
+    return sum(sys.getsizeof(value) for row in rows for value in row)
+
+
+async def _first_spilled_page(
+    db_connection: DatabaseConnection,
+    sql: str,
+    validated_sql: str,
+    params: dict[str, Any] | None,
+    column_defs: list[dict[str, Any]],
+    spill_id: str,
+    spool: ResultSpool,
+    execution_time_ms: int,
+    result_format: str,
+    query_id: str,
+    warnings: list[str],
+) -> dict[str, Any]:
+    """Hold a spilled result and return its first page."""
+    await spill_store.hold(spill_id, SpilledResult(
+        db_name=db_connection.name,
+        spool=spool,
+        columns=column_defs,
+        last_used=time.monotonic(),
+    ))
+    rows = await asyncio.to_thread(spool.read, 0, settings.pagination_default_page_size)
+
+    next_token = None
+    if len(rows) < spool.row_count:
+        # Later pages are requested through the paged path, which validates without a LIMIT
+        paged_sql = validate_and_transform_sql(
+            sql, limit=None, database_type=db_connection.database_type, params=params
+        )
+        next_token = encode_token({
+            "m": SPILL_MODE,
+            "db": db_connection.name,
+            "h": sql_hash(paged_sql, params),
+            "s": spill_id,
+            "o": len(rows),
+        })
+
+    return {
+        "columns": column_defs,
+        **await encode_rows(rows, len(column_defs), result_format),
+        "rowCount": len(rows),
+        "executionTimeMs": execution_time_ms,
+        "sql": validated_sql,
+        "continuationToken": next_token,
+        "cached": False,
+        "queryId": query_id,
+        "warnings": warnings or None,
+        "spilled": True,
+        "spillId": spill_id,
+        "spillBytes": spool.size_bytes,
+        "totalRows": spool.row_count,
+    }
+
+
+async def _fetch_spill_page(
+    token: dict[str, Any],
+    page_size: int,
+    validated_sql: str,
+    result_format: str,
+    query_id: str,
+) -> dict[str, Any]:
+    """Read the page of a spilled result that a continuation token points at."""
+    start_time = time.time()
+    spilled = spill_store.get(token["s"])
+    rows = await asyncio.to_thread(spilled.spool.read, token["o"], page_size)
+
+    next_offset = token["o"] + len(rows)
+    next_token = None
+    if next_offset < spilled.spool.row_count:
+        next_token = encode_token({**token, "o": next_offset})
+
+    return {
+        "columns": spilled.columns,
+        **await encode_rows(rows, len(spilled.columns), result_format),
+        "rowCount": len(rows),
+        "executionTimeMs": int((time.time() - start_time) * 1000),
+        "sql": validated_sql,
+        "continuationToken": next_token,
+        "queryId": query_id,
+        "spilled": True,
+        "spillId": token["s"],
+        "spillBytes": spilled.spool.size_bytes,
+        "totalRows": spilled.spool.row_count,
+    }
+
+
+async def _fetch_keyset_page(
+    engine: AsyncEngine,
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    params: dict[str, Any] | None,
+    key_columns: list[str],
+    after: list[Any] | None,
+    page_size: int,
+    timeout: int,
+    query_id: str,
+) -> tuple[list[str], list | None, list, str | None]:
+    """Fetch the page following ``after`` using a keyset predicate."""
+    preparer = engine.dialect.identifier_preparer
+    key_list = ", ".join(preparer.quote(col) for col in key_columns)
+
+    where = ""
+    page_params = dict(params or {})
+    if after is not None:
+        # User parameter names cannot start with an underscore
+        placeholders = ", ".join(f":_after_{i}" for i in range(len(key_columns)))
+        if len(key_columns) == 1:
+            where = f" WHERE {key_list} > {placeholders}"
+        else:
+            where = f" WHERE ({key_list}) > ({placeholders})"
+        page_params.update({f"_after_{i}": value for i, value in enumerate(after)})
+
+    page_sql = (
+        f"SELECT * FROM ({validated_sql}) AS _page{where} "
+        f"ORDER BY {key_list} LIMIT {page_size + 1}"
+    )
+
+    async with engine.connect() as conn:
+        await set_statement_timeout(conn, db_connection.database_type, timeout)
+        async with query_registry.track(
+            query_id, db_connection, engine, conn, validated_sql
+        ) as running:
+            result = await running.guard(conn.execute(text(page_sql), page_params))
+            rows = result.fetchall()
+        columns = list(result.keys())
+        description = get_cursor_description(result)
+
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]._mapping
+        next_token = encode_token({
+            "m": KEYSET_MODE,
+            "db": db_connection.name,
+            "h": sql_hash(validated_sql, params),
+            "k": key_columns,
+            "a": [last[col] for col in key_columns],
+        })
+
+    return columns, description, rows, next_token
+
+
+async def _open_cursor_page(
+    engine: AsyncEngine,
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    params: dict[str, Any] | None,
+    page_size: int,
+    timeout: int,
+    query_id: str,
+) -> tuple[list[str], list | None, list, str | None]:
+    """Open a server-side cursor, fetch the first page and hold it if rows remain."""
+    conn = await engine.connect()
+    try:
+        await set_statement_timeout(conn, db_connection.database_type, timeout)
+        async with query_registry.track(
+            query_id, db_connection, engine, conn, validated_sql
+        ) as running:
+            result = await running.guard(conn.stream(text(validated_sql), params))
+            columns = list(result.keys())
+            description = get_cursor_description(result)
+            rows = await running.guard(result.fetchmany(page_size + 1))
+    except BaseException:
+        await conn.close()
+        raise
+
+    if len(rows) <= page_size:
+        await result.close()
+        await conn.close()
+        return columns, description, rows, None
+
+    try:
+        cursor_id = await cursor_store.hold(HeldCursor(
+            db_name=db_connection.name,
+            conn=conn,
+            result=result,
+            columns=columns,
+            description=description,
+            last_used=time.monotonic(),
+            rows_served=page_size,
+            pending=rows[page_size:],
+        ))
+    except PaginationError:
+        await result.close()
+        await conn.close()
+        raise
+    next_token = encode_token({
+        "m": CURSOR_MODE,
+        "db": db_connection.name,
+        "h": sql_hash(validated_sql, params),
+        "c": cursor_id,
+        "n": page_size,
+    })
+    return columns, description, rows[:page_size], next_token
+
+
+async def _fetch_cursor_page(
+    token: dict[str, Any],
+    page_size: int,
+    timeout: int,
+) -> tuple[list[str], list | None, list, str | None]:
+    """Fetch the next page from a held server-side cursor."""
+    cursor_id = token["c"]
+    cursor = cursor_store.get(cursor_id)
+
+    async with cursor.lock:
+        # Each token is valid for exactly one page
+        if token.get("n") != cursor.rows_served:
+            raise PaginationError(
+                "Continuation token has already been used",
+                {"reason": "consumed"}
+            )
+
+        try:
+            rows = cursor.pending
+            if len(rows) <= page_size:
+                # The SQLite deadline counts from the fetch, not from opening the cursor
+                deadline = await get_sqlite_deadline(cursor.conn)
+                if deadline is not None:
+                    deadline.arm(timeout)
+                rows = rows + await cursor.result.fetchmany(page_size + 1 - len(rows))
+        except BaseException:
+            await cursor_store.release(cursor_id)
+            raise
+
+        cursor.pending = rows[page_size:]
+        rows = rows[:page_size]
+        cursor.rows_served += len(rows)
+
+        if not cursor.pending:
+            await cursor_store.release(cursor_id)
+            return cursor.columns, cursor.description, rows, None
+
+        next_token = encode_token({**token, "n": cursor.rows_served})
+        return cursor.columns, cursor.description, rows, next_token
+
+
+def _get_keyset_key(
+    validated_sql: str,
+    primary_keys: dict[str, list[str]] | None,
+    database_type: DatabaseType,
+) -> list[str] | None:
+    """Get the key columns for keyset paging, or None if the query does not qualify."""
+    if not primary_keys:
+        return None
+
+    described = get_single_table_select(validated_sql, database_type)
+    if described is None:
+        return None
+
+    schema, table, columns = described
+    name = f"{schema}.{table}" if schema else table
+    key_columns = primary_keys.get(name.lower())
+    if not key_columns:
+        return None
+
+    # The key must be visible in the output to build the next predicate
+    if columns is not None and not set(key_columns) <= set(columns):
+        return None
+
+    return key_columns
+
+
+async def stream_query(
+    db_connection: DatabaseConnection,
+    sql: str,
+    query_source: QuerySource = QuerySource.MANUAL,
+    timeout: int | None = None,
+    batch_size: int | None = None,
+    query_id: str | None = None,
+    params: dict[str, Any] | None = None,
+) -> AsyncIterator[bytes]:
+    """Stream SQL query results as NDJSON frames.
+
+    The statement runs on a server-side cursor (asyncpg cursor, aiomysql
+    SSCursor, incremental aiosqlite fetches) and the next batch is only
+    fetched once the previous frame has been consumed, so a slow client
+    throttles the database instead of buffering rows in memory.
+
+    Frames, one JSON object per line:
+        {"type": "header", "columns": [...], "sql": "...", "queryId": "...", "warnings": [...]}
+        {"type": "rows", "rows": [[...], ...]}
+        {"type": "end", "rowCount": n, "executionTimeMs": ms}
+        {"type": "error", "error": {"code": ..., "message": ..., "details": ...}}
+
+    Args:
+        db_connection: Database connection object
+        sql: SQL query to execute
+        query_source: Source of the query (manual or natural_language)
+        timeout: Statement timeout in seconds (default: the connection's
+            statementTimeoutSeconds)
+        batch_size: Rows per frame (default from settings)
+        query_id: Query id for cancellation (generated if not given)
+        params: Bind parameter values by name
+
+    Yields:
+        NDJSON encoded frames
+
+    Raises:
+        SQLValidationError: If SQL validation fails
+        QueryRejectedError: If the connection's cost guardrails reject the query
+        AdmissionError: If no execution slot could be obtained
+        QueryExecutionError: If the engine cannot be created
+    """
+    timeout = timeout or get_connection_options(db_connection).statement_timeout_seconds
+    batch_size = batch_size or settings.stream_batch_size
+    query_id = query_id or query_registry.new_query_id()
+
+    # Validate and transform SQL before the response starts
+    try:
+        validated_sql = validate_and_transform_sql(
+            sql, limit=settings.stream_max_rows, database_type=db_connection.database_type,
+            params=params
+        )
+    except SQLValidationError as e:
+        _save_query_history(
+            db_name=db_connection.name,
+            sql_text=sql,
+            execution_time_ms=0,
+            row_count=0,
+            success=False,
+            error_message=e.message,
+            query_source=query_source
+        )
+        raise
+
+    try:
+        engine = await replica_router.get_engine(db_connection)
+    except Exception as e:
+        raise QueryExecutionError(
+            f"Failed to create database engine: {str(e)}",
+            {"error": str(e)}
+        )
+
+    # Wait for an execution slot, also used for planning; the stream holds it until it ends
+    ticket = await admission_controller.acquire(db_connection)
+
+    # Plan the query first when the connection has a plan policy
+    try:
+        warnings = await check_guardrails(engine, db_connection, validated_sql, params)
+    except BaseException as e:
+        ticket.release()
+        if isinstance(e, QueryRejectedError):
+            _save_query_history(
+                db_name=db_connection.name,
+                sql_text=validated_sql,
+                execution_time_ms=0,
+                row_count=0,
+                success=False,
+                error_message=e.message,
+                query_source=query_source
+            )
+        raise
+    frames = _stream_frames(
+        engine, db_connection, validated_sql, params, query_source, timeout, batch_size,
+        query_id, warnings, ticket
+    )
+    # A stream that is never iterated never reaches its finally block
+    weakref.finalize(frames, ticket.release)
+    return frames
+
+
+async def _stream_frames(
+    engine: AsyncEngine,
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    params: dict[str, Any] | None,
+    query_source: QuerySource,
+    timeout: int,
+    batch_size: int,
+    query_id: str,
+    warnings: list[str],
+    ticket: AdmissionTicket,
+) -> AsyncIterator[bytes]:
+    """Execute a validated query and yield NDJSON frames."""
+    start_time = time.time()
+    row_count = 0
+    error_message: str | None = None
+
+    try:
+        async with engine.connect() as conn:
+            await set_statement_timeout(conn, db_connection.database_type, timeout)
+
+            async with query_registry.track(
+                query_id, db_connection, engine, conn, validated_sql
+            ) as running:
+                result = await running.guard(conn.stream(text(validated_sql), params))
+                columns = list(result.keys())
+                description = get_cursor_description(result)
+                deadline = await get_sqlite_deadline(conn)
+                header_sent = False
+
+                while partition := await running.guard(result.fetchmany(batch_size)):
+                    if not header_sent:
+                        yield _encode_frame({
+                            "type": "header",
+                            "columns": describe_columns(
+                                columns, description, db_connection.database_type, partition
+                            ),
+                            "sql": validated_sql,
+                            "queryId": query_id,
+                            "warnings": warnings or None,
+                        })
+                        header_sent = True
+
+                    row_count += len(partition)
+                    yield _encode_frame({
+                        "type": "rows",
+                        "rows": [list(row) for row in partition],
+                    })
+                    if deadline is not None:
+                        # Time spent waiting for the client is not statement time
+                        deadline.arm(timeout)
+
+            if not header_sent:
+                yield _encode_frame({
+                    "type": "header",
+                    "columns": describe_columns(
+                        columns, description, db_connection.database_type, []
+                    ),
+                    "sql": validated_sql,
+                    "queryId": query_id,
+                    "warnings": warnings or None,
+                })
+
+        yield _encode_frame({
+            "type": "end",
+            "rowCount": row_count,
+            "executionTimeMs": int((time.time() - start_time) * 1000),
+        })
+
+    except (GeneratorExit, asyncio.CancelledError):
+        error_message = "Stream closed before completion"
+        raise
+
+    except QueryCancelledError as e:
+        error_message = "Query cancelled"
+        yield _encode_frame({
+            "type": "error",
+            "error": {
+                "code": "QUERY_CANCELLED",
+                "message": e.message,
+                "details": {**e.details, "rowCount": row_count},
+            },
+        })
+
+    except Exception as e:
+        timeout_error = _as_timeout_error(
+            e, db_connection.database_type, timeout, int((time.time() - start_time) * 1000)
+        )
+        if timeout_error is not None:
+            error_message = timeout_error.message
+            yield _encode_frame({
+                "type": "error",
+                "error": {
+                    "code": "QUERY_TIMEOUT",
+                    "message": error_message,
+                    "details": {**timeout_error.details, "rowCount": row_count},
+                },
+            })
+            return
+
+        error_message = str(e)
+        yield _encode_frame({
+            "type": "error",
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": f"Query execution failed: {error_message}",
+                "details": {
+                    "error": error_message,
+                    "error_type": type(e).__name__,
+                    "rowCount": row_count,
+                },
+            },
+        })
+
+    finally:
+        # Runs on normal completion, errors and client disconnects alike
+        ticket.release()
+        _save_query_history(
+            db_name=db_connection.name,
+            sql_text=validated_sql,
+            execution_time_ms=int((time.time() - start_time) * 1000),
+            row_count=row_count,
+            success=error_message is None,
+            error_message=error_message,
+            query_source=query_source
+        )
+
+
+async def spool_query(
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    spool: ResultSpool,
+    timeout: int,
+    query_id: str,
+    ticket: AdmissionTicket,
+    query_source: QuerySource = QuerySource.MANUAL,
+    on_batch: Callable[[list[dict[str, Any]], int], None] | None = None,
+    params: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Execute a validated query and write its rows to a spool file.
+
+    Rows are fetched from a server-side cursor in batches of
+    ``job_spool_batch_rows`` and each batch is appended to the spool as one
+    frame, so memory use does not grow with the result. The execution slot
+    in ``ticket`` is released when the query ends.
+
+    Args:
+        db_connection: Database connection object
+        validated_sql: Validated SQL query
+        spool: Spool receiving the rows
+        timeout: Statement timeout in seconds
+        query_id: Query id for cancellation
+        ticket: Execution slot on the target database
+        query_source: Source of the query (manual or natural_language)
+        on_batch: Called with the column definitions and the number of rows
+            spooled so far after every batch
+        params: Bind parameter values by name
+
+    Returns:
+        Column definitions, row count and execution time
+
+    Raises:
+        QueryCancelledError: If the query was cancelled
+        QueryTimeoutError: If the statement timeout was exceeded
+        QueryExecutionError: If query execution fails
+    """
+    start_time = time.time()
+    row_count = 0
+    error_message: str | None = None
+
+    try:
+        engine = await replica_router.get_engine(db_connection)
+        async with engine.connect() as conn:
+            await set_statement_timeout(conn, db_connection.database_type, timeout)
+
+            async with query_registry.track(
+                query_id, db_connection, engine, conn, validated_sql
+            ) as running:
+                result = await running.guard(conn.stream(text(validated_sql), params))
+                columns = list(result.keys())
+                description = get_cursor_description(result)
+                column_defs = None
+
+                while partition := await running.guard(
+                    result.fetchmany(settings.job_spool_batch_rows)
+                ):
+                    if column_defs is None:
+                        column_defs = describe_columns(
+                            columns, description, db_connection.database_type, partition
+                        )
+                    await asyncio.to_thread(spool.append, [tuple(row) for row in partition])
+                    row_count += len(partition)
+                    if on_batch is not None:
+                        on_batch(column_defs, row_count)
+
+            if column_defs is None:
+                column_defs = describe_columns(
+                    columns, description, db_connection.database_type, []
+                )
+                if on_batch is not None:
+                    on_batch(column_defs, 0)
+
+        await asyncio.to_thread(spool.finish)
+        return {
+            "columns": column_defs,
+            "rowCount": row_count,
+            "executionTimeMs": int((time.time() - start_time) * 1000),
+        }
+
+    except (QueryCancelledError, asyncio.CancelledError):
+        error_message = "Query cancelled"
+        raise
+
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        timeout_error = _as_timeout_error(
+            e, db_connection.database_type, timeout, execution_time_ms
+        )
+        if timeout_error is not None:
+            error_message = timeout_error.message
+            raise timeout_error from e
+
+        error_message = str(e)
+        raise QueryExecutionError(
+            f"Query execution failed: {error_message}",
+            {
+                "error": error_message,
+                "error_type": type(e).__name__,
+                "executionTimeMs": execution_time_ms,
+                "rowCount": row_count,
+            }
+        )
+
+    finally:
+        ticket.release()
+        _save_query_history(
+            db_name=db_connection.name,
+            sql_text=validated_sql,
+            execution_time_ms=int((time.time() - start_time) * 1000),
+            row_count=row_count,
+            success=error_message is None,
+            error_message=error_message,
+            query_source=query_source
+        )
 
 
 async def get_query_history(db_name: str, limit: int = 50) -> list[dict[str, Any]]:
@@ -151,6 +1252,9 @@ async def get_query_history(db_name: str, limit: int = 50) -> list[dict[str, Any
     Returns:
         List of query history entries
     """
+    # Include entries still waiting in the writer queue
+    await history_writer.flush()
+
     async with async_session_maker() as session:
         from sqlmodel import select
 
@@ -182,7 +1286,7 @@ async def get_query_history(db_name: str, limit: int = 50) -> list[dict[str, Any
         ]
 
 
-async def _save_query_history(
+def _save_query_history(
     db_name: str,
     sql_text: str,
     execution_time_ms: int,
@@ -191,7 +1295,7 @@ async def _save_query_history(
     error_message: str | None,
     query_source: QuerySource
 ) -> None:
-    """Save query to history.
+    """Queue a query for the history writer.
 
     Args:
         db_name: Database name
@@ -202,78 +1306,51 @@ async def _save_query_history(
         error_message: Error message if failed
         query_source: Source of the query
     """
-    async with async_session_maker() as session:
-        history_entry = QueryHistory(
-            database_name=db_name,
-            sql_text=sql_text,
-            executed_at=datetime.utcnow(),
-            execution_time_ms=execution_time_ms,
-            row_count=row_count,
-            success=success,
-            error_message=error_message,
-            query_source=query_source
-        )
-
-        session.add(history_entry)
-        await session.commit()
-
+    history_writer.record(
+        database_name=db_name,
+        sql_text=sql_text,
+        executed_at=datetime.utcnow(),
+        execution_time_ms=execution_time_ms,
+        row_count=row_count,
+        success=success,
+        error_message=error_message,
+        query_source=query_source
+    )
 
-async def _cleanup_query_history(db_name: str, keep_last: int = 50) -> None:
-    """Cleanup old query history entries.
-
-    Args:
-        db_name: Database name
-        keep_last: Number of recent entries to keep (default 50)
-    """
-    async with async_session_maker() as session:
-        from sqlmodel import select, delete
-
-        # Get IDs of entries to delete
-        statement = (
-            select(QueryHistory.id)
-            .where(QueryHistory.database_name == db_name)
-            .order_by(QueryHistory.executed_at.desc())
-            .offset(keep_last)
-        )
-
-        results = await session.execute(statement)
-        ids_to_delete = [row[0] for row in results.fetchall()]
-
-        if ids_to_delete:
-            delete_stmt = delete(QueryHistory).where(QueryHistory.id.in_(ids_to_delete))
-            await session.execute(delete_stmt)
-            await session.commit()
 
+def _as_timeout_error(
+    error: Exception,
+    database_type: DatabaseType,
+    timeout: int,
+    execution_time_ms: int,
+) -> QueryTimeoutError | None:
+    """Translate a driver error caused by the statement timeout, or return None."""
+    if _TIMEOUT_MESSAGES[database_type] not in str(error).lower():
+        return None
 
-def _infer_column_type(column_name: str, rows: list) -> str:
-    """Infer column data type from column name and sample data.
+    return QueryTimeoutError(
+        f"Query exceeded the statement timeout of {timeout} seconds",
+        {
+            "timeoutSeconds": timeout,
+            "executionTimeMs": execution_time_ms,
+            "error": str(error),
+        }
+    )
 
-    Args:
-        column_name: Column name
-        rows: Sample rows
 
-    Returns:
-        Data type string
-    """
-    # Try to infer from first non-null value
-    for row in rows:
-        row_dict = dict(row._mapping)
-        value = row_dict.get(column_name)
-
-        if value is not None:
-            value_type = type(value).__name__
-
-            # Map Python types to SQL types
-            type_mapping = {
-                "int": "integer",
-                "float": "real",
-                "str": "text",
-                "bool": "boolean",
-                "date": "date",
-                "datetime": "timestamp",
-                "bytes": "blob"
-            }
+def _encode_frame(frame: dict[str, Any]) -> bytes:
+    """Encode a stream frame as one NDJSON line."""
+    return (json.dumps(frame, default=_json_default, ensure_ascii=False) + "\n").encode("utf-8")
 
-            return type_mapping.get(value_type, "text")
 
-    return "text"  # Default to text if can't infer
+def _json_default(value: Any) -> Any:
+    """Serialize values the json module does not handle natively."""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return str(value)
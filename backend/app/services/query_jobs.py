@@ -0,0 +1,487 @@
+"""Asynchronous query jobs with results spooled to disk."""
+
+import asyncio
+import logging
+import secrets
+import shutil
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.models.database import DatabaseConnection
+from app.models.query import QuerySource
+from app.services.admission import AdmissionError, AdmissionTicket, admission_controller
+from app.services.query import (
+    QueryExecutionError,
+    QueryTimeoutError,
+    spool_query,
+)
+from app.services.query_registry import QueryCancelledError
+from app.services.spool import ResultSpool, claim_process_dir
+from app.services.sql_validator import validate_and_transform_sql
+
+logger = logging.getLogger(__name__)
+
+# Job states; the last three are final
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+_FINAL_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# Progress watchers get at most one update per interval, and one per heartbeat regardless
+PROGRESS_INTERVAL_SECONDS = 0.5
+PROGRESS_HEARTBEAT_SECONDS = 15.0
+
+
+class QueryJobError(Exception):
+    """Query job not found, not finished or not accepted."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize query job error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+@dataclass
+class QueryJob:
+    """Query submitted for background execution."""
+
+    job_id: str
+    db_connection: DatabaseConnection
+    sql: str
+    timeout: int
+    query_source: QuerySource
+    params: dict[str, Any] | None = None
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+    columns: list[dict[str, Any]] | None = None
+    row_count: int = 0
+    execution_time_ms: int | None = None
+    error: dict[str, Any] | None = None
+    spool: ResultSpool | None = None
+    task: asyncio.Task | None = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def db_name(self) -> str:
+        """Get the database connection name."""
+        return self.db_connection.name
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a final state."""
+        return self.status in _FINAL_STATES
+
+    def notify(self) -> None:
+        """Wake up progress watchers."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the job status with camelCase keys."""
+        return {
+            "jobId": self.job_id,
+            "databaseName": self.db_name,
+            "sql": self.sql,
+            "params": self.params,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "expiresAt": self.expires_at,
+            "columns": self.columns,
+            "rowCount": self.row_count,
+            "executionTimeMs": self.execution_time_ms,
+            "spoolBytes": self.spool.size_bytes if self.spool is not None else None,
+            "error": self.error,
+        }
+
+
+class QueryJobManager:
+    """Bounded worker pool running query jobs in the background.
+
+    Submitted jobs wait in a FIFO queue of at most ``max_queued`` jobs and
+    are run by ``workers`` worker tasks. A running job holds an admission
+    slot on its database like any other query, waiting for one as long as
+    needed, and spools its rows to a directory of its own process below
+    ``spool_dir`` so the result outlives the request that submitted it. A
+    job that gets no slot within its timeout fails. Finished jobs and their
+    spool files are kept for ``result_ttl`` seconds, then removed by a
+    background sweeper.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queued: int,
+        result_ttl: int,
+        spool_dir: Path,
+    ):
+        """Initialize job manager."""
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.spool_dir = spool_dir
+        self._dir: Path | None = None
+        self._jobs: dict[tuple[str, str], QueryJob] = {}
+        self._queue: asyncio.Queue[QueryJob] = asyncio.Queue()
+        # Jobs in the queued state; cancelled jobs stay in the queue until a worker skips them
+        self._queued = 0
+        self._tasks: list[asyncio.Task] = []
+        self._counters = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "expired": 0,
+        }
+
+    def submit(
+        self,
+        db_connection: DatabaseConnection,
+        sql: str,
+        timeout: int | None = None,
+        query_source: QuerySource = QuerySource.MANUAL,
+        params: dict[str, Any] | None = None,
+        limit: int | None = None,
+    ) -> QueryJob:
+        """Validate a query and queue it as a job.
+
+        Jobs are not held to the interactive limits: queries without a LIMIT
+        get ``job_max_rows`` unless a limit is given, and the timeout
+        defaults to ``job_timeout_seconds``.
+
+        Args:
+            db_connection: Database connection object
+            sql: SQL query to execute
+            timeout: Statement timeout in seconds (default from settings)
+            query_source: Source of the query (manual or natural_language)
+            params: Bind parameter values by name
+            limit: Row limit added when the query has no LIMIT clause
+                (default: settings.job_max_rows)
+
+        Returns:
+            Queued job
+
+        Raises:
+            SQLValidationError: If SQL validation fails
+            QueryJobError: If the job queue is full
+        """
+        validated_sql = validate_and_transform_sql(
+            sql,
+            limit=limit or settings.job_max_rows,
+            database_type=db_connection.database_type,
+            params=params,
+        )
+
+        if self._queued >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise QueryJobError(
+                "Too many query jobs queued",
+                {"reason": "queue_full", "maxQueuedJobs": self.max_queued},
+            )
+
+        job = QueryJob(
+            job_id=secrets.token_urlsafe(12),
+            db_connection=db_connection,
+            sql=validated_sql,
+            timeout=timeout or settings.job_timeout_seconds,
+            query_source=query_source,
+            params=params,
+        )
+        self._jobs[(job.db_name, job.job_id)] = job
+        self._queue.put_nowait(job)
+        self._queued += 1
+        self._counters["submitted"] += 1
+        return job
+
+    def get(self, db_name: str, job_id: str) -> QueryJob:
+        """Get a job.
+
+        Raises:
+            QueryJobError: If the job expired or never existed
+        """
+        job = self._jobs.get((db_name, job_id))
+        if job is None:
+            raise QueryJobError(
+                f"Job '{job_id}' not found",
+                {"reason": "not_found", "jobId": job_id, "resultTtlSeconds": self.result_ttl},
+            )
+        return job
+
+    def list_jobs(self, db_name: str) -> list[QueryJob]:
+        """List the jobs of a connection, newest first."""
+        jobs = [job for (name, _), job in self._jobs.items() if name == db_name]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    async def cancel(self, db_name: str, job_id: str) -> QueryJob:
+        """Cancel a queued or running job. Finished jobs are left as they are.
+
+        Raises:
+            QueryJobError: If the job does not exist
+        """
+        job = self.get(db_name, job_id)
+        if job.status == JOB_QUEUED and job.task is None:
+            # The worker skips it when it comes up in the queue
+            self._finish(job, JOB_CANCELLED, _error("QUERY_CANCELLED", "Job was cancelled"))
+        elif job.task is not None and not job.task.done():
+            # Stops the statement on the target through the running query's guard
+            job.task.cancel()
+            await asyncio.wait({job.task})
+        return job
+
+    async def delete(self, db_name: str, job_id: str) -> None:
+        """Cancel a job if needed and remove it with its spooled result.
+
+        Raises:
+            QueryJobError: If the job does not exist
+        """
+        job = await self.cancel(db_name, job_id)
+        self._jobs.pop((db_name, job_id), None)
+        if job.spool is not None:
+            await asyncio.to_thread(job.spool.remove)
+
+    async def read_rows(self, job: QueryJob, offset: int, limit: int) -> list[tuple]:
+        """Read rows from the result of a succeeded job.
+
+        Args:
+            job: Query job
+            offset: Number of the first row to read
+            limit: Maximum number of rows
+
+        Returns:
+            Row tuples
+
+        Raises:
+            QueryJobError: If the job has not succeeded
+        """
+        self.require_result(job)
+        return await asyncio.to_thread(job.spool.read, offset, limit)
+
+    def require_result(self, job: QueryJob) -> None:
+        """Check that a job has a result to read.
+
+        Raises:
+            QueryJobError: If the job has not succeeded
+        """
+        if job.status != JOB_SUCCEEDED:
+            raise QueryJobError(
+                f"Job '{job.job_id}' has no result",
+                {"reason": "not_finished" if not job.finished else job.status,
+                 "jobId": job.job_id, "status": job.status},
+            )
+
+    async def watch(self, job: QueryJob) -> AsyncIterator[dict[str, Any]]:
+        """Yield the job status on every change until the job finishes.
+
+        Args:
+            job: Query job
+
+        Yields:
+            Job status dictionaries, the last one in a final state
+        """
+        while True:
+            changed = job.changed
+            yield job.to_dict()
+            if job.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=PROGRESS_HEARTBEAT_SECONDS)
+            except TimeoutError:
+                continue
+            if not job.finished:
+                await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+
+    async def evict_expired(self) -> int:
+        """Remove finished jobs whose result TTL has passed."""
+        now = datetime.utcnow()
+        expired = [
+            key for key, job in self._jobs.items()
+            if job.expires_at is not None and job.expires_at <= now
+        ]
+        for key in expired:
+            job = self._jobs.pop(key)
+            if job.spool is not None:
+                await asyncio.to_thread(job.spool.remove)
+        self._counters["expired"] += len(expired)
+        return len(expired)
+
+    def start(self) -> None:
+        """Start the workers and the expiry sweeper.
+
+        Spool files left behind by exited processes are removed first; job
+        state is in memory and does not survive a restart.
+        """
+        if self._tasks:
+            return
+        self._process_dir()
+        self._tasks = [asyncio.create_task(self._work_forever()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep_forever()))
+
+    async def close(self) -> None:
+        """Cancel unfinished jobs, stop the workers and remove all spool files."""
+        for job in list(self._jobs.values()):
+            if not job.finished:
+                await self.cancel(job.db_name, job.job_id)
+
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        for job in self._jobs.values():
+            if job.spool is not None:
+                job.spool.remove()
+        self._jobs.clear()
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def _process_dir(self) -> Path:
+        """Get this process's spool directory, claiming it on first use."""
+        if self._dir is None:
+            self._dir = claim_process_dir(self.spool_dir)
+        return self._dir
+
+    def stats(self) -> dict[str, Any]:
+        """Get job counters and current queue and spool sizes."""
+        jobs = list(self._jobs.values())
+        return {
+            **self._counters,
+            "queued": self._queued,
+            "running": sum(1 for job in jobs if job.status == JOB_RUNNING),
+            "retained": sum(1 for job in jobs if job.finished),
+            "spoolBytes": sum(job.spool.size_bytes for job in jobs if job.spool is not None),
+            "workers": self.workers,
+            "maxQueuedJobs": self.max_queued,
+        }
+
+    async def _work_forever(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job = await self._queue.get()
+            if job.status != JOB_QUEUED:
+                continue
+            job.task = asyncio.create_task(self._run(job))
+            # Waiting instead of awaiting keeps a job cancellation out of the worker
+            await asyncio.wait({job.task})
+
+    async def _run(self, job: QueryJob) -> None:
+        """Execute a job and record its outcome."""
+        try:
+            job.spool = ResultSpool(self._process_dir() / f"{job.job_id}.spool")
+            ticket = await self._admit(job)
+        except asyncio.CancelledError:
+            self._finish(job, JOB_CANCELLED, _error("QUERY_CANCELLED", "Job was cancelled"))
+            return
+        except AdmissionError as e:
+            self._finish(job, JOB_FAILED, _error(
+                "QUERY_QUEUE_TIMEOUT",
+                f"No query slot on database '{job.db_name}' within the job timeout",
+                {**e.details, "timeoutSeconds": job.timeout},
+            ))
+            return
+        except OSError as e:
+            error = _error("SPOOL_ERROR", f"Failed to create spool file: {e}")
+            self._finish(job, JOB_FAILED, error)
+            return
+
+        self._set_status(job, JOB_RUNNING)
+        job.started_at = datetime.utcnow()
+        job.notify()
+
+        def on_batch(columns: list[dict[str, Any]], row_count: int) -> None:
+            job.columns = columns
+            job.row_count = row_count
+            job.notify()
+
+        try:
+            result = await spool_query(
+                job.db_connection, job.sql, job.spool, job.timeout, job.job_id, ticket,
+                job.query_source, on_batch, job.params,
+            )
+        except (QueryCancelledError, asyncio.CancelledError):
+            self._finish(job, JOB_CANCELLED, _error("QUERY_CANCELLED", "Job was cancelled"))
+        except QueryTimeoutError as e:
+            self._finish(job, JOB_FAILED, _error("QUERY_TIMEOUT", e.message, e.details))
+        except QueryExecutionError as e:
+            self._finish(job, JOB_FAILED, _error("EXECUTION_ERROR", e.message, e.details))
+        except Exception as e:
+            logger.warning(f"Query job '{job.job_id}' on '{job.db_name}' failed: {e}")
+            self._finish(job, JOB_FAILED, _error("EXECUTION_ERROR", str(e)))
+        else:
+            job.execution_time_ms = result["executionTimeMs"]
+            self._finish(job, JOB_SUCCEEDED)
+
+    async def _admit(self, job: QueryJob) -> AdmissionTicket:
+        """Wait for an execution slot, retrying while the database's queue is full.
+
+        Raises:
+            AdmissionError: If no slot was obtained within the job timeout
+        """
+        deadline = time.monotonic() + job.timeout
+        while True:
+            try:
+                return await admission_controller.acquire(job.db_connection)
+            except AdmissionError as e:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise
+                await asyncio.sleep(min(e.retry_after, remaining))
+
+    def _set_status(self, job: QueryJob, status: str) -> None:
+        """Change the state of a job, keeping the count of queued jobs."""
+        if job.status == JOB_QUEUED:
+            self._queued -= 1
+        job.status = status
+
+    def _finish(self, job: QueryJob, status: str, error: dict[str, Any] | None = None) -> None:
+        """Put a job in a final state and start its result TTL."""
+        self._set_status(job, status)
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        job.expires_at = job.finished_at + timedelta(seconds=self.result_ttl)
+        if status != JOB_SUCCEEDED and job.spool is not None:
+            job.spool.remove()
+            job.spool = None
+        self._counters[status] += 1
+        job.notify()
+
+    async def _sweep_forever(self) -> None:
+        """Periodically remove expired jobs."""
+        interval = max(1.0, min(60.0, self.result_ttl / 4))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_expired()
+            except Exception as e:
+                logger.warning(f"Query job sweep failed: {e}")
+
+
+def _error(code: str, message: str, details: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Build an error object in the API error format."""
+    return {"code": code, "message": message, "details": details}
+
+
+# Query job manager instance
+query_job_manager = QueryJobManager(
+    workers=settings.job_workers,
+    max_queued=settings.job_max_queued,
+    result_ttl=settings.job_result_ttl_seconds,
+    spool_dir=Path(__file__).parent.parent.parent / "db" / "jobs",
+)
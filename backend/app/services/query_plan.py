@@ -0,0 +1,361 @@
+"""Pre-execution query planning and cost guardrails."""
+
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+
+from app.database import async_session_maker
+from app.models.database import DatabaseConnection, DatabaseType
+from app.models.metadata import DatabaseMetadata
+from app.services.db_connection import get_connection_options
+from app.services.metadata import get_table_row_counts
+from app.services.sql_validator import get_streaming_limit
+
+logger = logging.getLogger(__name__)
+
+# Table name in SQLite "SCAN <table>" plan details ("SCAN TABLE <table>" before 3.36)
+_SQLITE_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\S+)")
+
+# PostgreSQL plan nodes that read all their input before returning a row, so a
+# Limit above them does not cut the scans below short
+_POSTGRESQL_BLOCKING_NODES = frozenset({"Sort", "Hash", "SetOp", "WindowAgg"})
+
+# MySQL plan keys of sorts, temporary tables and join buffers
+_MYSQL_BLOCKING_KEYS = (
+    "using_filesort",
+    "using_temporary_table",
+    "using_join_buffer",
+    "materialized_from_subquery",
+    "grouping_operation",
+    "duplicates_removal",
+    "windowing",
+)
+
+# SQLite plan steps that sort or materialize an input, or build a transient index
+_SQLITE_BLOCKING_STEPS = (
+    "USE TEMP B-TREE",
+    "AUTOMATIC",
+    "MATERIALIZE",
+    "CO-ROUTINE",
+    "BLOOM FILTER",
+)
+
+# Table row counts per connection, with the fetch time of the metadata they came from
+_table_rows_cache: dict[str, tuple[datetime, dict[str, int]]] = {}
+
+
+class QueryRejectedError(Exception):
+    """Query rejected by the connection's cost guardrails."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize query rejected error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+async def explain_query(
+    engine: AsyncEngine,
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    table_rows: dict[str, int] | None = None,
+    params: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Get the estimated plan of a query without running it.
+
+    Runs ``EXPLAIN (FORMAT JSON)`` on PostgreSQL, ``EXPLAIN FORMAT=JSON``
+    on MySQL and ``EXPLAIN QUERY PLAN`` on SQLite. SQLite plans carry no
+    estimates, so only full scans are reported for it. Scans that stop
+    once the query's LIMIT is reached are not full scans: on PostgreSQL
+    those under a Limit node with nothing in between that reads all its
+    input, on MySQL and SQLite all scans of a query that returns rows as it
+    reads them (see get_streaming_limit) when the plan neither sorts nor
+    materializes.
+
+    Args:
+        engine: Engine of the target database
+        db_connection: Database connection object
+        validated_sql: Validated SQL query
+        table_rows: Row counts by lowercase table name, from cached metadata
+        params: Bind parameter values of the query
+
+    Returns:
+        Plan summary with estimatedRows, estimatedCost, fullScans and the raw plan
+    """
+    database_type = db_connection.database_type
+    async with engine.connect() as conn:
+        if database_type == DatabaseType.POSTGRESQL:
+            explain = text(f"EXPLAIN (FORMAT JSON) {validated_sql}")
+            raw = (await conn.execute(explain, params)).scalar()
+        elif database_type == DatabaseType.MYSQL:
+            explain = text(f"EXPLAIN FORMAT=JSON {validated_sql}")
+            raw = (await conn.execute(explain, params)).scalar()
+        else:
+            result = await conn.execute(text(f"EXPLAIN QUERY PLAN {validated_sql}"), params)
+            raw = [
+                {"id": row[0], "parent": row[1], "detail": row[3]}
+                for row in result
+            ]
+
+    if isinstance(raw, (str, bytes)):
+        raw = json.loads(raw)
+
+    if database_type == DatabaseType.POSTGRESQL:
+        summary = _summarize_postgresql(raw)
+    elif database_type == DatabaseType.MYSQL:
+        summary = _summarize_mysql(raw, get_streaming_limit(validated_sql, database_type))
+    else:
+        summary = _summarize_sqlite(raw, get_streaming_limit(validated_sql, database_type))
+
+    table_rows = table_rows or {}
+    summary["fullScans"] = [
+        {"table": table, "rowCount": _lookup_rows(table_rows, table)}
+        for table in summary["fullScans"]
+    ]
+    summary["plan"] = raw
+    return summary
+
+
+def evaluate_guardrails(
+    db_connection: DatabaseConnection,
+    plan: dict[str, Any],
+) -> list[str]:
+    """List the connection's guardrails that a plan exceeds.
+
+    Args:
+        db_connection: Database connection object
+        plan: Plan summary from explain_query
+
+    Returns:
+        One warning per exceeded guardrail
+    """
+    options = get_connection_options(db_connection)
+    warnings = []
+
+    if (
+        options.explain_max_cost is not None
+        and plan["estimatedCost"] is not None
+        and plan["estimatedCost"] > options.explain_max_cost
+    ):
+        warnings.append(
+            f"Estimated cost {plan['estimatedCost']:g} exceeds the limit of "
+            f"{options.explain_max_cost:g}"
+        )
+
+    if (
+        options.explain_max_rows is not None
+        and plan["estimatedRows"] is not None
+        and plan["estimatedRows"] > options.explain_max_rows
+    ):
+        warnings.append(
+            f"Estimated {plan['estimatedRows']} rows exceeds the limit of "
+            f"{options.explain_max_rows}"
+        )
+
+    for scan in plan["fullScans"]:
+        if scan["rowCount"] is not None and scan["rowCount"] >= options.large_table_rows:
+            warnings.append(
+                f"Full scan of large table '{scan['table']}' ({scan['rowCount']} rows)"
+            )
+
+    return warnings
+
+
+async def get_table_rows(db_name: str) -> dict[str, int]:
+    """Get table row counts from a connection's cached metadata.
+
+    Args:
+        db_name: Database connection name
+
+    Returns:
+        Row counts by lowercase table name (empty if no metadata is cached)
+    """
+    async with async_session_maker() as session:
+        statement = select(DatabaseMetadata.fetched_at).where(
+            DatabaseMetadata.database_name == db_name
+        )
+        fetched_at = (await session.execute(statement)).scalar_one_or_none()
+        if fetched_at is None:
+            return {}
+
+        cached = _table_rows_cache.get(db_name)
+        if cached is not None and cached[0] == fetched_at:
+            return cached[1]
+
+        statement = select(DatabaseMetadata.metadata_json).where(
+            DatabaseMetadata.database_name == db_name
+        )
+        metadata_json = (await session.execute(statement)).scalar_one()
+
+    table_rows = get_table_row_counts(json.loads(metadata_json))
+    _table_rows_cache[db_name] = (fetched_at, table_rows)
+    return table_rows
+
+
+def invalidate_table_rows(db_name: str) -> None:
+    """Drop the cached row counts of a connection whose metadata changed in place.
+
+    Args:
+        db_name: Database connection name
+    """
+    _table_rows_cache.pop(db_name, None)
+
+
+async def check_guardrails(
+    engine: AsyncEngine,
+    db_connection: DatabaseConnection,
+    validated_sql: str,
+    params: dict[str, Any] | None = None,
+) -> list[str]:
+    """Apply the connection's plan policy to a query before it runs.
+
+    With ``explainPolicy`` ``off`` nothing is planned. With ``warn`` the
+    exceeded guardrails are returned so they can be reported with the
+    result, and with ``reject`` the query is refused. ``job`` refuses it
+    too, and POST /query then submits it as a query job. A failing EXPLAIN
+    does not block the query; the error surfaces when it runs.
+
+    Args:
+        engine: Engine of the target database
+        db_connection: Database connection object
+        validated_sql: Validated SQL query
+        params: Bind parameter values of the query
+
+    Returns:
+        Warnings for exceeded guardrails (empty if none or policy is off)
+
+    Raises:
+        QueryRejectedError: If the policy is reject or job and a guardrail is exceeded
+    """
+    policy = get_connection_options(db_connection).explain_policy
+    if policy == "off":
+        return []
+
+    try:
+        table_rows = await get_table_rows(db_connection.name)
+        plan = await explain_query(engine, db_connection, validated_sql, table_rows, params)
+    except Exception as e:
+        logger.warning(f"EXPLAIN failed on '{db_connection.name}', skipping guardrails: {e}")
+        return []
+
+    warnings = evaluate_guardrails(db_connection, plan)
+    if warnings and policy in ("reject", "job"):
+        raise QueryRejectedError(
+            "Query rejected by cost guardrails" if policy == "reject"
+            else "Query exceeds the cost guardrails and must run as a job",
+            {
+                "policy": policy,
+                "warnings": warnings,
+                "estimatedRows": plan["estimatedRows"],
+                "estimatedCost": plan["estimatedCost"],
+                "fullScans": plan["fullScans"],
+            },
+        )
+    return warnings
+
+
+def _summarize_postgresql(raw: list[dict[str, Any]]) -> dict[str, Any]:
+    """Extract estimates and sequential scans from a PostgreSQL JSON plan.
+
+    A Seq Scan under a Limit stops once the limit is reached, unless a node
+    in between (a sort, a hash table, a non-sorted aggregate, ...) reads all
+    its input first. Init plans and subplans run apart from their parent.
+    """
+    root = raw[0]["Plan"]
+    full_scans = []
+
+    def walk(node: dict[str, Any], limited: bool) -> None:
+        node_type = node.get("Node Type")
+        if node_type == "Limit":
+            limited = True
+        elif node_type in _POSTGRESQL_BLOCKING_NODES or (
+            node_type == "Aggregate" and node.get("Strategy") != "Sorted"
+        ):
+            limited = False
+
+        if node_type == "Seq Scan" and node.get("Relation Name") and not limited:
+            schema = node.get("Schema")
+            name = node["Relation Name"]
+            full_scans.append(f"{schema}.{name}" if schema else name)
+        for child in node.get("Plans", []):
+            walk(child, limited and child.get("Parent Relationship") not in ("InitPlan", "SubPlan"))
+
+    walk(root, False)
+    return {
+        "estimatedRows": int(root.get("Plan Rows", 0)),
+        "estimatedCost": float(root.get("Total Cost", 0)),
+        "fullScans": full_scans,
+    }
+
+
+def _summarize_mysql(raw: dict[str, Any], row_limit: int | None = None) -> dict[str, Any]:
+    """Extract estimates and full table scans from a MySQL JSON plan.
+
+    Args:
+        raw: EXPLAIN FORMAT=JSON output
+        row_limit: Limit of a query that returns rows as it reads them, if any
+    """
+    query_block = raw.get("query_block", {})
+    cost = query_block.get("cost_info", {}).get("query_cost")
+    full_scans = []
+    rows = None
+    blocking = False
+
+    def walk(node: Any) -> None:
+        nonlocal rows, blocking
+        if isinstance(node, dict):
+            if any(node.get(key) for key in _MYSQL_BLOCKING_KEYS):
+                blocking = True
+            table = node.get("table")
+            if isinstance(table, dict):
+                if table.get("access_type") == "ALL" and table.get("table_name"):
+                    full_scans.append(table["table_name"])
+                if table.get("rows_produced_per_join") is not None:
+                    # The last table of the join order produces the result rows
+                    rows = int(table["rows_produced_per_join"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(query_block)
+    return {
+        "estimatedRows": rows,
+        "estimatedCost": float(cost) if cost is not None else None,
+        "fullScans": full_scans if row_limit is None or blocking else [],
+    }
+
+
+def _summarize_sqlite(raw: list[dict[str, Any]], row_limit: int | None = None) -> dict[str, Any]:
+    """Extract full table scans from a SQLite query plan.
+
+    Args:
+        raw: EXPLAIN QUERY PLAN steps
+        row_limit: Limit of a query that returns rows as it reads them, if any
+    """
+    if row_limit is not None and not any(
+        blocking in step["detail"] for step in raw for blocking in _SQLITE_BLOCKING_STEPS
+    ):
+        return {"estimatedRows": None, "estimatedCost": None, "fullScans": []}
+
+    full_scans = []
+    for step in raw:
+        match = _SQLITE_SCAN_PATTERN.match(step["detail"])
+        # Scans through an index are range or covering-index scans, not table scans
+        if match and "USING" not in step["detail"]:
+            full_scans.append(match.group(1))
+
+    return {"estimatedRows": None, "estimatedCost": None, "fullScans": full_scans}
+
+
+def _lookup_rows(table_rows: dict[str, int], table: str) -> int | None:
+    """Get a table's row count by qualified or bare name."""
+    name = table.lower()
+    return table_rows.get(name, table_rows.get(name.rsplit(".", 1)[-1]))
@@ -0,0 +1,236 @@
+"""Registry of running queries for cancellation."""
+
+import asyncio
+import logging
+import secrets
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models.database import DatabaseConnection, DatabaseType
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for delivering a cancel request to the target database
+CANCEL_TIMEOUT_SECONDS = 5
+
+
+class QueryCancelledError(Exception):
+    """Query cancelled while executing."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize query cancelled error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+@dataclass
+class RunningQuery:
+    """Statement executing on a target connection."""
+
+    query_id: str
+    db_name: str
+    database_type: DatabaseType
+    sql: str
+    engine: AsyncEngine
+    backend_id: int | None
+    driver_connection: Any
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    cancelled: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def guard(self, awaitable: Awaitable[Any]) -> Any:
+        """Await a database call, stopping the statement first if the caller is cancelled.
+
+        Cancelling a task inside a driver call makes SQLAlchemy invalidate the
+        connection, which waits for the statement to finish. The call runs
+        shielded instead, and on cancellation the statement is cancelled on
+        the target before the CancelledError propagates.
+        """
+        task = asyncio.ensure_future(awaitable)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            await self.cancel()
+            try:
+                await task
+            except Exception:
+                pass
+            raise
+
+    async def cancel(self) -> None:
+        """Cancel the statement on the target, once."""
+        async with self.lock:
+            if not self.cancelled:
+                self.cancelled = True
+                await _cancel_backend(self)
+
+
+class QueryRegistry:
+    """Running queries by connection name and query id.
+
+    A query is registered while its statement runs and can be cancelled on
+    the target: ``pg_cancel_backend`` on PostgreSQL, ``KILL QUERY`` on
+    MySQL and ``interrupt()`` on SQLite. Cancellation and unregistration
+    share a per-query lock, so the connection is not returned to the pool
+    (and reused by another query) while a cancel request is in flight.
+    Database calls made through ``RunningQuery.guard`` are also cancelled
+    on the target when their task is cancelled, for example because the
+    HTTP client disconnected.
+    """
+
+    def __init__(self):
+        """Initialize query registry."""
+        self._running: dict[tuple[str, str], RunningQuery] = {}
+
+    @staticmethod
+    def new_query_id() -> str:
+        """Generate a query id."""
+        return secrets.token_urlsafe(12)
+
+    def get(self, db_name: str, query_id: str) -> RunningQuery | None:
+        """Get a running query."""
+        return self._running.get((db_name, query_id))
+
+    def list_running(self, db_name: str) -> list[dict[str, Any]]:
+        """List the running queries of a connection.
+
+        Args:
+            db_name: Database connection name
+
+        Returns:
+            List of running query summaries
+        """
+        now = datetime.utcnow()
+        return [
+            {
+                "queryId": running.query_id,
+                "sql": running.sql,
+                "startedAt": running.started_at.isoformat(),
+                "elapsedMs": int((now - running.started_at).total_seconds() * 1000),
+                "cancelled": running.cancelled,
+            }
+            for (name, _), running in self._running.items()
+            if name == db_name
+        ]
+
+    @asynccontextmanager
+    async def track(
+        self,
+        query_id: str,
+        db_connection: DatabaseConnection,
+        engine: AsyncEngine,
+        conn: AsyncConnection,
+        sql: str,
+    ) -> AsyncIterator[RunningQuery]:
+        """Register a query for the duration of its execution on conn.
+
+        Args:
+            query_id: Query id
+            db_connection: Database connection object
+            engine: Engine the connection belongs to
+            conn: Connection executing the statement
+            sql: SQL being executed
+
+        Yields:
+            RunningQuery
+
+        Raises:
+            ValueError: If the query id is already in use
+            QueryCancelledError: If the statement failed because it was cancelled
+        """
+        key = (db_connection.name, query_id)
+        if key in self._running:
+            raise ValueError(f"Query id '{query_id}' is already in use")
+
+        backend_id, driver_connection = await _get_backend(conn, db_connection.database_type)
+        running = RunningQuery(
+            query_id=query_id,
+            db_name=db_connection.name,
+            database_type=db_connection.database_type,
+            sql=sql,
+            engine=engine,
+            backend_id=backend_id,
+            driver_connection=driver_connection,
+        )
+        self._running[key] = running
+
+        try:
+            yield running
+        except (asyncio.CancelledError, GeneratorExit):
+            # The caller went away between database calls (e.g. a stream consumer)
+            await running.cancel()
+            raise
+        except Exception as e:
+            if running.cancelled:
+                raise QueryCancelledError(
+                    "Query was cancelled", {"queryId": query_id}
+                ) from e
+            raise
+        finally:
+            async with running.lock:
+                self._running.pop(key, None)
+
+    async def cancel(self, db_name: str, query_id: str) -> bool:
+        """Cancel a running query.
+
+        Args:
+            db_name: Database connection name
+            query_id: Query id
+
+        Returns:
+            True if the query was running and a cancel request was sent
+        """
+        running = self._running.get((db_name, query_id))
+        if running is None:
+            return False
+
+        await running.cancel()
+        return True
+
+
+async def _get_backend(
+    conn: AsyncConnection, database_type: DatabaseType
+) -> tuple[int | None, Any]:
+    """Get the server-side id or driver connection needed to cancel a statement."""
+    raw = await conn.get_raw_connection()
+    driver_connection = raw.driver_connection
+
+    if database_type == DatabaseType.POSTGRESQL:
+        return driver_connection.get_server_pid(), None
+    if database_type == DatabaseType.MYSQL:
+        return driver_connection.thread_id(), None
+    return None, driver_connection
+
+
+async def _cancel_backend(running: RunningQuery) -> None:
+    """Ask the target database to stop the statement of a running query."""
+    try:
+        if running.database_type == DatabaseType.SQLITE:
+            # aiosqlite calls sqlite3's thread-safe interrupt() directly
+            await running.driver_connection.interrupt()
+        else:
+            await asyncio.wait_for(_send_cancel(running), timeout=CANCEL_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to cancel query '{running.query_id}' on '{running.db_name}': {e}")
+
+
+async def _send_cancel(running: RunningQuery) -> None:
+    """Cancel a statement from another pooled connection."""
+    if running.database_type == DatabaseType.POSTGRESQL:
+        statement = text("SELECT pg_cancel_backend(:pid)").bindparams(pid=running.backend_id)
+    else:
+        statement = text(f"KILL QUERY {int(running.backend_id)}")
+
+    async with running.engine.connect() as conn:
+        await conn.execute(statement)
+
+
+# Query registry instance
+query_registry = QueryRegistry()
@@ -0,0 +1,307 @@
+"""Routing of reads across the replicas of a database connection."""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.db_connection import ConnectionError, describe_url, get_connection_options
+from app.services.engine_registry import engine_registry
+
+logger = logging.getLogger(__name__)
+
+# MySQL error code of a statement the server cannot parse
+_MYSQL_PARSE_ERROR = 1064
+
+
+@dataclass
+class _Replica:
+    """Replica endpoint and its health."""
+
+    url: str
+    weight: int
+    healthy: bool = True
+    lag_seconds: float | None = None
+    last_error: str | None = None
+    checked_at: float | None = None
+    routed: int = 0
+    failures: int = 0
+
+
+@dataclass
+class _ReplicaSet:
+    """Replicas of one connection."""
+
+    db_connection: DatabaseConnection
+    replicas: list[_Replica]
+    last_used: float
+
+
+class ReplicaRouter:
+    """Spreads the reads of a connection over its read replicas.
+
+    Every query this tool runs is a read, so connections with replicas send
+    queries and metadata extraction to a replica and use the primary only
+    when no replica is usable. A replica is picked at random with its weight
+    scaled down by the connections already checked out on it, so idle
+    replicas share load by weight and busy ones receive less of it.
+
+    A background probe checks each replica of recently used connections
+    and measures its replication lag; replicas that fail the probe or lag
+    more than the connection's ``replicaMaxLagSeconds`` are skipped. A
+    replica whose connection fails or drops during a query is taken out of
+    rotation immediately and comes back once a probe succeeds again.
+    """
+
+    def __init__(self, health_interval: float, idle_timeout: float):
+        """Initialize replica router."""
+        self.health_interval = health_interval
+        self.idle_timeout = idle_timeout
+        self._sets: dict[str, _ReplicaSet] = {}
+        self._watched: weakref.WeakSet = weakref.WeakSet()
+        self._prober: asyncio.Task | None = None
+        self._counters = {"routed": 0, "primaryFallbacks": 0, "ejections": 0}
+
+    async def get_engine(self, db_connection: DatabaseConnection) -> AsyncEngine:
+        """Get the engine to run a read on.
+
+        Args:
+            db_connection: Database connection object
+
+        Returns:
+            Engine of a usable replica, or of the primary
+
+        Raises:
+            ConnectionError: If the global connection budget is exhausted
+        """
+        if not db_connection.replicas:
+            return await engine_registry.get_engine(db_connection)
+
+        replica_set = self._sync(db_connection)
+        replica_set.last_used = time.monotonic()
+        max_lag = get_connection_options(db_connection).replica_max_lag_seconds
+        usable = [
+            r for r in replica_set.replicas
+            if r.healthy and (r.lag_seconds is None or r.lag_seconds <= max_lag)
+        ]
+        if not usable:
+            self._counters["primaryFallbacks"] += 1
+            return await engine_registry.get_engine(db_connection)
+
+        # Weighted choice, favouring replicas with fewer queries in flight
+        weights = [
+            r.weight / (engine_registry.checked_out(db_connection.name, r.url) + 1)
+            for r in usable
+        ]
+        replica = random.choices(usable, weights)[0]
+        replica.routed += 1
+        self._counters["routed"] += 1
+
+        engine = await engine_registry.get_engine(db_connection, replica.url)
+        self._watch(engine, db_connection.name, replica.url)
+        return engine
+
+    def invalidate(self, name: str) -> None:
+        """Forget the replicas and health of a connection.
+
+        Args:
+            name: Database connection name
+        """
+        self._sets.pop(name, None)
+
+    async def check_health(self) -> None:
+        """Probe the replicas of every recently used connection."""
+        now = time.monotonic()
+        for name, replica_set in list(self._sets.items()):
+            if now - replica_set.last_used > self.idle_timeout:
+                # Stop probing (and keeping engines alive) for unused connections
+                del self._sets[name]
+                continue
+            await asyncio.gather(*(
+                self._probe(replica_set.db_connection, replica)
+                for replica in replica_set.replicas
+            ))
+
+    def start(self) -> None:
+        """Start the background health probe."""
+        if self._prober is None or self._prober.done():
+            self._prober = asyncio.create_task(self._probe_forever())
+
+    async def close(self) -> None:
+        """Stop the health probe."""
+        if self._prober is not None:
+            self._prober.cancel()
+            try:
+                await self._prober
+            except asyncio.CancelledError:
+                pass
+            self._prober = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get routing counters and the health of every tracked replica."""
+        now = time.monotonic()
+        return {
+            **self._counters,
+            "connections": [
+                {
+                    "name": name,
+                    "replicas": [
+                        {
+                            "url": describe_url(r.url),
+                            "weight": r.weight,
+                            "healthy": r.healthy,
+                            "lagSeconds": r.lag_seconds,
+                            "inFlight": engine_registry.checked_out(name, r.url),
+                            "routed": r.routed,
+                            "failures": r.failures,
+                            "lastError": r.last_error,
+                            "checkedSecondsAgo": (
+                                round(now - r.checked_at, 1) if r.checked_at is not None else None
+                            ),
+                        }
+                        for r in replica_set.replicas
+                    ],
+                }
+                for name, replica_set in self._sets.items()
+            ],
+        }
+
+    def _sync(self, db_connection: DatabaseConnection) -> _ReplicaSet:
+        """Get the replica set of a connection, following changes to its replicas."""
+        wanted = [(r["url"], r.get("weight", 1)) for r in db_connection.replicas]
+        replica_set = self._sets.get(db_connection.name)
+
+        if replica_set is None or [(r.url, r.weight) for r in replica_set.replicas] != wanted:
+            # Replicas that stay keep their health
+            known = {r.url: r for r in replica_set.replicas} if replica_set else {}
+            replicas = []
+            for url, weight in wanted:
+                replica = known.get(url) or _Replica(url=url, weight=weight)
+                replica.weight = weight
+                replicas.append(replica)
+            replica_set = _ReplicaSet(db_connection, replicas, time.monotonic())
+            self._sets[db_connection.name] = replica_set
+
+        replica_set.db_connection = db_connection
+        return replica_set
+
+    def _watch(self, engine: AsyncEngine, name: str, url: str) -> None:
+        """Take a replica out of rotation when its engine reports a connection failure."""
+        if engine.sync_engine in self._watched:
+            return
+        self._watched.add(engine.sync_engine)
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def _on_error(context: ExceptionContext) -> None:
+            # No connection means connecting failed; statement errors leave the replica in rotation
+            if context.connection is None or context.is_disconnect:
+                replica_set = self._sets.get(name)
+                for replica in replica_set.replicas if replica_set else []:
+                    if replica.url == url:
+                        self._eject(replica, context.original_exception)
+
+    def _eject(self, replica: _Replica, error: BaseException) -> None:
+        """Mark a replica unhealthy until its next successful probe."""
+        replica.failures += 1
+        replica.last_error = str(error)
+        if replica.healthy:
+            replica.healthy = False
+            self._counters["ejections"] += 1
+            logger.warning(f"Replica {describe_url(replica.url)} taken out of rotation: {error}")
+
+    async def _probe(self, db_connection: DatabaseConnection, replica: _Replica) -> None:
+        """Check that a replica answers and measure its replication lag."""
+        try:
+            engine = await engine_registry.get_engine(db_connection, replica.url)
+            self._watch(engine, db_connection.name, replica.url)
+            lag = await asyncio.wait_for(
+                _replication_lag(engine, db_connection.database_type),
+                timeout=self.health_interval,
+            )
+        except Exception as e:
+            self._eject(replica, e)
+        else:
+            if not replica.healthy:
+                logger.info(f"Replica {describe_url(replica.url)} back in rotation")
+            replica.healthy = True
+            replica.lag_seconds = lag
+            replica.last_error = None
+        replica.checked_at = time.monotonic()
+
+    async def _probe_forever(self) -> None:
+        """Periodically probe replicas."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.warning(f"Replica health check failed: {e}")
+
+
+async def _replication_lag(engine: AsyncEngine, database_type: DatabaseType) -> float | None:
+    """Get how far a replica is behind its primary.
+
+    Args:
+        engine: Engine of the replica
+        database_type: Database type
+
+    Returns:
+        Lag in seconds (0 for a server that is not replicating, None if unknown)
+
+    Raises:
+        ConnectionError: If replication on a MySQL replica is stopped
+    """
+    async with engine.connect() as conn:
+        return await _query_lag(conn, database_type)
+
+
+async def _query_lag(conn: AsyncConnection, database_type: DatabaseType) -> float | None:
+    """Query the replication lag on a replica connection."""
+    if database_type == DatabaseType.POSTGRESQL:
+        # The last replay time only measures lag while replay is behind what was
+        # received; on an idle primary it keeps growing although nothing is missing
+        result = await conn.execute(text(
+            "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+            "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        ))
+        lag = result.scalar()
+        return max(0.0, float(lag)) if lag is not None else None
+
+    if database_type == DatabaseType.MYSQL:
+        try:
+            result = await conn.execute(text("SHOW REPLICA STATUS"))
+            column = "Seconds_Behind_Source"
+        except ProgrammingError as e:
+            # Servers before MySQL 8.0.22 do not know the statement
+            if not e.orig.args or e.orig.args[0] != _MYSQL_PARSE_ERROR:
+                raise
+            result = await conn.execute(text("SHOW SLAVE STATUS"))
+            column = "Seconds_Behind_Master"
+        status = result.mappings().first()
+        if status is None:
+            return 0.0
+        if status[column] is None:
+            raise ConnectionError("Replication is not running", {"column": column})
+        return float(status[column])
+
+    # SQLite has no replication; the probe only checks the file opens
+    await conn.execute(text("SELECT 1"))
+    return 0.0
+
+
+# Replica router instance
+replica_router = ReplicaRouter(
+    health_interval=settings.replica_health_interval_seconds,
+    idle_timeout=settings.target_engine_idle_timeout_seconds,
+)
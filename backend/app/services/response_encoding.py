@@ -0,0 +1,111 @@
+"""JSON encoding of query result responses."""
+
+from typing import Any
+
+import pydantic_core
+
+from app.models.schemas import BaseSchema
+from app.services.cpu_offload import cheap_to_ship, cpu_offloader
+
+# Result fields holding row or column values
+_VALUE_FIELDS = ("rows", "data")
+
+
+async def encode_result(schema: type[BaseSchema], result: dict[str, Any]) -> bytes:
+    """Encode a query result as the JSON body of its response schema.
+
+    The envelope (columns, counts, tokens) is validated against the schema,
+    but rows and column vectors are serialized by pydantic-core as they are,
+    without validating every row against the response model and dumping it
+    again. ``rows`` holds row tuples in column order, written as one object
+    per row. Values come out as they would through the model: Decimal as a
+    string, dates, times and durations in ISO 8601, bytes as UTF-8 text and
+    non-finite floats as null. Bytes that are not valid UTF-8, which the
+    model cannot serialize, are decoded with invalid sequences replaced by
+    U+FFFD, as in the NDJSON stream.
+
+    Rows and vectors of large results are encoded in chunks by the CPU
+    offloader, in worker processes if their values are cheap to hand over,
+    and the chunks joined.
+
+    Args:
+        schema: Response schema of the result
+        result: Query result with camelCase keys
+
+    Returns:
+        JSON document
+    """
+    values = {key: result[key] for key in _VALUE_FIELDS if result.get(key) is not None}
+    envelope = schema.model_validate(
+        {**result, **{key: [] for key in values}}
+    ).model_dump(mode="json", by_alias=True)
+
+    encoded = {}
+    if "rows" in values:
+        rows = values["rows"]
+        names = [column["name"] for column in envelope["columns"]]
+        encoded["rows"] = _array_parts(await cpu_offloader.map(
+            encode_row_objects, rows, len(names), names,
+            offloadable=not rows or cheap_to_ship(rows[0]),
+        ))
+    if "data" in values:
+        vectors = values["data"]
+        encoded["data"] = _array_parts(await cpu_offloader.map(
+            encode_json_array, vectors, envelope["rowCount"],
+            offloadable=cheap_to_ship(v["values"][0] for v in vectors if v.get("values")),
+        ))
+
+    # Joined once, so the body is copied once however large it is
+    parts: list = [b"{"]
+    for key, value in envelope.items():
+        if len(parts) > 1:
+            parts.append(b",")
+        parts += [_to_json(key), b":"]
+        if key in encoded:
+            parts += encoded[key]
+        else:
+            parts.append(_to_json(value))
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def encode_row_objects(rows: list, names: list[str]) -> bytes:
+    """Encode row tuples as a JSON array of row objects."""
+    return _to_json([dict(zip(names, row)) for row in rows])
+
+
+def encode_json_array(items: list) -> bytes:
+    """Encode values as a JSON array."""
+    return _to_json(items)
+
+
+def _to_json(value: Any) -> bytes:
+    """Serialize a value the way the response models do."""
+    try:
+        return pydantic_core.to_json(value, inf_nan_mode="null")
+    except pydantic_core.PydanticSerializationError:
+        # Binary values that are not UTF-8; only then are the values walked
+        return pydantic_core.to_json(_decode_bytes(value), inf_nan_mode="null")
+
+
+def _decode_bytes(value: Any) -> Any:
+    """Replace bytes nested in lists, tuples and dicts by text, replacing invalid UTF-8."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, dict):
+        return {key: _decode_bytes(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_decode_bytes(item) for item in value]
+    return value
+
+
+def _array_parts(chunks: list[bytes]) -> list:
+    """Get the parts of one JSON array from arrays encoded chunk by chunk."""
+    parts: list = [b"["]
+    for chunk in chunks:
+        if chunk != b"[]":
+            if len(parts) > 1:
+                parts.append(b",")
+            parts.append(memoryview(chunk)[1:-1])
+    parts.append(b"]")
+    return parts
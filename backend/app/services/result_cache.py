@@ -0,0 +1,294 @@
+"""Two-tier query result cache (in-memory LRU + optional on-disk tier)."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.sql_validator import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+# Disk entries start with the creation timestamp (wall clock, shared by workers)
+_HEADER = struct.Struct("<d")
+
+
+class CacheMissError(Exception):
+    """Cached result required but not available."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        """Initialize cache miss error."""
+        super().__init__(message)
+        self.message = message
+        self.details = details or {}
+
+
+@dataclass
+class CachedResult:
+    """Cached query result and its age."""
+
+    value: dict[str, Any]
+    age_ms: int
+
+
+class ResultCache:
+    """Query result cache keyed by connection name, version and normalized SQL.
+
+    The memory tier is an LRU bounded by the total size of the pickled
+    entries. The optional disk tier stores one file per entry so several
+    uvicorn workers and restarts share hot results. Freshness is decided at
+    read time from the caller's TTL, so changing a connection's TTL applies
+    to entries that are already cached.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        max_entry_bytes: int,
+        disk_dir: Path | None = None,
+        max_disk_bytes: int = 0,
+    ):
+        """Initialize result cache."""
+        self.max_memory_bytes = max_memory_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_writes = 0
+        self._counters = {
+            "memoryHits": 0,
+            "diskHits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        db_name: str,
+        sql: str,
+        variant: str | None = None,
+        database_type: DatabaseType | None = None,
+        params: dict[str, Any] | None = None,
+        version: str | None = None,
+    ) -> str:
+        """Build the cache key for a query.
+
+        Args:
+            db_name: Database connection name
+            sql: Validated SQL query
+            variant: Result encoding, for results not in the default format
+            database_type: Target database type, selecting the SQL dialect
+            params: Bind parameter values of the query
+            version: Connection version from connection_version
+
+        Returns:
+            Cache key
+        """
+        db_part = hashlib.sha256(db_name.encode("utf-8")).hexdigest()[:12]
+        statement = normalize_sql(sql, database_type)
+        if version:
+            statement = version + "\0" + statement
+        if params:
+            # JSON keeps 1, "1" and true apart
+            statement += "\0" + json.dumps(params, sort_keys=True, default=str)
+        sql_part = hashlib.sha256(statement.encode("utf-8")).hexdigest()
+        if variant:
+            return f"{db_part}-{sql_part}-{variant}"
+        return f"{db_part}-{sql_part}"
+
+    async def get(self, key: str, ttl_seconds: int) -> CachedResult | None:
+        """Get a fresh cached result.
+
+        Args:
+            key: Cache key from make_key
+            ttl_seconds: Maximum acceptable age
+
+        Returns:
+            CachedResult, or None on a miss or if the entry is older than the TTL
+        """
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, payload = entry
+            if now - created_at <= ttl_seconds:
+                self._memory.move_to_end(key)
+                self._counters["memoryHits"] += 1
+                return CachedResult(pickle.loads(payload), int((now - created_at) * 1000))
+            self._counters["expired"] += 1
+            self._drop_memory(key)
+
+        if self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                created_at, payload = entry
+                if now - created_at <= ttl_seconds:
+                    self._store_memory(key, created_at, payload)
+                    self._counters["diskHits"] += 1
+                    return CachedResult(pickle.loads(payload), int((now - created_at) * 1000))
+                self._counters["expired"] += 1
+
+        self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, value: dict[str, Any]) -> None:
+        """Store a query result.
+
+        Args:
+            key: Cache key from make_key
+            value: Query result dictionary
+        """
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_entry_bytes:
+            return
+
+        created_at = time.time()
+        self._store_memory(key, created_at, payload)
+        self._counters["stores"] += 1
+
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, created_at, payload)
+
+    async def invalidate(self, db_name: str) -> None:
+        """Drop every cached result for a connection.
+
+        Args:
+            db_name: Database connection name
+        """
+        prefix = self.make_key(db_name, "").split("-", 1)[0] + "-"
+        for key in [k for k in self._memory if k.startswith(prefix)]:
+            self._drop_memory(key)
+
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._remove_disk, prefix)
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        hits = self._counters["memoryHits"] + self._counters["diskHits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hits": hits,
+            "hitRatio": round(hits / lookups, 4) if lookups else None,
+            "memoryEntries": len(self._memory),
+            "memoryBytes": self._memory_bytes,
+            "maxMemoryBytes": self.max_memory_bytes,
+            "diskEnabled": self.disk_dir is not None,
+        }
+
+    def _store_memory(self, key: str, created_at: float, payload: bytes) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._drop_memory(key)
+        self._memory[key] = (created_at, payload)
+        self._memory_bytes += len(payload)
+
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+            self._counters["evictions"] += 1
+
+    def _drop_memory(self, key: str) -> None:
+        """Remove an entry from the memory tier."""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    def _read_disk(self, key: str) -> tuple[float, bytes] | None:
+        """Read an entry from the disk tier."""
+        try:
+            data = (self.disk_dir / f"{key}.pkl").read_bytes()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        (created_at,) = _HEADER.unpack_from(data)
+        return created_at, data[_HEADER.size:]
+
+    def _write_disk(self, key: str, created_at: float, payload: bytes) -> None:
+        """Write an entry to the disk tier atomically."""
+        path = self.disk_dir / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(created_at))
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cached result to disk: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % 50 == 0:
+            self._prune_disk()
+
+    def _remove_disk(self, prefix: str) -> None:
+        """Remove disk entries whose key starts with prefix."""
+        for path in self.disk_dir.glob(f"{prefix}*.pkl"):
+            path.unlink(missing_ok=True)
+
+    def _prune_disk(self) -> None:
+        """Remove the oldest disk entries until the tier fits its budget."""
+        entries = []
+        for path in self.disk_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def connection_version(db_connection: DatabaseConnection) -> str:
+    """Get a version of a connection's target for cache keys.
+
+    invalidate only reaches the memory tier of the process that handled the
+    change; keying on the URL and the last update keeps other workers and
+    the shared disk tier from serving results of a previous target.
+
+    Args:
+        db_connection: Database connection object
+
+    Returns:
+        Short hash of the URL and update time
+    """
+    updated_at = db_connection.updated_at.isoformat() if db_connection.updated_at else ""
+    return hashlib.sha256(f"{db_connection.url}\0{updated_at}".encode()).hexdigest()[:12]
+
+
+def _disk_dir() -> Path | None:
+    """Get the disk tier directory, if enabled."""
+    if not settings.query_cache_disk_enabled:
+        return None
+    return Path(__file__).parent.parent.parent / "db" / "result_cache"
+
+
+# Result cache instance
+result_cache = ResultCache(
+    max_memory_bytes=settings.query_cache_max_memory_bytes,
+    max_entry_bytes=settings.query_cache_max_entry_bytes,
+    disk_dir=_disk_dir(),
+    max_disk_bytes=settings.query_cache_max_disk_bytes,
+)
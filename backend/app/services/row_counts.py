@@ -0,0 +1,176 @@
+"""Exact table row counting in the background."""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlmodel import select
+
+from app.database import async_session_maker
+from app.models.database import DatabaseConnection
+from app.models.metadata import DatabaseMetadata
+from app.services.db_connection import get_connection_options, set_statement_timeout
+from app.services.replica_router import replica_router
+
+logger = logging.getLogger(__name__)
+
+
+class ExactRowCounter:
+    """Replaces estimated row counts in cached metadata with exact counts.
+
+    Metadata carries the row estimates of the database statistics. After a
+    refresh of a connection whose ``rowCounts`` option is ``exact``, its
+    tables are counted with ``COUNT(*)`` one at a time in a background task,
+    smallest estimate first so that as many tables as possible fit in the
+    connection's ``exactCountBudgetSeconds``. Every statement runs with the
+    rest of the budget as its timeout, so one large table cannot overrun
+    it. Counted tables are then marked ``exact`` in the cached metadata; the
+    others keep their estimates. A newer refresh of the connection cancels
+    counting for the older one.
+    """
+
+    def __init__(self):
+        """Initialize exact row counter."""
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._counters = {
+            "runs": 0,
+            "tablesCounted": 0,
+            "budgetExhausted": 0,
+            "failed": 0,
+            "superseded": 0,
+        }
+
+    def schedule(
+        self,
+        db_connection: DatabaseConnection,
+        metadata_dict: dict[str, Any],
+        fetched_at: datetime,
+    ) -> None:
+        """Count the tables of freshly cached metadata, if the connection asks for it.
+
+        Args:
+            db_connection: DatabaseConnection instance
+            metadata_dict: Metadata dictionary that was cached
+            fetched_at: Fetch time of the cached metadata
+        """
+        options = get_connection_options(db_connection)
+        if options.row_counts != "exact":
+            return
+
+        tables = [
+            (table.get("schemaName"), table["name"], table.get("rowCount"))
+            for table in metadata_dict.get("tables", [])
+        ]
+        if not tables:
+            return
+
+        name = db_connection.name
+        previous = self._tasks.pop(name, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self._counters["superseded"] += 1
+
+        task = asyncio.create_task(
+            self._count(db_connection, tables, fetched_at, options.exact_count_budget_seconds)
+        )
+        self._tasks[name] = task
+        task.add_done_callback(lambda done: self._forget(name, done))
+
+    async def close(self) -> None:
+        """Cancel running counts."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Get counting counters."""
+        return {**self._counters, "running": len(self._tasks)}
+
+    async def _count(
+        self,
+        db_connection: DatabaseConnection,
+        tables: list[tuple[str, str, int | None]],
+        fetched_at: datetime,
+        budget_seconds: int,
+    ) -> None:
+        """Count tables until the budget is spent and save the counts."""
+        self._counters["runs"] += 1
+        deadline = time.monotonic() + budget_seconds
+        counts: dict[tuple[str, str], int] = {}
+
+        try:
+            engine = await replica_router.get_engine(db_connection)
+            quote = engine.dialect.identifier_preparer.quote
+
+            # Tables without an estimate first: they are the ones SQLite has no statistics for
+            for schema, table, _ in sorted(tables, key=lambda t: (t[2] is not None, t[2] or 0)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["budgetExhausted"] += 1
+                    break
+                try:
+                    async with engine.connect() as conn:
+                        # Statement timeouts are whole seconds
+                        await set_statement_timeout(
+                            conn, db_connection.database_type, math.ceil(remaining)
+                        )
+                        result = await conn.execute(
+                            text(f"SELECT COUNT(*) FROM {quote(schema)}.{quote(table)}")
+                        )
+                        counts[(schema, table)] = result.scalar() or 0
+                    self._counters["tablesCounted"] += 1
+                except Exception as e:
+                    if time.monotonic() >= deadline:
+                        self._counters["budgetExhausted"] += 1
+                        break
+                    logger.warning(f"Exact row count of {schema}.{table} failed: {e}")
+
+            if counts:
+                await self._save(db_connection.name, fetched_at, counts)
+        except Exception as e:
+            self._counters["failed"] += 1
+            logger.error(f"Exact row counting for {db_connection.name} failed: {e}")
+
+    async def _save(
+        self,
+        db_name: str,
+        fetched_at: datetime,
+        counts: dict[tuple[str, str], int],
+    ) -> None:
+        """Write exact counts into the cached metadata they were made for."""
+        async with async_session_maker() as session:
+            statement = select(DatabaseMetadata).where(DatabaseMetadata.database_name == db_name)
+            cached = (await session.execute(statement)).scalar_one_or_none()
+            # Deleted or refreshed since; a newer refresh counts for itself
+            if cached is None or cached.fetched_at != fetched_at:
+                return
+
+            metadata_dict = json.loads(cached.metadata_json)
+            for table in metadata_dict.get("tables", []):
+                count = counts.get((table.get("schemaName"), table["name"]))
+                if count is not None:
+                    table["rowCount"] = count
+                    table["rowCountKind"] = "exact"
+
+            cached.metadata_json = json.dumps(metadata_dict)
+            await session.commit()
+
+        # Imported here: query_plan imports metadata, which imports this module
+        from app.services.query_plan import invalidate_table_rows
+        invalidate_table_rows(db_name)
+
+    def _forget(self, name: str, task: asyncio.Task) -> None:
+        """Drop a finished task unless a newer one replaced it."""
+        if self._tasks.get(name) is task:
+            del self._tasks[name]
+
+
+# Exact row counter instance
+exact_row_counter = ExactRowCounter()
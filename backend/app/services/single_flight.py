@@ -0,0 +1,96 @@
+"""Single-flight execution of identical concurrent operations."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight:
+    """Shared execution and the number of callers waiting for it."""
+
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Runs one execution per key at a time and shares its outcome.
+
+    A call whose key is already in flight waits for that execution instead
+    of starting its own, and every waiter gets the same result or the same
+    exception. The execution runs in its own task, so a waiter that is
+    cancelled (for example because its client disconnected) leaves without
+    affecting the others; only when the last waiter leaves is the execution
+    itself cancelled. Keys are released as soon as the execution ends, so
+    later calls start a fresh one.
+    """
+
+    def __init__(self):
+        """Initialize single-flight group."""
+        self._flights: dict[Hashable, _Flight] = {}
+        self._counters = {
+            "executions": 0,
+            "coalesced": 0,
+            "failed": 0,
+            "abandoned": 0,
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or wait for the execution already in flight for key.
+
+        Args:
+            key: Identity of the operation
+            fn: Starts the operation; only called if no execution is in flight
+
+        Returns:
+            Result of the shared execution
+
+        Raises:
+            Exception: Whatever the shared execution raised
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+            self._counters["executions"] += 1
+        else:
+            self._counters["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to use the result
+                flight.task.cancel()
+                self._counters["abandoned"] += 1
+
+    def in_flight(self) -> int:
+        """Get the number of executions currently running."""
+        return len(self._flights)
+
+    def stats(self) -> dict[str, Any]:
+        """Get execution and coalescing counters."""
+        calls = self._counters["executions"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            "inFlight": len(self._flights),
+            "coalescedRatio": round(self._counters["coalesced"] / calls, 4) if calls else None,
+        }
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        """Release the key of an ended execution."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self._counters["failed"] += 1
+
+
+# Single-flight groups for query executions and metadata extraction
+query_flights = SingleFlight()
+metadata_flights = SingleFlight()
@@ -0,0 +1,171 @@
+"""On-disk spool files for query results."""
+
+import bisect
+import mmap
+import os
+import pickle
+import secrets
+import shutil
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+# Every frame starts with its payload length and row count
+_FRAME_HEADER = struct.Struct("<II")
+
+# Windows access right needed to check that a process exists
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+class ResultSpool:
+    """Query result rows appended to a local file in pickled frames.
+
+    Each ``append`` writes one frame holding a batch of row tuples, without
+    column names, so the file is far smaller than the JSON rows it serves.
+    The offset and first row number of every frame are kept in memory. Once
+    finished, the file is memory-mapped read-only and a page of rows is
+    unpickled straight from the frames that hold it, so reads share the OS
+    page cache instead of copying the file into the process. Methods do
+    blocking file I/O; async callers run them in a thread.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize spool and create its file."""
+        self.path = path
+        self.row_count = 0
+        self.size_bytes = 0
+        self._frame_offsets: list[int] = []
+        self._frame_first_rows: list[int] = []
+        self._file = open(path, "wb")
+        self._map: mmap.mmap | None = None
+
+    def append(self, rows: list[tuple]) -> None:
+        """Write a batch of rows as one frame.
+
+        Args:
+            rows: Row tuples
+        """
+        if not rows:
+            return
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(_FRAME_HEADER.pack(len(payload), len(rows)))
+        self._file.write(payload)
+
+        self._frame_offsets.append(self.size_bytes)
+        self._frame_first_rows.append(self.row_count)
+        self.size_bytes += _FRAME_HEADER.size + len(payload)
+        self.row_count += len(rows)
+
+    def finish(self) -> None:
+        """Close the file for writing and map it for reading."""
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.size_bytes:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset: int, limit: int) -> list[tuple]:
+        """Read rows from a finished spool through its memory map.
+
+        Args:
+            offset: Number of the first row to read
+            limit: Maximum number of rows
+
+        Returns:
+            Row tuples (empty past the end)
+        """
+        if offset >= self.row_count or limit <= 0:
+            return []
+
+        end = min(offset + limit, self.row_count)
+        frame = bisect.bisect_right(self._frame_first_rows, offset) - 1
+        rows: list[tuple] = []
+
+        with memoryview(self._map) as view:
+            while frame < len(self._frame_offsets) and self._frame_first_rows[frame] < end:
+                start = self._frame_offsets[frame]
+                length, _ = _FRAME_HEADER.unpack_from(view, start)
+                start += _FRAME_HEADER.size
+                batch = pickle.loads(view[start:start + length])
+                first = self._frame_first_rows[frame]
+                rows.extend(batch[max(0, offset - first):end - first])
+                frame += 1
+
+        return rows
+
+    def iter_batches(self, batch_rows: int) -> Iterator[list[tuple]]:
+        """Read all rows of a finished spool in batches.
+
+        Args:
+            batch_rows: Rows per batch
+
+        Yields:
+            Lists of row tuples
+        """
+        for offset in range(0, self.row_count, batch_rows):
+            yield self.read(offset, batch_rows)
+
+    def remove(self) -> None:
+        """Close and delete the spool file."""
+        if not self._file.closed:
+            self._file.close()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A page is being read in another thread; the map closes once it is collected
+                pass
+            self._map = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def claim_process_dir(root: Path) -> Path:
+    """Create a spool directory for this process under a shared root.
+
+    Several server worker processes share the root. Each writes only below
+    its own ``<pid>-<token>`` directory, so a starting process removes the
+    directories of processes that have exited without touching the files of
+    live ones.
+
+    Args:
+        root: Directory shared by all processes
+
+    Returns:
+        New empty directory owned by this process
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    for entry in root.iterdir():
+        pid, separator, _ = entry.name.partition("-")
+        if entry.is_dir() and separator and pid.isdigit() and not _process_alive(int(pid)):
+            shutil.rmtree(entry, ignore_errors=True)
+
+    path = root / f"{os.getpid()}-{secrets.token_hex(4)}"
+    path.mkdir()
+    return path
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with the given id exists."""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
@@ -1,10 +1,54 @@
-"""SQL validation service using sqlparse."""
+"""SQL validation service using sqlglot."""
 
-import sqlparse
-from sqlparse.sql import Statement
-from sqlparse.tokens import Keyword, DML
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+from sqlglot.tokens import TokenType
+
+from app.config import settings
+from app.models.database import DatabaseType
+
+# sqlglot dialect of each target database type
+_DIALECTS = {
+    DatabaseType.POSTGRESQL: "postgres",
+    DatabaseType.MYSQL: "mysql",
+    DatabaseType.SQLITE: "sqlite",
+}
+
+# Nodes that write, change session state or take locks, wherever they appear
+_FORBIDDEN_NODES = (
+    exp.DML,
+    exp.DDL,
+    exp.Into,
+    exp.Lock,
+    exp.Command,
+    exp.Set,
+    exp.Pragma,
+    exp.Transaction,
+    exp.Commit,
+    exp.Rollback,
+    exp.Use,
+    exp.TruncateTable,
+    exp.LoadData,
+    exp.Grant,
+    exp.Analyze,
+)
+
+# Row limit added to interactive queries without a LIMIT clause
+DEFAULT_ROW_LIMIT = 1000
+
+# Select arguments a plain single-table SELECT may use
+_PLAIN_SELECT_ARGS = {"expressions", "from", "from_", "where"}
+
+# Select arguments that make a query read all its input before returning rows
+_BLOCKING_SELECT_ARGS = {"with", "with_", "group", "having", "distinct", "windows", "qualify"}
+
 
 class SQLValidationError(Exception):
     """SQL validation error."""
@@ -16,79 +60,478 @@ class SQLValidationError(Exception):
         self.details = details or {}
 
 
-def validate_and_transform_sql(sql: str) -> str:
+@dataclass
+class ParsedSQL:
+    """Parse result of one SQL text and what has been derived from it.
+
+    The parse tree is shared by every user of the cache entry and must not
+    be modified.
+    """
+
+    dialect: str | None
+    statement: exp.Expression | None = None
+    error: SQLValidationError | None = None
+    transformed: dict[tuple[int, int], str] = field(default_factory=dict)
+
+    @cached_property
+    def rejection(self) -> SQLValidationError | None:
+        """Validation error of the statement, if it is not a single read-only query."""
+        if self.error is not None:
+            return self.error
+        return _check_read_only(self.statement)
+
+    @cached_property
+    def canonical(self) -> str:
+        """Statement text with comments dropped and spacing and keyword case normalized."""
+        return self.statement.sql(dialect=self.dialect, comments=False)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Canonical text with every literal replaced by ``?``.
+
+        Queries that differ only in their literals (``WHERE id = 1`` and
+        ``WHERE id = 2``) share a fingerprint, so it groups executions of
+        the same query shape.
+        """
+        return self.statement.transform(_to_placeholder).sql(dialect=self.dialect, comments=False)
+
+    @cached_property
+    def parameters(self) -> frozenset[str]:
+        """Names of the statement's named bind parameters (``:name``)."""
+        return frozenset(
+            node.name for node in self.statement.find_all(exp.Placeholder) if node.this
+        )
+
+    @cached_property
+    def positional_parameters(self) -> list[str]:
+        """Texts of the statement's unnamed placeholders (``?``, ``$1``)."""
+        return sorted({
+            node.sql(dialect=self.dialect)
+            for node in self.statement.find_all(exp.Placeholder, exp.Parameter)
+            if (isinstance(node, exp.Placeholder) and not node.this)
+            or (isinstance(node, exp.Parameter) and isinstance(node.this, exp.Literal))
+        })
+
+    @cached_property
+    def single_table(self) -> tuple[str | None, str, list[str] | None] | None:
+        """Single-table SELECT description, see get_single_table_select."""
+        if self.rejection is not None:
+            return None
+        return _describe_single_table(self.statement)
+
+    @cached_property
+    def streaming_limit(self) -> int | None:
+        """Row limit that stops the query's table scans early, see get_streaming_limit."""
+        if self.rejection is not None:
+            return None
+        return _streaming_limit(self.statement)
+
+
+class SQLParseCache:
+    """Bounded LRU of SQL parse results keyed by a hash of dialect and text.
+
+    Manual queries, NL2SQL output, dashboard refreshes and result cache
+    keys all parse the same texts again and again; with the cache each
+    distinct text is parsed once while it stays among the ``max_entries``
+    most recently used. Syntax errors are cached as well.
+    """
+
+    def __init__(self, max_entries: int):
+        """Initialize parse cache."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, ParsedSQL] = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def parse(self, sql: str, dialect: str | None) -> ParsedSQL:
+        """Get the parse result of a SQL text, parsing it on a miss.
+
+        Args:
+            sql: Trimmed SQL text
+            dialect: sqlglot dialect name
+
+        Returns:
+            ParsedSQL (with error set if the text is not a single statement)
+        """
+        key = hashlib.sha256(f"{dialect}\0{sql}".encode()).hexdigest()
+        parsed = self._entries.get(key)
+        if parsed is not None:
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return parsed
+
+        self._counters["misses"] += 1
+        parsed = ParsedSQL(dialect=dialect)
+        try:
+            parsed.statement = _parse_single(sql, dialect)
+        except SQLValidationError as e:
+            parsed.error = e
+
+        self._entries[key] = parsed
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+        return parsed
+
+    def clear(self) -> None:
+        """Drop every cached parse result."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hitRate": round(self._counters["hits"] / lookups, 3) if lookups else 0,
+        }
+
+
+def validate_and_transform_sql(
+    sql: str,
+    limit: int | None = DEFAULT_ROW_LIMIT,
+    database_type: DatabaseType | None = None,
+    max_limit: int | None = None,
+    params: dict[str, Any] | None = None,
+) -> str:
     """Validate SQL and transform if needed.
-    
+
+    The statement is parsed in the target's dialect and must be a single
+    read-only query: a SELECT, set operation or parenthesized query without
+    data-modifying CTEs, ``SELECT ... INTO`` or locking clauses. Its
+    top-level ``LIMIT`` or ``FETCH FIRST`` (sqlglot also parses ``TOP``
+    into a limit) is found in the parse tree, added when missing and lowered
+    when it exceeds ``max_limit``. Parse results and transformed texts are
+    cached, so repeated queries are not parsed again.
+
+    Values are passed separately as named bind parameters (``:name``); the
+    names given must be exactly the placeholders of the statement, and
+    unnamed placeholders (``?``, ``$1``) are refused. Since the
+    text does not change with the values, repeated executions with other
+    values hit the parse cache.
+
     Args:
         sql: SQL query string
-        
+        limit: Row limit added when the query has no LIMIT clause (None to leave unbounded)
+        database_type: Target database type, selecting the SQL dialect
+        max_limit: Largest row limit allowed (default: the larger of limit and
+            settings.query_max_rows); ignored when limit is None
+        params: Bind parameter values by name
+
     Returns:
         Validated and transformed SQL query
-        
+
     Raises:
-        SQLValidationError: If SQL is invalid or contains non-SELECT statements
+        SQLValidationError: If SQL is invalid, contains non-SELECT statements
+            or its placeholders are unnamed or do not match params
     """
-    # Parse SQL
-    try:
-        parsed = sqlparse.parse(sql)
-    except Exception as e:
+    # Token offsets in the parse tree refer to the trimmed text
+    sql = sql.strip().rstrip(";")
+    parsed = sql_parse_cache.parse(sql, _DIALECTS.get(database_type))
+    if parsed.rejection is not None:
+        # A fresh exception per call; callers may add details
+        raise SQLValidationError(parsed.rejection.message, dict(parsed.rejection.details))
+
+    if parsed.positional_parameters:
         raise SQLValidationError(
-            f"Failed to parse SQL: {str(e)}",
-            {"error": str(e), "line": 1, "column": 0}
+            "Only named bind parameters (:name) are supported",
+            {"placeholders": parsed.positional_parameters}
         )
+
+    given = set(params or {})
+    if given != parsed.parameters:
+        raise SQLValidationError(
+            "Bind parameters do not match the placeholders of the query",
+            {
+                "missing": sorted(parsed.parameters - given),
+                "unexpected": sorted(given - parsed.parameters),
+            }
+        )
+
+    if limit is None:
+        return sql
+
+    max_limit = max_limit if max_limit is not None else max(limit, settings.query_max_rows)
+    transformed = parsed.transformed.get((limit, max_limit))
+    if transformed is None:
+        transformed = _apply_row_limit(
+            sql, parsed.statement, limit, max_limit, parsed.dialect
+        ) or sql
+        parsed.transformed[(limit, max_limit)] = transformed
+    return transformed
+
+
+def normalize_sql(sql: str, database_type: DatabaseType | None = None) -> str:
+    """Normalize SQL text for use in cache keys.
     
-    if not parsed:
-        raise SQLValidationError("Empty SQL query")
+    Comments are dropped, spacing and keyword case are normalized from the
+    parse tree. String literals and quoted identifiers are kept verbatim,
+    so queries that differ in a literal never collide.
     
+    Args:
+        sql: SQL query string
+        database_type: Target database type, selecting the SQL dialect
+        
+    Returns:
+        Normalized SQL string
+    """
+    sql = sql.strip().rstrip(";")
+    if not sql:
+        return ""
+
+    parsed = sql_parse_cache.parse(sql, _DIALECTS.get(database_type))
+    if parsed.error is not None:
+        return " ".join(sql.split())
+    return parsed.canonical
+
+
+def get_sql_fingerprint(sql: str, database_type: DatabaseType | None = None) -> str | None:
+    """Get the literal-normalized fingerprint of a query.
+
+    Args:
+        sql: SQL query string
+        database_type: Target database type, selecting the SQL dialect
+
+    Returns:
+        Fingerprint such as ``SELECT * FROM t WHERE id = ?``, or None if the
+        SQL cannot be parsed
+    """
+    parsed = sql_parse_cache.parse(sql.strip().rstrip(";"), _DIALECTS.get(database_type))
+    if parsed.error is not None:
+        return None
+    return parsed.fingerprint
+
+
+def get_single_table_select(
+    sql: str,
+    database_type: DatabaseType | None = None,
+) -> tuple[str | None, str, list[str] | None] | None:
+    """Describe a plain single-table SELECT, if the query is one.
+
+    Only ``SELECT <columns> FROM <table> [WHERE ...]`` qualifies: no joins,
+    grouping, ordering, DISTINCT, set operations or LIMIT. Such queries can
+    be paged with a keyset predicate on the table's primary key without
+    changing their result set.
+
+    Args:
+        sql: Validated SQL query string
+        database_type: Target database type, selecting the SQL dialect
+
+    Returns:
+        Tuple of (schema, table, unaliased output columns or None for ``*``),
+        or None if the query does not qualify
+    """
+    parsed = sql_parse_cache.parse(sql.strip().rstrip(";"), _DIALECTS.get(database_type))
+    return parsed.single_table
+
+
+def get_streaming_limit(sql: str, database_type: DatabaseType | None = None) -> int | None:
+    """Get the LIMIT of a query that can stop reading its tables once reached.
+
+    A SELECT without grouping, aggregates, DISTINCT, window functions, set
+    operations or subqueries returns rows as it reads them, so its LIMIT
+    bounds how much of each table is read, unless the database sorts or
+    materializes an input first (which only its plan tells).
+
+    Args:
+        sql: Validated SQL query string
+        database_type: Target database type, selecting the SQL dialect
+
+    Returns:
+        Literal row limit plus offset, or None if the query does not qualify
+    """
+    parsed = sql_parse_cache.parse(sql.strip().rstrip(";"), _DIALECTS.get(database_type))
+    return parsed.streaming_limit
+
+
+def _streaming_limit(statement: exp.Expression) -> int | None:
+    """Get the row limit plus offset of a parsed query that returns rows as it reads them."""
+    if not isinstance(statement, exp.Select):
+        return None
+    if any(statement.args.get(key) for key in _BLOCKING_SELECT_ARGS):
+        return None
+    if any(select is not statement for select in statement.find_all(exp.Select)):
+        return None
+    if statement.find(exp.AggFunc, exp.Window) is not None:
+        return None
+
+    rows = 0
+    for key in ("limit", "offset"):
+        node = statement.args.get(key)
+        if node is None:
+            if key == "limit":
+                return None
+            continue
+        value = node.args.get("count" if isinstance(node, exp.Fetch) else "expression")
+        if not isinstance(value, exp.Literal) or not value.is_int:
+            return None
+        rows += int(value.name)
+    return rows
+
+
+def _describe_single_table(
+    statement: exp.Expression,
+) -> tuple[str | None, str, list[str] | None] | None:
+    """Describe a parsed statement if it is a plain single-table SELECT."""
+    if not isinstance(statement, exp.Select):
+        return None
+
+    select = statement
+    if any(value for key, value in select.args.items() if key not in _PLAIN_SELECT_ARGS):
+        return None
+
+    # The FROM argument key differs between sqlglot versions
+    from_clause = select.args.get("from_") or select.args.get("from")
+    table = from_clause.this if from_clause else None
+    if not isinstance(table, exp.Table) or not isinstance(table.this, exp.Identifier):
+        return None
+    if any(value for key, value in table.args.items() if key not in ("this", "db", "alias")):
+        return None
+
+    projections = select.expressions
+    if len(projections) == 1 and isinstance(projections[0], exp.Star):
+        return (table.db or None, table.name, None)
+
+    columns = []
+    for projection in projections:
+        if isinstance(projection, exp.Column) and not isinstance(projection.this, exp.Star):
+            columns.append(projection.name)
+        elif not isinstance(projection, exp.Alias):
+            return None
+        # Aliased expressions do not expose the underlying column
+
+    return (table.db or None, table.name, columns)
+
+
+def _parse_single(sql: str, dialect: str | None) -> exp.Expression:
+    """Parse SQL that must contain exactly one statement."""
+    try:
+        statements = [s for s in sqlglot.parse(sql, read=dialect) if s is not None]
+    except ParseError as e:
+        first = e.errors[0] if e.errors else {}
+        raise SQLValidationError(
+            f"Failed to parse SQL: {first.get('description', str(e))}",
+            {
+                "error": first.get("description", str(e)),
+                "line": first.get("line", 1),
+                "column": first.get("col", 0),
+            }
+        )
+
+    if not statements:
+        raise SQLValidationError("Empty SQL query")
+
     # Check for multiple statements
-    if len(parsed) > 1:
+    if len(statements) > 1:
         raise SQLValidationError(
             "Multiple statements are not allowed",
-            {"statementCount": len(parsed)}
+            {"statementCount": len(statements)}
         )
-    
-    statement = parsed[0]
-    
-    # Check statement type
-    statement_type = _get_statement_type(statement)
-    if statement_type != "SELECT":
-        raise SQLValidationError(
+
+    return statements[0]
+
+
+def _check_read_only(statement: exp.Expression) -> SQLValidationError | None:
+    """Get the validation error of a statement that is not a single read-only query."""
+    if not isinstance(statement, exp.Query):
+        statement_type = _get_statement_type(statement)
+        return SQLValidationError(
             f"Only SELECT statements are allowed, found: {statement_type}",
             {"statementType": statement_type, "line": 1, "column": 0}
         )
-    
-    # Check for LIMIT clause
-    has_limit = _has_limit_clause(statement)
-    
-    # Transform SQL: add LIMIT if missing
-    if not has_limit:
-        transformed_sql = _add_limit_clause(sql)
-    else:
-        transformed_sql = sql
-    
-    return transformed_sql
 
+    forbidden = next(statement.find_all(*_FORBIDDEN_NODES), None)
+    if forbidden is not None:
+        statement_type = _get_statement_type(forbidden)
+        return SQLValidationError(
+            f"Only read-only SELECT statements are allowed, found: {statement_type}",
+            {"statementType": statement_type, "line": 1, "column": 0}
+        )
+
+    return None
+
+
+def _to_placeholder(node: exp.Expression) -> exp.Expression:
+    """Replace a literal, or an IN list of literals, by a ``?`` placeholder."""
+    if isinstance(node, exp.Literal):
+        return exp.var("?")
+    if isinstance(node, exp.In) and node.expressions and all(
+        isinstance(value, exp.Literal) for value in node.expressions
+    ):
+        # IN lists of any length share one fingerprint
+        return exp.In(this=node.this, expressions=[exp.var("?")])
+    return node
+
+
+def _get_statement_type(node: exp.Expression) -> str:
+    """Get SQL statement type of a parse tree node."""
+    if isinstance(node, (exp.Condition, exp.Alias)):
+        # A bare expression, e.g. from a misspelled keyword
+        return "UNKNOWN"
+    if isinstance(node, exp.Command):
+        return str(node.this).upper()
+    if isinstance(node, exp.Into):
+        return "SELECT INTO"
+    if isinstance(node, exp.Lock):
+        return "SELECT FOR UPDATE" if node.args.get("update") else "SELECT FOR SHARE"
+    return node.key.upper()
+
+
+def _apply_row_limit(
+    sql: str,
+    query: exp.Query,
+    limit: int,
+    max_limit: int,
+    dialect: str | None,
+) -> str | None:
+    """Bound the rows of a query.
+
+    The parse tree decides whether and where a bound is needed; the edit is
+    then made at the token offsets it points to, so the rest of the text
+    (and the column labels SQLite and MySQL derive from it) is unchanged.
+
+    Returns:
+        The bounded SQL, or None if its existing limit is already within max_limit
+    """
+    # FETCH FIRST is parsed into the limit argument as well
+    node = query.args.get("limit")
+    if node is None:
+        return _insert_limit(sql, limit, query.args.get("offset") is not None, dialect)
+
+    value = node.args.get("count" if isinstance(node, exp.Fetch) else "expression")
+    options = node.args.get("limit_options")
+    if options is not None and options.args.get("percent"):
+        value = None
+
+    if isinstance(value, exp.Literal) and value.is_int and "start" in value.meta:
+        if int(value.name) <= max_limit:
+            return None
+        return f"{sql[:value.meta['start']]}{max_limit}{sql[value.meta['end'] + 1:]}"
 
-def _get_statement_type(statement: Statement) -> str:
-    """Get SQL statement type."""
-    for token in statement.tokens:
-        if token.ttype is DML:
-            return token.value.upper()
-        if token.ttype is Keyword and token.value.upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER"):
-            return token.value.upper()
-    return "UNKNOWN"
+    # A computed or parameterized limit cannot be checked; bound it from outside
+    return f"SELECT * FROM ({sql}\n) AS _limited LIMIT {max_limit}"
 
 
-def _has_limit_clause(statement: Statement) -> bool:
-    """Check if statement has LIMIT clause."""
-    sql_upper = str(statement).upper()
-    return "LIMIT" in sql_upper
+def _insert_limit(sql: str, limit: int, has_offset: bool, dialect: str | None) -> str:
+    """Add a LIMIT clause to a top-level query that has none."""
+    offset_start = None
+    end = 0
+    depth = 0
+    for token in sqlglot.tokenize(sql, read=dialect):
+        if token.token_type == TokenType.L_PAREN:
+            depth += 1
+        elif token.token_type == TokenType.R_PAREN:
+            depth -= 1
+        elif token.token_type == TokenType.OFFSET and depth == 0:
+            offset_start = token.start
+        end = token.end + 1
 
+    if has_offset and offset_start is not None:
+        # MySQL and SQLite only accept LIMIT before OFFSET
+        return f"{sql[:offset_start]}LIMIT {limit} {sql[offset_start:]}"
+    # After the last token, so a trailing line comment cannot swallow the clause
+    return f"{sql[:end]} LIMIT {limit}{sql[end:]}"
 
-def _add_limit_clause(sql: str) -> str:
-    """Add LIMIT 1000 clause to SQL query."""
-    # Simple approach: append LIMIT 1000
-    # More sophisticated parsing could be done, but this works for most cases
-    sql_trimmed = sql.strip().rstrip(";")
-    return f"{sql_trimmed} LIMIT 1000"
 
+# SQL parse cache instance
+sql_parse_cache = SQLParseCache(max_entries=settings.sql_parse_cache_max_entries)
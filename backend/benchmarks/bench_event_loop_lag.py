@@ -0,0 +1,93 @@
+"""Benchmark: event loop lag while several large query results are encoded.
+
+Compares encoding each result in one call, in chunks that yield to the
+event loop, and in worker processes (used for plain values only). Run from
+the backend directory:
+
+    python -m benchmarks.bench_event_loop_lag
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app.models.schemas import QueryResult
+from app.services.cpu_offload import cpu_offloader
+from app.services.loop_monitor import LoopLagMonitor
+from app.services.response_encoding import encode_result
+
+
+def _result(row_count: int, column_count: int, mixed: bool) -> dict:
+    """Build a query result of plain values, or mixed with Decimal and datetime values."""
+    start = datetime(2024, 1, 1)
+    kinds = [lambda r: r, lambda r: f"name {r}", lambda r: r * 0.5]
+    if mixed:
+        kinds += [lambda r: Decimal(r) / 100, lambda r: start + timedelta(minutes=r)]
+    rows = [
+        tuple(kinds[c % len(kinds)](r) for c in range(column_count)) for r in range(row_count)
+    ]
+    return {
+        "columns": [{"name": f"col_{i}", "dataType": "text"} for i in range(column_count)],
+        "rows": rows,
+        "rowCount": row_count,
+        "executionTimeMs": 12,
+        "sql": "SELECT * FROM orders",
+    }
+
+
+async def _run(result: dict, concurrency: int) -> tuple[dict, float, int]:
+    """Encode the result concurrently while sampling loop lag."""
+    cpu_offloader.start()
+    # Warm up the worker processes
+    await encode_result(QueryResult, result)
+
+    monitor = LoopLagMonitor(interval=0.001, window=1_000_000, threshold_ms=float("inf"))
+    monitor.start()
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    bodies = await asyncio.gather(*(
+        encode_result(QueryResult, result) for _ in range(concurrency)
+    ))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # Let the monitor record the last wake-up
+    await asyncio.sleep(0.05)
+    await monitor.close()
+    await cpu_offloader.close()
+    return monitor.stats(), elapsed_ms, len(bodies[0])
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    # Mode: (workers, inline chunk cells)
+    modes = {
+        "one call": (0, args.rows * args.columns),
+        "chunked": (0, cpu_offloader.inline_chunk_cells),
+        "offload": (args.workers, cpu_offloader.inline_chunk_cells),
+    }
+
+    print(
+        f"{'values':<8}{'mode':<10}{'MB':>6}{'total ms':>10}"
+        f"{'p50 lag':>9}{'p99 lag':>9}{'max lag':>9}"
+    )
+    for values, mixed in (("plain", False), ("mixed", True)):
+        result = _result(args.rows, args.columns, mixed)
+        for mode, (workers, inline_chunk_cells) in modes.items():
+            cpu_offloader.workers = workers
+            cpu_offloader.inline_chunk_cells = inline_chunk_cells
+            lag, elapsed_ms, size = asyncio.run(_run(result, args.concurrency))
+            print(
+                f"{values:<8}{mode:<10}{size / 1e6:>6.1f}{elapsed_ms:>10.0f}"
+                f"{lag['p50Ms']:>9.2f}{lag['p99Ms']:>9.2f}{lag['windowMaxMs']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
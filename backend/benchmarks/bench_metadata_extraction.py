@@ -0,0 +1,171 @@
+"""Benchmark: metadata extraction per table and with set-based catalog queries.
+
+Generates a SQLite catalog with thousands of tables and views and extracts
+it with a columns query and a COUNT(*) per table (the previous extractor)
+and with the set-based extractor, which takes row estimates from the
+statistics. Then refreshes it incrementally from the extracted metadata,
+unchanged and with one table altered. Besides local time, prints the time
+with a network round trip added per statement, as for a remote server.
+Run from the backend directory:
+
+    python -m benchmarks.bench_metadata_extraction
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from app.models.database import DatabaseType
+from app.models.metadata import DatabaseMetadata
+from app.services.metadata import MetadataChanges, extract_metadata_changes, extract_metadata_sqlite
+
+
+def _make_catalog(path: str, tables: int, columns: int) -> None:
+    """Create tables of the given width and a view over every tenth table."""
+    conn = sqlite3.connect(path)
+    for t in range(tables):
+        column_defs = ", ".join(
+            ["id INTEGER PRIMARY KEY"] + [f"col_{c} TEXT DEFAULT 'x'" for c in range(columns - 1)]
+        )
+        conn.execute(f"CREATE TABLE table_{t} ({column_defs})")
+        if t % 10 == 0:
+            conn.execute(f"CREATE VIEW view_{t} AS SELECT id, col_0 FROM table_{t}")
+    conn.commit()
+    conn.close()
+
+
+async def _extract_per_table(engine: AsyncEngine) -> dict:
+    """Extract metadata with a columns and a count query for every table."""
+    tables, views = [], []
+    async with engine.connect() as conn:
+        relations = (await conn.execute(text("""
+            SELECT name, type FROM sqlite_master
+            WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'
+            ORDER BY name
+        """))).all()
+        for name, relation_type in relations:
+            columns = [
+                {
+                    "name": row[1],
+                    "dataType": row[2],
+                    "nullable": not row[3],
+                    "primaryKey": bool(row[5]),
+                    "defaultValue": row[4],
+                }
+                for row in await conn.execute(text(f"PRAGMA table_info({name})"))
+            ]
+            metadata = {"name": name, "type": relation_type, "schemaName": "main", "columns": columns}
+            if relation_type == "table":
+                count = await conn.execute(text(f"SELECT COUNT(*) FROM {name}"))
+                metadata["rowCount"] = count.scalar() or 0
+                tables.append(metadata)
+            else:
+                views.append(metadata)
+    return {"tables": tables, "views": views}
+
+
+def _without_row_counts(metadata: dict) -> dict:
+    """Get metadata without row counts, which only the per-table extractor makes exact."""
+    return {
+        kind: [
+            {k: v for k, v in table.items() if k not in ("rowCount", "rowCountKind")}
+            for table in tables
+        ]
+        for kind, tables in metadata.items()
+    }
+
+
+def _cached(changes: MetadataChanges) -> DatabaseMetadata:
+    """Get cached metadata as refresh_metadata_cache saves it."""
+    return DatabaseMetadata(
+        database_name="bench",
+        metadata_json=json.dumps(changes.metadata),
+        schema_version=changes.schema_version,
+        fingerprints_json=json.dumps(
+            [[schema, name, fp] for (schema, name), fp in changes.fingerprints.items()]
+        ),
+    )
+
+
+def _refresh(cached: DatabaseMetadata | None):
+    """Get an extractor refreshing the given cached metadata."""
+    async def extract(engine: AsyncEngine) -> MetadataChanges:
+        return await extract_metadata_changes(engine, DatabaseType.SQLITE, cached)
+    return extract
+
+
+async def _run(path: str, extract) -> tuple[dict, float, int]:
+    """Extract metadata once, counting the statements sent."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    # Open the connection pool and have SQLite parse the schema outside the
+    # timing, as on a pooled connection
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1 FROM sqlite_master LIMIT 1"))
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    started = time.perf_counter()
+    metadata = await extract(engine)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    await engine.dispose()
+    return metadata, elapsed_ms, statements
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    extractors = {"per table": _extract_per_table, "set-based": extract_metadata_sqlite}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.db")
+        _make_catalog(path, args.tables, args.columns)
+
+        print(f"{'extractor':<12}{'statements':>12}{'local ms':>10}{f'+{args.rtt_ms:g} ms RTT':>14}")
+        results = {}
+        for name, extract in extractors.items():
+            metadata, elapsed_ms, statements = asyncio.run(_run(path, extract))
+            results[name] = _without_row_counts(metadata)
+            print(
+                f"{name:<12}{statements:>12}{elapsed_ms:>10.0f}"
+                f"{elapsed_ms + statements * args.rtt_ms:>14.0f}"
+            )
+
+        assert results["per table"] == results["set-based"], "extractors disagree"
+
+        print(f"\n{'refresh':<12}{'statements':>12}{'local ms':>10}{f'+{args.rtt_ms:g} ms RTT':>14}{'re-read':>9}")
+        changes, _, _ = asyncio.run(_run(path, _refresh(None)))
+        cached = _cached(changes)
+        conn = sqlite3.connect(path)
+        refreshes = {
+            "no-op": lambda: None,
+            "one table": lambda: conn.execute("ALTER TABLE table_0 ADD COLUMN added TEXT"),
+        }
+        for name, change in refreshes.items():
+            change()
+            conn.commit()
+            changes, elapsed_ms, statements = asyncio.run(_run(path, _refresh(cached)))
+            print(
+                f"{name:<12}{statements:>12}{elapsed_ms:>10.1f}"
+                f"{elapsed_ms + statements * args.rtt_ms:>14.1f}{changes.changed:>9}"
+            )
+            full, _, _ = asyncio.run(_run(path, extract_metadata_sqlite))
+            assert changes.metadata == full, f"{name} refresh disagrees with extraction"
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Microbenchmark: query response encoding through the response model and directly.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_query_response
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.models.schemas import ColumnarQueryResult, QueryResult
+from app.services.columnar import encode_columnar
+from app.services.response_encoding import encode_result
+
+
+def _result(row_count: int, column_count: int, result_format: str) -> dict:
+    """Build a query result with a mix of driver value types."""
+    start = datetime(2024, 1, 1)
+
+    def value(row: int, column: int):
+        kind = column % 5
+        if kind == 0:
+            return row * column
+        if kind == 1:
+            return Decimal(row) / 100
+        if kind == 2:
+            return start + timedelta(minutes=row)
+        if kind == 3:
+            return None if row % 7 == 0 else f"name {row}"
+        return row * 0.5
+
+    names = [f"col_{i}" for i in range(column_count)]
+    rows = [tuple(value(r, c) for c in range(column_count)) for r in range(row_count)]
+    result = {
+        "columns": [{"name": name, "dataType": "text"} for name in names],
+        "rowCount": row_count,
+        "executionTimeMs": 12,
+        "sql": "SELECT * FROM orders LIMIT 1000",
+        "queryId": "bench",
+    }
+    if result_format == "columnar":
+        return {**result, "format": "columnar", "data": encode_columnar(rows, column_count)}
+    return {**result, "rows": rows}
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    """Get the mean wall time of fn in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=50)
+    args = parser.parse_args()
+
+    # What FastAPI does with a model returned from an endpoint with this response_model
+    field = create_model_field(
+        name="Response", type_=QueryResult | ColumnarQueryResult, mode="serialization"
+    )
+    schemas = {"rows": QueryResult, "columnar": ColumnarQueryResult}
+
+    print(f"{'format':<10}{'bytes':>10}{'model ms':>11}{'direct ms':>11}{'speedup':>10}")
+    for result_format, schema in schemas.items():
+        result = _result(args.rows, args.columns, result_format)
+
+        # The response model takes rows as objects
+        model_result = result
+        if result_format == "rows":
+            names = [column["name"] for column in result["columns"]]
+            model_result = {**result, "rows": [dict(zip(names, row)) for row in result["rows"]]}
+
+        def through_model():
+            content = asyncio.run(
+                serialize_response(field=field, response_content=schema(**model_result))
+            )
+            return JSONResponse(content=content).body
+
+        def direct():
+            return asyncio.run(encode_result(schema, result))
+
+        body = direct()
+        model_ms = _time_per_call(through_model, args.iterations)
+        direct_ms = _time_per_call(direct, args.iterations)
+        print(
+            f"{result_format:<10}{len(body):>10}{model_ms:>11.2f}{direct_ms:>11.2f}"
+            f"{model_ms / direct_ms:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
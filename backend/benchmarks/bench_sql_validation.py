@@ -0,0 +1,74 @@
+"""Microbenchmark: SQL validation with and without the parse cache.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sql_validation
+"""
+
+import argparse
+import time
+from app.models.database import DatabaseType
+from app.services.result_cache import result_cache
+from app.services.sql_validator import validate_and_transform_sql, sql_parse_cache
+
+
+def _large_query(columns: int, predicates: int) -> str:
+    """Build a wide reporting query with many predicates."""
+    select_list = ",\n    ".join(
+        f"coalesce(o.col_{i}, 0) * 1.{i % 10} AS metric_{i}" for i in range(columns)
+    )
+    where = "\n    AND ".join(
+        f"(o.flag_{i} = 'v{i}' OR o.amount_{i} BETWEEN {i} AND {i * 10})"
+        for i in range(predicates)
+    )
+    return (
+        f"WITH recent AS (SELECT * FROM orders WHERE created_at > '2024-01-01')\n"
+        f"SELECT\n    {select_list}\n"
+        f"FROM recent o JOIN customers c ON c.id = o.customer_id\n"
+        f"WHERE {where}\n"
+        f"ORDER BY o.created_at DESC"
+    )
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    """Get the mean wall time of fn in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    queries = {
+        "small": "SELECT id, name FROM users WHERE id = 42",
+        "large": _large_query(columns=60, predicates=40),
+    }
+
+    print(f"{'query':<8}{'chars':>8}{'uncached ms':>14}{'cached ms':>12}{'speedup':>10}")
+    for name, sql in queries.items():
+        def validate_and_key():
+            validated = validate_and_transform_sql(sql, database_type=DatabaseType.POSTGRESQL)
+            result_cache.make_key("bench", validated, database_type=DatabaseType.POSTGRESQL)
+
+        def uncached():
+            sql_parse_cache.clear()
+            validate_and_key()
+
+        uncached_ms = _time_per_call(uncached, max(1, args.iterations // 10))
+        validate_and_key()
+        cached_ms = _time_per_call(validate_and_key, args.iterations)
+        print(
+            f"{name:<8}{len(sql):>8}{uncached_ms:>14.3f}{cached_ms:>12.4f}"
+            f"{uncached_ms / cached_ms:>9.0f}x"
+        )
+
+    print(f"\nparse cache: {sql_parse_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
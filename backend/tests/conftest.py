@@ -1,12 +1,22 @@
 """Pytest configuration and fixtures."""
 
+import json
+import sqlite3
+import uuid
+from datetime import UTC, datetime
 import pytest
+from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlmodel import SQLModel
+from app.database import engine as app_engine
+from app.database import async_session_maker as app_session_maker
 from app.database import get_session
-from app.models.database import DatabaseConnection
+from app.main import app
+from app.models.database import DatabaseConnection, DatabaseType
 from app.models.metadata import DatabaseMetadata
 from app.models.query import QueryHistory
+from app.services.engine_registry import engine_registry
+from app.services.pagination import cursor_store
 
 
 @pytest.fixture
@@ -38,3 +48,53 @@ async def test_session(test_engine):
     async with async_session_maker() as session:
         yield session
 
+@pytest.fixture
+def app_database(test_engine):
+    """Make the test database the app database of services and endpoints."""
+    # Services open their own sessions, so rebind the shared factory rather
+    # than only overriding the get_session dependency
+    app_session_maker.configure(bind=test_engine)
+    yield
+    app_session_maker.configure(bind=app_engine)
+
+
+@pytest.fixture
+async def client(app_database):
+    """Create an API client whose app database is the test database."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await cursor_store.close()
+    await engine_registry.close()
+
+
+@pytest.fixture
+def target_path(tmp_path) -> str:
+    """Create a SQLite target database with a table t of 25 rows."""
+    path = tmp_path / "target.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO t (name) VALUES (?)", [(f"row {i}",) for i in range(25)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def add_connection(test_session, target_path):
+    """Get a function that registers the SQLite target under a new connection name."""
+
+    async def add(**options) -> DatabaseConnection:
+        connection = DatabaseConnection(
+            name=f"db_{uuid.uuid4().hex[:8]}",
+            url=f"sqlite:///{target_path}",
+            database_type=DatabaseType.SQLITE,
+            options_json=json.dumps(options) if options else None,
+            # Newer SQLModel releases refuse the model's naive default timestamps
+            created_at=datetime.now(UTC),
+            updated_at=datetime.now(UTC),
+        )
+        test_session.add(connection)
+        await test_session.commit()
+        return connection
+
+    return add
@@ -0,0 +1,119 @@
+"""Contract tests for query admission errors."""
+
+from app.main import app
+from app.services import query as query_service
+from app.services.admission import admission_controller
+from app.services.query_plan import QueryRejectedError
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+async def test_queue_full_returns_429_with_retry_after(client, add_connection):
+    """Test that a query beyond the queue bound gets 429 and a Retry-After header."""
+    connection = await add_connection(maxConcurrentQueries=1, maxQueuedQueries=0)
+    ticket = await admission_controller.acquire(connection)
+    try:
+        response = await client.post(
+            f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1"}
+        )
+    finally:
+        ticket.release()
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    error = _error(response)
+    assert error["code"] == "QUERY_QUEUE_FULL"
+    assert error["details"] == {
+        "reason": "queue_full",
+        "maxConcurrentQueries": 1,
+        "maxQueuedQueries": 0,
+    }
+
+
+async def test_queue_timeout_returns_503_with_retry_after(client, add_connection, monkeypatch):
+    """Test that a query still queued after the queue timeout gets 503 and Retry-After."""
+    monkeypatch.setattr(admission_controller, "queue_timeout", 0.1)
+    connection = await add_connection(maxConcurrentQueries=1, maxQueuedQueries=1)
+    ticket = await admission_controller.acquire(connection)
+    try:
+        response = await client.post(
+            f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1"}
+        )
+    finally:
+        ticket.release()
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    error = _error(response)
+    assert error["code"] == "QUERY_QUEUE_TIMEOUT"
+    assert error["details"] == {"reason": "timeout", "queueTimeoutSeconds": 0.1}
+
+
+async def test_slot_free_after_rejection(client, add_connection):
+    """Test that a rejected query leaves no slot behind."""
+    connection = await add_connection(maxConcurrentQueries=1, maxQueuedQueries=0)
+    ticket = await admission_controller.acquire(connection)
+    await client.post(f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1"})
+    ticket.release()
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1 AS one"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"one": 1}]
+
+
+async def test_guardrails_not_planned_before_admission(client, add_connection, monkeypatch):
+    """Test that a query refused admission does not run EXPLAIN on the target."""
+    planned = []
+
+    async def check_guardrails(*args):
+        planned.append(args)
+        return []
+
+    monkeypatch.setattr(query_service, "check_guardrails", check_guardrails)
+    connection = await add_connection(
+        maxConcurrentQueries=1, maxQueuedQueries=0, explainPolicy="warn"
+    )
+    ticket = await admission_controller.acquire(connection)
+    try:
+        response = await client.post(
+            f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1"}
+        )
+    finally:
+        ticket.release()
+
+    assert response.status_code == 429
+    assert planned == []
+
+
+async def test_slot_free_after_guardrail_rejection(client, add_connection, monkeypatch):
+    """Test that a query rejected by its guardrails gives its slot back."""
+
+    async def check_guardrails(*args):
+        raise QueryRejectedError("Query rejected by cost guardrails", {"policy": "reject"})
+
+    connection = await add_connection(maxConcurrentQueries=1, maxQueuedQueries=0)
+    with monkeypatch.context() as patch:
+        patch.setattr(query_service, "check_guardrails", check_guardrails)
+        rejected = await client.post(
+            f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1", "cache": "bypass"}
+        )
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT 1 AS one"}
+    )
+
+    assert rejected.status_code == 422
+    assert response.status_code == 200
+
+
+def test_query_endpoint_documents_admission_errors():
+    """Test that the OpenAPI schema lists the 429 and 503 responses of POST /query."""
+    responses = app.openapi()["paths"]["/api/v1/dbs/{name}/query"]["post"]["responses"]
+
+    assert {"429", "503"} <= set(responses)
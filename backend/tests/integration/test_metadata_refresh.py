@@ -0,0 +1,52 @@
+"""Integration tests for metadata refreshes."""
+
+import sqlite3
+
+
+def _create_target(path, column: str) -> None:
+    """Create a SQLite database with one table t (id, <column>)."""
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE t (id INTEGER PRIMARY KEY, {column} TEXT)")
+    conn.commit()
+    conn.close()
+
+
+def _columns(metadata: dict) -> list[str]:
+    """Get the column names of table t."""
+    table = next(table for table in metadata["tables"] if table["name"] == "t")
+    return [column["name"] for column in table["columns"]]
+
+
+async def test_refresh_after_url_change(client, tmp_path):
+    """Test that a connection moved to a target with the same schema version is re-read."""
+    first, second = tmp_path / "first.db", tmp_path / "second.db"
+    _create_target(first, "first_col")
+    _create_target(second, "second_col")
+    with sqlite3.connect(first) as a, sqlite3.connect(second) as b:
+        version = "PRAGMA schema_version"
+        assert a.execute(version).fetchone() == b.execute(version).fetchone()
+
+    await client.put("/api/v1/dbs/moved", json={"url": f"sqlite:///{first}"})
+    assert _columns((await client.post("/api/v1/dbs/moved/refresh")).json()) == [
+        "id", "first_col"
+    ]
+
+    response = await client.put("/api/v1/dbs/moved", json={"url": f"sqlite:///{second}"})
+    assert response.status_code == 201
+
+    assert _columns((await client.get("/api/v1/dbs/moved")).json()) == ["id", "second_col"]
+    assert _columns((await client.post("/api/v1/dbs/moved/refresh")).json()) == [
+        "id", "second_col"
+    ]
+
+
+async def test_refresh_keeps_unchanged_relations(client, tmp_path):
+    """Test that a refresh without schema changes returns the cached columns."""
+    path = tmp_path / "target.db"
+    _create_target(path, "name")
+    await client.put("/api/v1/dbs/same", json={"url": f"sqlite:///{path}"})
+    first = (await client.post("/api/v1/dbs/same/refresh")).json()
+
+    second = (await client.post("/api/v1/dbs/same/refresh")).json()
+
+    assert _columns(second) == _columns(first) == ["id", "name"]
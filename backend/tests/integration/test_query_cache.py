@@ -0,0 +1,58 @@
+"""Integration tests for serving query results from the result cache."""
+
+SQL = "SELECT count(*) AS n FROM t"
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+async def _query(client, name: str, cache: str = "prefer"):
+    """Run the count query with a cache mode."""
+    return await client.post(f"/api/v1/dbs/{name}/query", json={"sql": SQL, "cache": cache})
+
+
+async def test_repeated_query_served_from_cache(client, add_connection):
+    """Test that a repeated query is answered from the cache with its age."""
+    connection = await add_connection(cacheTtlSeconds=60)
+
+    first = (await _query(client, connection.name)).json()
+    second = (await _query(client, connection.name)).json()
+
+    assert first["cached"] is False
+    assert first.get("cacheAgeMs") is None
+    assert second["cached"] is True
+    assert second["cacheAgeMs"] >= 0
+    assert second["rows"] == first["rows"] == [{"n": 25}]
+
+
+async def test_cache_only_miss_returns_504(client, add_connection):
+    """Test that cache=only without a fresh cached result fails with 504."""
+    connection = await add_connection(cacheTtlSeconds=60)
+
+    response = await _query(client, connection.name, cache="only")
+
+    assert response.status_code == 504
+    assert _error(response)["code"] == "CACHE_MISS"
+
+
+async def test_cache_only_hit(client, add_connection):
+    """Test that cache=only returns a result cached by an earlier query."""
+    connection = await add_connection(cacheTtlSeconds=60)
+    await _query(client, connection.name)
+
+    response = await _query(client, connection.name, cache="only")
+
+    assert response.status_code == 200
+    assert response.json()["cached"] is True
+
+
+async def test_bypass_executes(client, add_connection):
+    """Test that cache=bypass runs the query even when a result is cached."""
+    connection = await add_connection(cacheTtlSeconds=60)
+    await _query(client, connection.name)
+
+    response = await _query(client, connection.name, cache="bypass")
+
+    assert response.json()["cached"] is False
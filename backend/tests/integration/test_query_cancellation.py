@@ -0,0 +1,84 @@
+"""Integration tests for listing and cancelling running queries."""
+
+import asyncio
+
+# Counts forever; only a cancel request or the statement deadline stops it
+ENDLESS_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+async def _wait_until_running(client, name: str, query_id: str) -> list[dict]:
+    """Poll the running queries of a database until query_id is listed."""
+    while True:
+        response = await client.get(f"/api/v1/dbs/{name}/queries")
+        running = response.json()
+        if any(entry["queryId"] == query_id for entry in running):
+            return running
+        await asyncio.sleep(0.02)
+
+
+async def test_cancel_running_query(client, add_connection):
+    """Test that a listed query can be cancelled and its request fails with 409."""
+    connection = await add_connection()
+    query = asyncio.create_task(client.post(
+        f"/api/v1/dbs/{connection.name}/query",
+        json={"sql": ENDLESS_SQL, "queryId": "endless", "cache": "bypass"},
+    ))
+
+    async with asyncio.timeout(10):
+        running = await _wait_until_running(client, connection.name, "endless")
+        cancel = await client.delete(f"/api/v1/dbs/{connection.name}/queries/endless")
+        response = await query
+
+    assert running[0]["sql"].startswith("WITH RECURSIVE")
+    assert cancel.status_code == 204
+    assert response.status_code == 409
+    assert _error(response)["code"] == "QUERY_CANCELLED"
+
+    listed = await client.get(f"/api/v1/dbs/{connection.name}/queries")
+    assert listed.json() == []
+
+
+async def test_query_id_in_use(client, add_connection):
+    """Test that a query id of a running query is refused."""
+    connection = await add_connection()
+    query = asyncio.create_task(client.post(
+        f"/api/v1/dbs/{connection.name}/query",
+        json={"sql": ENDLESS_SQL, "queryId": "endless", "cache": "bypass"},
+    ))
+
+    async with asyncio.timeout(10):
+        await _wait_until_running(client, connection.name, "endless")
+        response = await client.post(
+            f"/api/v1/dbs/{connection.name}/query",
+            json={"sql": "SELECT 1", "queryId": "endless"},
+        )
+        await client.delete(f"/api/v1/dbs/{connection.name}/queries/endless")
+        await query
+
+    assert response.status_code == 409
+    assert _error(response)["code"] == "QUERY_ID_IN_USE"
+
+
+async def test_cancel_unknown_query(client, add_connection):
+    """Test that cancelling a query that is not running returns 404."""
+    connection = await add_connection()
+
+    response = await client.delete(f"/api/v1/dbs/{connection.name}/queries/missing")
+
+    assert response.status_code == 404
+    assert _error(response)["code"] == "QUERY_NOT_FOUND"
+
+
+async def test_cancel_on_unknown_database(client):
+    """Test that the cancel endpoint checks the database exists."""
+    response = await client.delete("/api/v1/dbs/missing/queries/q1")
+
+    assert response.status_code == 404
+    assert _error(response)["code"] == "DATABASE_NOT_FOUND"
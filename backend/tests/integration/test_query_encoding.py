@@ -0,0 +1,13 @@
+"""Integration tests for the encoding of query result values."""
+
+
+async def test_binary_value_not_utf8(client, add_connection):
+    """Test that a binary value that is not UTF-8 is returned as text, not a 500."""
+    connection = await add_connection()
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query", json={"sql": "SELECT X'FF00' AS b"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"b": "\ufffd\x00"}]
@@ -0,0 +1,105 @@
+"""Integration tests for the query job endpoints."""
+
+import asyncio
+
+import pytest
+from app.api.v1 import queries
+from app.services.query_jobs import QueryJobManager
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+def _use_manager(monkeypatch, tmp_path, workers: int) -> QueryJobManager:
+    """Serve the job endpoints from a manager spooling under tmp_path."""
+    manager = QueryJobManager(
+        workers=workers, max_queued=10, result_ttl=60, spool_dir=tmp_path / "jobs"
+    )
+    monkeypatch.setattr(queries, "query_job_manager", manager)
+    return manager
+
+
+@pytest.fixture
+async def running_manager(monkeypatch, tmp_path):
+    """Create a started job manager with one worker."""
+    manager = _use_manager(monkeypatch, tmp_path, workers=1)
+    manager.start()
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture
+def idle_manager(monkeypatch, tmp_path) -> QueryJobManager:
+    """Create a job manager without workers, so jobs stay queued."""
+    return _use_manager(monkeypatch, tmp_path, workers=0)
+
+
+async def test_job_lifecycle(client, add_connection, running_manager):
+    """Test that a submitted job succeeds and its result is paged by offset."""
+    connection = await add_connection()
+    submitted = await client.post(
+        f"/api/v1/dbs/{connection.name}/jobs", json={"sql": "SELECT id FROM t ORDER BY id"}
+    )
+    assert submitted.status_code == 202
+    job_id = submitted.json()["jobId"]
+
+    async with asyncio.timeout(10):
+        while True:
+            job = (await client.get(f"/api/v1/dbs/{connection.name}/jobs/{job_id}")).json()
+            if job["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.02)
+
+    assert job["status"] == "succeeded"
+    assert job["rowCount"] == 25
+
+    page = await client.get(
+        f"/api/v1/dbs/{connection.name}/jobs/{job_id}/result", params={"offset": 20, "limit": 10}
+    )
+    assert page.status_code == 200
+    assert [row["id"] for row in page.json()["rows"]] == [21, 22, 23, 24, 25]
+    assert page.json()["nextOffset"] is None
+
+
+async def test_delete_queued_job(client, add_connection, idle_manager):
+    """Test that a job deleted while queued never runs and is gone."""
+    connection = await add_connection()
+    job_id = (await client.post(
+        f"/api/v1/dbs/{connection.name}/jobs", json={"sql": "SELECT 1"}
+    )).json()["jobId"]
+
+    response = await client.delete(f"/api/v1/dbs/{connection.name}/jobs/{job_id}")
+
+    assert response.status_code == 204
+    assert idle_manager.stats()["queued"] == 0
+    missing = await client.get(f"/api/v1/dbs/{connection.name}/jobs/{job_id}")
+    assert missing.status_code == 404
+    assert _error(missing)["code"] == "JOB_NOT_FOUND"
+
+
+async def test_result_of_queued_job(client, add_connection, idle_manager):
+    """Test that reading the result of an unfinished job returns 409."""
+    connection = await add_connection()
+    job_id = (await client.post(
+        f"/api/v1/dbs/{connection.name}/jobs", json={"sql": "SELECT 1"}
+    )).json()["jobId"]
+
+    response = await client.get(f"/api/v1/dbs/{connection.name}/jobs/{job_id}/result")
+
+    assert response.status_code == 409
+    assert _error(response)["code"] == "JOB_NOT_FINISHED"
+
+
+async def test_submit_invalid_sql(client, add_connection, idle_manager):
+    """Test that a job with SQL that is not read-only is refused with 400."""
+    connection = await add_connection()
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/jobs", json={"sql": "DELETE FROM t"}
+    )
+
+    assert response.status_code == 400
+    assert _error(response)["code"] == "VALIDATION_ERROR"
+    assert idle_manager.list_jobs(connection.name) == []
@@ -0,0 +1,131 @@
+"""Integration tests for paging query results with continuation tokens."""
+
+import pytest
+from app.config import settings
+from app.services.pagination import cursor_store, spill_store
+
+SQL = "SELECT id, name FROM t ORDER BY id"
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+@pytest.fixture
+async def spilling(tmp_path, monkeypatch):
+    """Make every result outgrow its memory budget and spill under tmp_path."""
+    monkeypatch.setattr(settings, "query_memory_budget_bytes", 1)
+    monkeypatch.setattr(settings, "pagination_default_page_size", 10)
+    monkeypatch.setattr(spill_store, "spill_dir", tmp_path / "spill")
+    yield
+    await spill_store.close()
+
+
+async def _page(client, name: str, token: str | None = None, sql: str = SQL):
+    """Request one page of 10 rows."""
+    return await client.post(
+        f"/api/v1/dbs/{name}/query",
+        json={"sql": sql, "pageSize": 10, "continuationToken": token},
+    )
+
+
+async def test_pages_through_result(client, add_connection):
+    """Test that continuation tokens return every row once, in order."""
+    connection = await add_connection()
+    ids, token = [], None
+
+    for _ in range(3):
+        page = (await _page(client, connection.name, token)).json()
+        ids += [row["id"] for row in page["rows"]]
+        token = page["continuationToken"]
+
+    assert ids == list(range(1, 26))
+    assert token is None
+
+
+async def test_token_for_other_query(client, add_connection):
+    """Test that a token is refused for a different query with 400."""
+    connection = await add_connection()
+    token = (await _page(client, connection.name)).json()["continuationToken"]
+
+    response = await _page(client, connection.name, token, sql="SELECT id FROM t ORDER BY id")
+
+    assert response.status_code == 400
+    error = _error(response)
+    assert error["code"] == "INVALID_CONTINUATION_TOKEN"
+    assert error["details"]["reason"] == "mismatch"
+
+
+async def test_token_for_other_database(client, add_connection):
+    """Test that a token is refused on another database with 400."""
+    connection = await add_connection()
+    other = await add_connection()
+    token = (await _page(client, connection.name)).json()["continuationToken"]
+
+    response = await _page(client, other.name, token)
+
+    assert response.status_code == 400
+    assert _error(response)["details"]["reason"] == "mismatch"
+
+
+async def test_consumed_token(client, add_connection):
+    """Test that a token already used for its page is refused with 410."""
+    connection = await add_connection()
+    token = (await _page(client, connection.name)).json()["continuationToken"]
+    assert (await _page(client, connection.name, token)).status_code == 200
+
+    response = await _page(client, connection.name, token)
+
+    assert response.status_code == 410
+    error = _error(response)
+    assert error["code"] == "CONTINUATION_EXPIRED"
+    assert error["details"]["reason"] == "consumed"
+
+
+async def test_expired_token(client, add_connection, monkeypatch):
+    """Test that a token whose cursor was closed for idleness is refused with 410."""
+    connection = await add_connection()
+    token = (await _page(client, connection.name)).json()["continuationToken"]
+    monkeypatch.setattr(cursor_store, "idle_timeout", 0)
+    assert await cursor_store.evict_idle() == 1
+
+    response = await _page(client, connection.name, token)
+
+    assert response.status_code == 410
+    error = _error(response)
+    assert error["code"] == "CONTINUATION_EXPIRED"
+    assert error["details"]["reason"] == "expired"
+
+
+async def test_malformed_token(client, add_connection):
+    """Test that a token that does not decode is refused with 400."""
+    connection = await add_connection()
+
+    response = await _page(client, connection.name, "not a token!")
+
+    assert response.status_code == 400
+    assert _error(response)["details"]["reason"] == "malformed"
+
+
+async def test_spilled_result_pages(client, add_connection, spilling):
+    """Test that a result over the memory budget is spilled and paged from disk."""
+    connection = await add_connection()
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query", json={"sql": SQL, "cache": "bypass"}
+    )
+
+    first = response.json()
+    assert response.status_code == 200
+    assert first["spilled"] is True
+    assert first["totalRows"] == 25
+    assert first["spillBytes"] > 0
+    ids, token = [row["id"] for row in first["rows"]], first["continuationToken"]
+
+    while token is not None:
+        page = (await _page(client, connection.name, token)).json()
+        assert page["spilled"] is True
+        ids += [row["id"] for row in page["rows"]]
+        token = page["continuationToken"]
+
+    assert ids == list(range(1, 26))
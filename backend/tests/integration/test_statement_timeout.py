@@ -0,0 +1,41 @@
+"""Integration tests for statement timeouts on SQLite targets."""
+
+# Counts forever; only the statement deadline stops it
+ENDLESS_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+def _error(response) -> dict:
+    """Get the error object of an API error response."""
+    return response.json()["error"]["message"]["error"]
+
+
+async def test_statement_past_deadline_returns_504(client, add_connection):
+    """Test that a SQLite statement running past its timeout fails with 504."""
+    connection = await add_connection()
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query",
+        json={"sql": ENDLESS_SQL, "timeoutSeconds": 1, "cache": "bypass"},
+    )
+
+    assert response.status_code == 504
+    assert _error(response)["code"] == "QUERY_TIMEOUT"
+
+
+async def test_connection_usable_after_timeout(client, add_connection):
+    """Test that the deadline of a timed-out statement does not stop the next one."""
+    connection = await add_connection(maxConcurrentQueries=1)
+    await client.post(
+        f"/api/v1/dbs/{connection.name}/query",
+        json={"sql": ENDLESS_SQL, "timeoutSeconds": 1, "cache": "bypass"},
+    )
+
+    response = await client.post(
+        f"/api/v1/dbs/{connection.name}/query",
+        json={"sql": "SELECT count(*) AS n FROM t", "cache": "bypass"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"n": 25}]
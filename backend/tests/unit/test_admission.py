@@ -0,0 +1,150 @@
+"""Tests for per-database admission control."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.admission import AdmissionController, AdmissionError
+
+
+def _connection(max_concurrent: int = 1, max_queued: int = 10) -> DatabaseConnection:
+    """Create a connection with the given admission limits."""
+    return DatabaseConnection(
+        name="db",
+        url="sqlite:///db.sqlite",
+        database_type=DatabaseType.SQLITE,
+        options_json=json.dumps({
+            "maxConcurrentQueries": max_concurrent,
+            "maxQueuedQueries": max_queued,
+        }),
+    )
+
+
+async def test_admits_up_to_max_concurrent():
+    """Test that requests within the limit are admitted without waiting."""
+    controller = AdmissionController(queue_timeout=1)
+    connection = _connection(max_concurrent=2)
+
+    first = await controller.acquire(connection)
+    second = await controller.acquire(connection)
+
+    assert controller.stats()["db"]["active"] == 2
+    first.release()
+    second.release()
+    assert controller.stats()["db"]["active"] == 0
+
+
+async def test_release_hands_slot_to_waiter():
+    """Test that a released slot goes to the first waiter."""
+    controller = AdmissionController(queue_timeout=1)
+    connection = _connection()
+    ticket = await controller.acquire(connection)
+
+    waiting = asyncio.create_task(controller.acquire(connection))
+    await asyncio.sleep(0)
+    assert controller.stats()["db"]["queued"] == 1
+
+    ticket.release()
+    handed_over = await waiting
+
+    stats = controller.stats()["db"]
+    assert stats["active"] == 1
+    assert stats["waited"] == 1
+    handed_over.release()
+    assert controller.stats()["db"]["active"] == 0
+
+
+async def test_release_is_idempotent():
+    """Test that releasing a ticket twice frees one slot."""
+    controller = AdmissionController(queue_timeout=1)
+    connection = _connection(max_concurrent=2)
+    ticket = await controller.acquire(connection)
+    other = await controller.acquire(connection)
+
+    ticket.release()
+    ticket.release()
+
+    assert controller.stats()["db"]["active"] == 1
+    other.release()
+
+
+async def test_full_queue_is_rejected():
+    """Test that a request is rejected when the wait queue is full."""
+    controller = AdmissionController(queue_timeout=1)
+    connection = _connection(max_queued=1)
+    ticket = await controller.acquire(connection)
+    waiting = asyncio.create_task(controller.acquire(connection))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionError) as exc_info:
+        await controller.acquire(connection)
+
+    assert exc_info.value.details["reason"] == "queue_full"
+    assert exc_info.value.retry_after >= 1
+    assert controller.stats()["db"]["rejected"] == 1
+
+    ticket.release()
+    (await waiting).release()
+
+
+async def test_wait_times_out():
+    """Test that a request waiting longer than the queue timeout fails."""
+    controller = AdmissionController(queue_timeout=0.01)
+    connection = _connection()
+    ticket = await controller.acquire(connection)
+
+    with pytest.raises(AdmissionError) as exc_info:
+        await controller.acquire(connection)
+
+    assert exc_info.value.details["reason"] == "timeout"
+    stats = controller.stats()["db"]
+    assert stats["timedOut"] == 1
+    assert stats["queued"] == 0
+
+    ticket.release()
+    assert controller.stats()["db"]["active"] == 0
+
+
+async def test_cancelled_waiter_leaves_queue():
+    """Test that a cancelled waiter neither holds nor leaks a slot."""
+    controller = AdmissionController(queue_timeout=1)
+    connection = _connection()
+    ticket = await controller.acquire(connection)
+
+    waiting = asyncio.create_task(controller.acquire(connection))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    ticket.release()
+    stats = controller.stats()["db"]
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+
+
+async def test_slot_handed_over_as_wait_times_out_is_not_leaked():
+    """Test that a slot handed over in the iteration the wait times out is kept.
+
+    A loop stall spanning both the release and the waiter's deadline runs
+    the release and then the timeout in the same iteration, before the
+    waiter resumes.
+    """
+    controller = AdmissionController(queue_timeout=0.05)
+    connection = _connection()
+    ticket = await controller.acquire(connection)
+    loop = asyncio.get_running_loop()
+
+    waiting = asyncio.create_task(controller.acquire(connection))
+    await asyncio.sleep(0)
+    loop.call_later(0.03, ticket.release)
+    loop.call_soon(time.sleep, 0.1)
+
+    handed_over = await waiting
+
+    assert controller.stats()["db"]["active"] == 1
+    handed_over.release()
+    assert controller.stats()["db"]["active"] == 0
+    (await controller.acquire(connection)).release()
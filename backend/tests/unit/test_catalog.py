@@ -0,0 +1,57 @@
+"""Tests for catalog queries."""
+
+import sqlite3
+
+from app.models.database import DatabaseType
+from app.services.catalog import get_catalog_reader
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+async def test_sqlite_row_estimates_without_statistics(tmp_path):
+    """Test that SQLite tables never analyzed are estimated from their largest rowid."""
+    path = tmp_path / "target.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE big (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE empty (id INTEGER PRIMARY KEY);
+        CREATE TABLE keyed (code TEXT PRIMARY KEY) WITHOUT ROWID;
+        CREATE VIEW names AS SELECT name FROM big;
+        INSERT INTO big (id, name) VALUES (1, 'a'), (2000000, 'b');
+        INSERT INTO keyed VALUES ('x');
+    """)
+    conn.close()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    try:
+        async with engine.connect() as conn:
+            relations = await get_catalog_reader(DatabaseType.SQLITE).relations(conn)
+    finally:
+        await engine.dispose()
+
+    assert relations == [
+        ("main", "big", "table", 2000000),
+        ("main", "empty", "table", 0),
+        ("main", "keyed", "table", None),
+        ("main", "names", "view", None),
+    ]
+
+
+async def test_sqlite_row_estimates_from_statistics(tmp_path):
+    """Test that sqlite_stat1 counts are used once ANALYZE has run."""
+    path = tmp_path / "target.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("CREATE INDEX ix_t_name ON t (name)")
+    conn.executemany("INSERT INTO t (id, name) VALUES (?, ?)", [(i * 10, "x") for i in range(5)])
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    try:
+        async with engine.connect() as conn:
+            relations = await get_catalog_reader(DatabaseType.SQLITE).relations(conn)
+    finally:
+        await engine.dispose()
+
+    assert relations == [("main", "t", "table", 5)]
@@ -0,0 +1,98 @@
+"""Tests for query history retention and archiving."""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from app.models.query import QueryHistory
+from app.services.history_retention import HistoryRetention, _expired_condition
+from sqlmodel import select
+
+T0 = datetime(2024, 1, 1, 12, 0)
+
+
+def _retention(archive_dir=None) -> HistoryRetention:
+    """Create a history retention without a background sweeper."""
+    return HistoryRetention(sweep_interval=300, sweep_after_writes=100, archive_dir=archive_dir)
+
+
+async def _add_entries(session, db_name: str, executed_at: list[datetime]) -> list[int]:
+    """Store history entries executed at the given times and get their ids."""
+    entries = [
+        QueryHistory(database_name=db_name, sql_text=f"SELECT {i}", success=True, executed_at=at)
+        for i, at in enumerate(executed_at)
+    ]
+    session.add_all(entries)
+    await session.commit()
+    return [entry.id for entry in entries]
+
+
+async def _remaining_ids(session, db_name: str) -> list[int]:
+    """Get the ids of a database's history entries."""
+    statement = select(QueryHistory.id).where(QueryHistory.database_name == db_name)
+    return sorted((await session.execute(statement)).scalars())
+
+
+async def test_keep_last_boundary_breaks_ties_on_id(test_session, add_connection, app_database):
+    """Test that entries sharing the boundary timestamp are cut by id, keeping exactly keep_last."""
+    connection = await add_connection(historyKeepLast=2)
+    ids = await _add_entries(test_session, connection.name, [
+        T0, T0 + timedelta(minutes=1), T0 + timedelta(minutes=1), T0 + timedelta(minutes=1),
+        T0 + timedelta(minutes=2),
+    ])
+
+    assert await _retention().sweep([connection.name]) == 3
+
+    assert await _remaining_ids(test_session, connection.name) == [ids[3], ids[4]]
+
+
+async def test_keep_last_leaves_other_databases(test_session, add_connection, app_database):
+    """Test that a sweep only removes entries of the swept database."""
+    connection = await add_connection(historyKeepLast=0)
+    other = await add_connection(historyKeepLast=0)
+    await _add_entries(test_session, connection.name, [T0])
+    other_ids = await _add_entries(test_session, other.name, [T0])
+
+    await _retention().sweep([connection.name])
+
+    assert await _remaining_ids(test_session, connection.name) == []
+    assert await _remaining_ids(test_session, other.name) == other_ids
+
+
+async def test_nothing_expired(test_session):
+    """Test that a database within keep_last and without a max age has no expired condition."""
+    await _add_entries(test_session, "db", [T0, T0])
+
+    assert await _expired_condition(test_session, "db", 2, None) is None
+
+
+async def test_max_age_removes_older_entries(test_session):
+    """Test that entries older than max_age_days expire even within keep_last."""
+    now = datetime.utcnow()
+    ids = await _add_entries(test_session, "db", [
+        now - timedelta(days=3), now - timedelta(days=2, minutes=-1), now,
+    ])
+
+    expired = await _expired_condition(test_session, "db", 10, 2)
+    statement = select(QueryHistory.id).where(expired)
+
+    assert list((await test_session.execute(statement)).scalars()) == [ids[0]]
+
+
+async def test_archive_appends_to_daily_file(test_session, add_connection, app_database, tmp_path):
+    """Test that archived entries of two sweeps are appended to the same day's file."""
+    connection = await add_connection(historyKeepLast=0)
+    retention = _retention(archive_dir=tmp_path)
+    first = await _add_entries(test_session, connection.name, [T0, T0 + timedelta(hours=1)])
+    await retention.sweep([connection.name])
+    second = await _add_entries(test_session, connection.name, [T0 + timedelta(hours=2)])
+
+    await retention.sweep([connection.name])
+
+    path = tmp_path / connection.name / "2024-01-01.ndjson.gz"
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        archived = [json.loads(line) for line in f]
+    assert [entry["id"] for entry in archived] == first + second
+    assert archived[0]["executedAt"] == T0.isoformat()
+    assert await _remaining_ids(test_session, connection.name) == []
+    assert retention.stats()["archived"] == 3
@@ -0,0 +1,75 @@
+"""Tests for the batched query history writer."""
+
+import asyncio
+
+import pytest
+from app.models.query import QueryHistory
+from app.services.history_writer import HistoryWriter
+from sqlmodel import select
+
+
+def _record(writer: HistoryWriter, count: int, start: int = 0) -> None:
+    """Queue count entries whose SQL texts are numbered from start."""
+    for i in range(start, start + count):
+        writer.record(database_name="db", sql_text=f"SELECT {i}", success=True)
+
+
+async def _written_sql(session) -> list[str]:
+    """Get the SQL texts of the stored history entries in insertion order."""
+    result = await session.execute(select(QueryHistory).order_by(QueryHistory.id))
+    return [entry.sql_text for entry in result.scalars()]
+
+
+@pytest.fixture
+async def writer(app_database):
+    """Create a history writer with batches of 3 and a long flush interval."""
+    writer = HistoryWriter(batch_size=3, flush_interval=60, max_pending=10)
+    yield writer
+    await writer.close()
+
+
+async def test_full_batch_written_without_waiting(writer, test_session):
+    """Test that the drain task writes as soon as a batch fills up."""
+    writer.start()
+    _record(writer, 3)
+
+    async with asyncio.timeout(5):
+        while writer.stats()["written"] < 3:
+            await asyncio.sleep(0.01)
+
+    assert writer.stats()["batches"] == 1
+    assert await _written_sql(test_session) == ["SELECT 0", "SELECT 1", "SELECT 2"]
+
+
+async def test_flush_writes_in_batches(writer, test_session):
+    """Test that a flush writes queued entries in transactions of batch_size."""
+    _record(writer, 7)
+
+    await writer.flush()
+
+    assert writer.stats() == {
+        "written": 7, "batches": 3, "dropped": 0, "failed": 0, "pending": 0
+    }
+    assert len(await _written_sql(test_session)) == 7
+
+
+async def test_drops_oldest_beyond_max_pending(writer, test_session):
+    """Test that entries beyond max_pending push out the oldest ones."""
+    _record(writer, 12)
+
+    assert writer.stats()["pending"] == 10
+    assert writer.stats()["dropped"] == 2
+    await writer.flush()
+    assert await _written_sql(test_session) == [f"SELECT {i}" for i in range(2, 12)]
+
+
+async def test_close_writes_partial_batch(writer, test_session):
+    """Test that closing the writer writes entries still short of a batch."""
+    writer.start()
+    _record(writer, 2)
+    await asyncio.sleep(0)
+
+    await writer.close()
+
+    assert writer.stats()["written"] == 2
+    assert await _written_sql(test_session) == ["SELECT 0", "SELECT 1"]
@@ -0,0 +1,32 @@
+"""Tests for helpers over extracted metadata."""
+
+import pytest
+from app.services.metadata import get_keyset_columns
+
+
+def _metadata(data_type: str) -> dict:
+    """Create metadata of one table whose primary key has the given type."""
+    return {"tables": [{
+        "name": "t",
+        "schemaName": "main",
+        "columns": [{"name": "id", "dataType": data_type, "primaryKey": True}],
+    }]}
+
+
+@pytest.mark.parametrize("data_type", [
+    "integer", "INTEGER", "int", "int(11) unsigned", "bigint", "smallint", "tinyint(1)",
+    "int8", "serial", "bigserial", "varchar(36)", "character varying", "character(10)",
+    "char(36)", "text", "TEXT",
+])
+def test_keyset_key_types(data_type):
+    """Test that integer and string primary keys qualify for keyset pagination."""
+    assert get_keyset_columns(_metadata(data_type)) == {"main.t": ["id"], "t": ["id"]}
+
+
+@pytest.mark.parametrize("data_type", [
+    "interval", "point", "tinytext", "mediumtext", "text[]", "uuid", "timestamp", "numeric",
+    "", "internal_int",
+])
+def test_keyset_other_key_types(data_type):
+    """Test that other primary key types, including look-alikes, do not qualify."""
+    assert get_keyset_columns(_metadata(data_type)) == {}
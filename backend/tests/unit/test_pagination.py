@@ -0,0 +1,217 @@
+"""Tests for continuation tokens and held cursors."""
+
+import time
+
+import pytest
+from app.services.pagination import (
+    CURSOR_MODE,
+    CursorStore,
+    HeldCursor,
+    PaginationError,
+    SpilledResult,
+    SpillStore,
+    decode_token,
+    encode_token,
+    sql_hash,
+)
+
+
+class _Closable:
+    """Stand-in for a connection or result that records being closed."""
+
+    def __init__(self):
+        """Initialize closable."""
+        self.closed = False
+
+    async def close(self) -> None:
+        """Close it."""
+        self.closed = True
+
+
+def _cursor(db_name: str = "db") -> HeldCursor:
+    """Create a held cursor over stand-in connection and result."""
+    return HeldCursor(
+        db_name=db_name,
+        conn=_Closable(),
+        result=_Closable(),
+        columns=["id"],
+        description=None,
+        last_used=time.monotonic(),
+    )
+
+
+async def _spill(store: SpillStore, rows: int) -> str:
+    """Spill a result of rows integers into the store."""
+    spill_id, spool = store.new_spool()
+    spool.append([(i,) for i in range(rows)])
+    spool.finish()
+    await store.hold(spill_id, SpilledResult(
+        db_name="db", spool=spool, columns=[], last_used=time.monotonic()
+    ))
+    return spill_id
+
+
+def _token(db_name: str = "db", sql: str = "SELECT 1", params: dict | None = None) -> str:
+    """Encode a cursor continuation token."""
+    return encode_token({"m": CURSOR_MODE, "db": db_name, "h": sql_hash(sql, params), "c": "id"})
+
+
+def test_decode_token_round_trip():
+    """Test that a token decodes for the query it was issued for."""
+    payload = decode_token(_token(params={"x": 1}), "db", "SELECT 1", {"x": 1})
+
+    assert payload["c"] == "id"
+
+
+@pytest.mark.parametrize(("db_name", "sql", "params"), [
+    ("other", "SELECT 1", None),
+    ("db", "SELECT 2", None),
+    ("db", "SELECT 1", {"x": 2}),
+])
+def test_decode_token_mismatch(db_name, sql, params):
+    """Test that a token is refused for another database, query or bind values."""
+    with pytest.raises(PaginationError) as exc_info:
+        decode_token(_token(params=None if params is None else {"x": 1}), db_name, sql, params)
+
+    assert exc_info.value.details["reason"] == "mismatch"
+
+
+@pytest.mark.parametrize("token", ["not a token!", encode_token({"m": "other"}), encode_token([1])])
+def test_decode_token_malformed(token):
+    """Test that garbage and unknown modes are refused as malformed."""
+    with pytest.raises(PaginationError) as exc_info:
+        decode_token(token, "db", "SELECT 1")
+
+    assert exc_info.value.details["reason"] == "malformed"
+
+
+async def test_get_expired_cursor():
+    """Test that an unknown or released cursor is reported as expired."""
+    store = CursorStore(idle_timeout=60, max_open_per_database=2)
+    cursor_id = await store.hold(_cursor())
+    await store.release(cursor_id)
+
+    with pytest.raises(PaginationError) as exc_info:
+        store.get(cursor_id)
+
+    assert exc_info.value.details["reason"] == "expired"
+
+
+async def test_evict_idle_skips_cursor_serving_a_page():
+    """Test that the idle sweep closes idle cursors but not locked ones."""
+    store = CursorStore(idle_timeout=0, max_open_per_database=5)
+    idle = _cursor()
+    busy = _cursor()
+    idle_id = await store.hold(idle)
+    busy_id = await store.hold(busy)
+    idle.last_used = busy.last_used = time.monotonic() - 1
+
+    async with busy.lock:
+        assert await store.evict_idle() == 1
+
+    assert idle.conn.closed and idle.result.closed
+    assert not busy.conn.closed
+    assert store.get(busy_id) is busy
+    with pytest.raises(PaginationError):
+        store.get(idle_id)
+
+
+async def test_hold_closes_least_recently_used_cursor():
+    """Test that holding beyond the cap closes the least recently used cursor."""
+    store = CursorStore(idle_timeout=60, max_open_per_database=2)
+    oldest, newer = _cursor(), _cursor()
+    await store.hold(oldest)
+    await store.hold(newer)
+    oldest.last_used -= 10
+
+    await store.hold(_cursor())
+
+    assert oldest.conn.closed
+    assert not newer.conn.closed
+
+
+async def test_hold_skips_cursor_serving_a_page():
+    """Test that a cursor serving a page is not closed to make room."""
+    store = CursorStore(idle_timeout=60, max_open_per_database=2)
+    busy, idle = _cursor(), _cursor()
+    await store.hold(busy)
+    await store.hold(idle)
+    busy.last_used -= 10
+
+    async with busy.lock:
+        await store.hold(_cursor())
+
+    assert not busy.conn.closed
+    assert idle.conn.closed
+
+
+async def test_hold_rejects_when_all_cursors_serve_pages():
+    """Test that a new cursor is refused when no held cursor can be closed."""
+    store = CursorStore(idle_timeout=60, max_open_per_database=1)
+    busy = _cursor()
+    await store.hold(busy)
+
+    async with busy.lock:
+        with pytest.raises(PaginationError) as exc_info:
+            await store.hold(_cursor())
+
+    assert exc_info.value.details["reason"] == "too_many_cursors"
+    assert not busy.conn.closed
+
+
+async def test_cap_is_per_database():
+    """Test that cursors of other databases do not count against the cap."""
+    store = CursorStore(idle_timeout=60, max_open_per_database=1)
+    other = _cursor("other")
+    await store.hold(other)
+
+    await store.hold(_cursor())
+
+    assert not other.conn.closed
+
+
+async def test_spilled_result_pages(tmp_path):
+    """Test that a held spilled result serves its pages from the spool file."""
+    store = SpillStore(idle_timeout=60, max_disk_bytes=1 << 20, spill_dir=tmp_path)
+    spill_id = await _spill(store, 25)
+
+    spool = store.get(spill_id).spool
+    assert [row[0] for row in spool.read(20, 10)] == [20, 21, 22, 23, 24]
+    assert store.stats()["diskBytes"] == spool.size_bytes
+
+    await store.release(spill_id)
+    assert not spool.path.exists()
+    with pytest.raises(PaginationError) as exc_info:
+        store.get(spill_id)
+    assert exc_info.value.details["reason"] == "expired"
+    await store.close()
+
+
+async def test_hold_evicts_least_recently_used_spill(tmp_path):
+    """Test that spilling beyond max_disk_bytes deletes the least recently used results."""
+    store = SpillStore(idle_timeout=60, max_disk_bytes=1 << 20, spill_dir=tmp_path)
+    oldest = await _spill(store, 100)
+    newer = await _spill(store, 100)
+    store.max_disk_bytes = store.stats()["diskBytes"] + 1
+    store.get(newer)
+
+    latest = await _spill(store, 100)
+
+    with pytest.raises(PaginationError):
+        store.get(oldest)
+    store.get(newer)
+    store.get(latest)
+    assert store.stats()["evicted"] == 1
+    assert store.stats()["diskBytes"] <= store.max_disk_bytes
+    await store.close()
+
+
+async def test_close_removes_process_spill_dir(tmp_path):
+    """Test that spills go to a directory of this process, removed on close."""
+    store = SpillStore(idle_timeout=60, max_disk_bytes=1 << 20, spill_dir=tmp_path)
+    spill_id = await _spill(store, 10)
+    process_dir = store.get(spill_id).spool.path.parent
+
+    assert process_dir.parent == tmp_path
+    await store.close()
+    assert not process_dir.exists()
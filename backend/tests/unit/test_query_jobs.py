@@ -0,0 +1,216 @@
+"""Tests for background query jobs."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from app.config import settings
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.admission import admission_controller
+from app.services.engine_registry import engine_registry
+from app.services.query_jobs import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    QueryJob,
+    QueryJobError,
+    QueryJobManager,
+)
+from app.services.sql_validator import DEFAULT_ROW_LIMIT
+
+
+def _connection(url: str = "sqlite:///db.sqlite", **options) -> DatabaseConnection:
+    """Create a SQLite connection with a name of its own."""
+    return DatabaseConnection(
+        name=f"db_{uuid.uuid4().hex[:8]}",
+        url=url,
+        database_type=DatabaseType.SQLITE,
+        options_json=json.dumps(options) if options else None,
+    )
+
+
+def _manager(tmp_path: Path, workers: int = 0, max_queued: int = 10) -> QueryJobManager:
+    """Create a job manager spooling under tmp_path."""
+    return QueryJobManager(
+        workers=workers, max_queued=max_queued, result_ttl=60, spool_dir=tmp_path / "jobs"
+    )
+
+
+# Counts forever; only cancellation or the job timeout stops it
+ENDLESS_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+def target_url(target_path) -> str:
+    """Get the URL of the SQLite target database."""
+    return f"sqlite:///{target_path}"
+
+
+@pytest.fixture
+async def started(tmp_path):
+    """Create a running job manager with one worker."""
+    manager = _manager(tmp_path, workers=1)
+    manager.start()
+    yield manager
+    await manager.close()
+    await engine_registry.close()
+
+
+async def _finished(manager: QueryJobManager, job: QueryJob) -> QueryJob:
+    """Wait until a job is in a final state."""
+    async with asyncio.timeout(10):
+        async for _ in manager.watch(job):
+            pass
+    return job
+
+
+def test_submit_adds_job_row_limit(tmp_path):
+    """Test that a job query without a LIMIT gets the job row limit."""
+    job = _manager(tmp_path).submit(_connection(), "SELECT * FROM t")
+
+    assert job.sql == f"SELECT * FROM t LIMIT {settings.job_max_rows}"
+    assert job.status == JOB_QUEUED
+
+
+def test_submit_with_interactive_limit(tmp_path):
+    """Test that a query moved from the query endpoint keeps the interactive row limit."""
+    job = _manager(tmp_path).submit(_connection(), "SELECT * FROM t", limit=DEFAULT_ROW_LIMIT)
+
+    assert job.sql == f"SELECT * FROM t LIMIT {DEFAULT_ROW_LIMIT}"
+
+
+def test_submit_rejects_when_queue_is_full(tmp_path):
+    """Test that submissions beyond max_queued are refused."""
+    manager = _manager(tmp_path, max_queued=1)
+    manager.submit(_connection(), "SELECT 1")
+
+    with pytest.raises(QueryJobError) as exc_info:
+        manager.submit(_connection(), "SELECT 1")
+
+    assert exc_info.value.details["reason"] == "queue_full"
+
+
+async def test_cancel_queued_job(tmp_path):
+    """Test that a queued job is cancelled without running."""
+    manager = _manager(tmp_path)
+    connection = _connection()
+    job = manager.submit(connection, "SELECT 1")
+
+    await manager.cancel(connection.name, job.job_id)
+
+    assert job.status == JOB_CANCELLED
+    assert job.error["code"] == "QUERY_CANCELLED"
+    assert manager.stats()["queued"] == 0
+
+
+async def test_cancelled_jobs_do_not_count_against_queue(tmp_path):
+    """Test that cancelled jobs still in the queue leave room for new ones."""
+    manager = _manager(tmp_path, max_queued=2)
+    connection = _connection()
+    for _ in range(2):
+        job = manager.submit(connection, "SELECT 1")
+        await manager.cancel(connection.name, job.job_id)
+
+    manager.submit(connection, "SELECT 1")
+    manager.submit(connection, "SELECT 1")
+
+    assert manager.stats()["queued"] == 2
+
+
+def test_get_unknown_job(tmp_path):
+    """Test that an unknown job is reported as not found."""
+    with pytest.raises(QueryJobError) as exc_info:
+        _manager(tmp_path).get("db", "missing")
+
+    assert exc_info.value.details["reason"] == "not_found"
+
+
+async def test_job_without_slot_fails_after_its_timeout(started, target_url):
+    """Test that a job does not wait for an admission slot beyond its timeout."""
+    connection = _connection(target_url, maxConcurrentQueries=1, maxQueuedQueries=0)
+    ticket = await admission_controller.acquire(connection)
+    try:
+        job = started.submit(connection, "SELECT * FROM t", timeout=1)
+        await _finished(started, job)
+    finally:
+        ticket.release()
+
+    assert job.status == JOB_FAILED
+    assert job.error["code"] == "QUERY_QUEUE_TIMEOUT"
+    assert job.started_at is None
+
+
+async def test_job_spools_rows(started, target_url):
+    """Test that a job runs to completion and its rows are read back by offset."""
+    job = started.submit(_connection(target_url), "SELECT id FROM t ORDER BY id")
+    await _finished(started, job)
+
+    assert job.status == JOB_SUCCEEDED
+    assert job.row_count == 25
+    assert job.started_at is not None
+    assert [row[0] for row in await started.read_rows(job, 20, 10)] == [21, 22, 23, 24, 25]
+
+
+async def test_cancel_running_job(started, target_url):
+    """Test that cancelling a running job stops its statement."""
+    connection = _connection(target_url)
+    job = started.submit(connection, ENDLESS_SQL)
+    async with asyncio.timeout(10):
+        while job.status != JOB_RUNNING:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+
+        await started.cancel(connection.name, job.job_id)
+
+    assert job.status == JOB_CANCELLED
+    with pytest.raises(QueryJobError) as exc_info:
+        started.require_result(job)
+    assert exc_info.value.details["reason"] == JOB_CANCELLED
+
+
+def test_no_result_before_finished(tmp_path):
+    """Test that reading a queued job's result is refused."""
+    manager = _manager(tmp_path)
+    job = manager.submit(_connection(), "SELECT 1")
+
+    with pytest.raises(QueryJobError) as exc_info:
+        manager.require_result(job)
+
+    assert exc_info.value.details["reason"] == "not_finished"
+
+
+async def test_start_keeps_spools_of_live_processes(tmp_path, target_url):
+    """Test that startup removes only the spool directories of exited processes."""
+    exited = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    dead_dir = tmp_path / "jobs" / f"{exited.stdout.strip()}-0000"
+    live_dir = tmp_path / "jobs" / f"{os.getppid()}-0000"
+    for directory in (dead_dir, live_dir):
+        directory.mkdir(parents=True)
+        (directory / "job.spool").write_bytes(b"rows")
+    manager = _manager(tmp_path, workers=1)
+
+    manager.start()
+    job = manager.submit(_connection(target_url), "SELECT 1")
+    await _finished(manager, job)
+    own_dir = job.spool.path.parent
+
+    assert not dead_dir.exists()
+    assert (live_dir / "job.spool").exists()
+    assert own_dir.name.startswith(f"{os.getpid()}-")
+    await manager.close()
+    await engine_registry.close()
+    assert not own_dir.exists()
@@ -0,0 +1,157 @@
+"""Tests for query plan summaries and cost guardrails."""
+
+import json
+import sqlite3
+
+import pytest
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.query_plan import (
+    _summarize_mysql,
+    _summarize_postgresql,
+    evaluate_guardrails,
+    explain_query,
+)
+from app.services.sql_validator import validate_and_transform_sql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def _connection(database_type: DatabaseType, **options) -> DatabaseConnection:
+    """Create a connection with the given options."""
+    return DatabaseConnection(
+        name="db",
+        url="sqlite:///db.sqlite",
+        database_type=database_type,
+        options_json=json.dumps(options),
+    )
+
+
+def _seq_scan(table: str) -> dict:
+    """Build a PostgreSQL Seq Scan node."""
+    return {"Node Type": "Seq Scan", "Relation Name": table, "Schema": "public"}
+
+
+def _postgresql_plan(root: dict) -> list[dict]:
+    """Wrap a PostgreSQL plan node as EXPLAIN (FORMAT JSON) output."""
+    return [{"Plan": {"Plan Rows": 10, "Total Cost": 0.15, **root}}]
+
+
+def test_postgresql_seq_scan_without_limit_is_full_scan():
+    """Test that a Seq Scan with no Limit above it is reported."""
+    summary = _summarize_postgresql(_postgresql_plan(_seq_scan("big")))
+
+    assert summary["fullScans"] == ["public.big"]
+
+
+def test_postgresql_seq_scan_under_limit_is_not_full_scan():
+    """Test that a Seq Scan directly under a Limit is not reported."""
+    plan = _postgresql_plan({"Node Type": "Limit", "Plans": [_seq_scan("big")]})
+
+    assert _summarize_postgresql(plan)["fullScans"] == []
+
+
+@pytest.mark.parametrize("blocking", [
+    {"Node Type": "Sort"},
+    {"Node Type": "Aggregate", "Strategy": "Hashed"},
+    {"Node Type": "Aggregate", "Strategy": "Plain"},
+])
+def test_postgresql_seq_scan_under_blocking_node_is_full_scan(blocking):
+    """Test that a Limit does not bound a scan below a node reading all its input."""
+    plan = _postgresql_plan({
+        "Node Type": "Limit",
+        "Plans": [{**blocking, "Plans": [_seq_scan("big")]}],
+    })
+
+    assert _summarize_postgresql(plan)["fullScans"] == ["public.big"]
+
+
+def test_postgresql_hash_join_under_limit_reports_build_side():
+    """Test that the hashed side of a join under a Limit is read in full."""
+    plan = _postgresql_plan({
+        "Node Type": "Limit",
+        "Plans": [{
+            "Node Type": "Hash Join",
+            "Plans": [
+                _seq_scan("big"),
+                {"Node Type": "Hash", "Plans": [_seq_scan("other")]},
+            ],
+        }],
+    })
+
+    assert _summarize_postgresql(plan)["fullScans"] == ["public.other"]
+
+
+def test_postgresql_init_plan_is_not_bounded_by_limit():
+    """Test that an init plan under a Limit still runs in full."""
+    plan = _postgresql_plan({
+        "Node Type": "Limit",
+        "Plans": [{**_seq_scan("big"), "Parent Relationship": "InitPlan"}],
+    })
+
+    assert _summarize_postgresql(plan)["fullScans"] == ["public.big"]
+
+
+def _mysql_plan(**block) -> dict:
+    """Build MySQL EXPLAIN FORMAT=JSON output scanning one table."""
+    return {
+        "query_block": {
+            "cost_info": {"query_cost": "5000000.00"},
+            "table": {
+                "table_name": "big", "access_type": "ALL", "rows_produced_per_join": 50000000
+            },
+            **block,
+        }
+    }
+
+
+def test_mysql_scan_without_limit_is_full_scan():
+    """Test that a MySQL full scan is reported for a query without a limit."""
+    assert _summarize_mysql(_mysql_plan())["fullScans"] == ["big"]
+
+
+def test_mysql_scan_with_streaming_limit_is_not_full_scan():
+    """Test that a MySQL full scan stopped by a limit is not reported."""
+    assert _summarize_mysql(_mysql_plan(), row_limit=10)["fullScans"] == []
+
+
+def test_mysql_scan_with_filesort_is_full_scan():
+    """Test that a MySQL scan feeding a filesort is reported despite a limit."""
+    plan = _mysql_plan(ordering_operation={"using_filesort": True})
+
+    assert _summarize_mysql(plan, row_limit=10)["fullScans"] == ["big"]
+
+
+@pytest.fixture
+def sqlite_path(tmp_path) -> str:
+    """Create a SQLite database with one table."""
+    path = str(tmp_path / "target.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE big (id INTEGER PRIMARY KEY, name TEXT, amount INTEGER)")
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize(("sql", "flagged"), [
+    ("SELECT * FROM big", False),
+    ("SELECT * FROM big WHERE name = 'x'", False),
+    ("SELECT * FROM big ORDER BY id", False),
+    ("SELECT * FROM big ORDER BY name", True),
+    ("SELECT COUNT(*) FROM big", True),
+    ("SELECT name, COUNT(*) FROM big GROUP BY name", True),
+    ("SELECT DISTINCT name FROM big", True),
+])
+async def test_sqlite_guardrails_with_validation_limit(sqlite_path, sql, flagged):
+    """Test that only scans not stopped by the added LIMIT exceed the guardrail."""
+    connection = _connection(DatabaseType.SQLITE, largeTableRows=1000)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}")
+    validated = validate_and_transform_sql(sql, limit=10, database_type=DatabaseType.SQLITE)
+    try:
+        plan = await explain_query(engine, connection, validated, {"big": 50_000_000})
+    finally:
+        await engine.dispose()
+
+    warnings = evaluate_guardrails(connection, plan)
+
+    if flagged:
+        assert warnings == ["Full scan of large table 'big' (50000000 rows)"]
+    else:
+        assert warnings == []
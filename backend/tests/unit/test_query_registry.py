@@ -0,0 +1,104 @@
+"""Tests for the running query registry."""
+
+import asyncio
+
+import pytest
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services.query_registry import QueryCancelledError, QueryRegistry
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Counts forever; only a cancel request stops it
+ENDLESS_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """Create an engine on a SQLite file database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'target.db'}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def connection() -> DatabaseConnection:
+    """Create a SQLite connection object."""
+    return DatabaseConnection(
+        name="db", url="sqlite:///target.db", database_type=DatabaseType.SQLITE
+    )
+
+
+async def test_track_registers_while_running(engine, connection):
+    """Test that a query is listed only while it is tracked."""
+    registry = QueryRegistry()
+
+    async with engine.connect() as conn:
+        async with registry.track("q1", connection, engine, conn, "SELECT 1"):
+            running = registry.list_running("db")
+            assert [entry["queryId"] for entry in running] == ["q1"]
+            assert registry.list_running("other") == []
+
+    assert registry.get("db", "q1") is None
+    assert registry.list_running("db") == []
+
+
+async def test_track_rejects_query_id_in_use(engine, connection):
+    """Test that a running query's id cannot be reused."""
+    registry = QueryRegistry()
+
+    async with engine.connect() as conn, engine.connect() as other:
+        async with registry.track("q1", connection, engine, conn, "SELECT 1"):
+            with pytest.raises(ValueError):
+                async with registry.track("q1", connection, engine, other, "SELECT 1"):
+                    pass
+
+
+async def test_cancel_unknown_query():
+    """Test that cancelling a query that is not running reports it."""
+    assert await QueryRegistry().cancel("db", "missing") is False
+
+
+async def test_cancel_interrupts_statement(engine, connection):
+    """Test that cancel stops the statement and the query fails as cancelled."""
+    registry = QueryRegistry()
+
+    async def run():
+        async with engine.connect() as conn:
+            async with registry.track("q1", connection, engine, conn, ENDLESS_SQL) as running:
+                await running.guard(conn.execute(text(ENDLESS_SQL)))
+
+    task = asyncio.create_task(run())
+    async with asyncio.timeout(5):
+        while registry.get("db", "q1") is None:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+
+        assert await registry.cancel("db", "q1") is True
+        with pytest.raises(QueryCancelledError):
+            await task
+
+    assert registry.get("db", "q1") is None
+
+
+async def test_cancelled_task_interrupts_statement(engine, connection):
+    """Test that cancelling the caller's task stops the statement on the target."""
+    registry = QueryRegistry()
+    started = asyncio.Event()
+
+    async def run():
+        async with engine.connect() as conn:
+            async with registry.track("q1", connection, engine, conn, ENDLESS_SQL) as running:
+                started.set()
+                await running.guard(conn.execute(text(ENDLESS_SQL)))
+
+    task = asyncio.create_task(run())
+    async with asyncio.timeout(5):
+        await started.wait()
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert registry.get("db", "q1") is None
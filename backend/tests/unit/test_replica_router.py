@@ -0,0 +1,142 @@
+"""Tests for routing reads across read replicas."""
+
+import json
+import sqlite3
+import uuid
+
+import pytest
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services import replica_router as replica_router_module
+from app.services.engine_registry import engine_registry
+from app.services.replica_router import ReplicaRouter, _query_lag
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+
+def _sqlite_file(path) -> str:
+    """Create a SQLite file and get its URL."""
+    sqlite3.connect(path).close()
+    return f"sqlite:///{path}"
+
+
+def _connection(url: str, replicas: list[dict]) -> DatabaseConnection:
+    """Create a SQLite connection with a name of its own and the given replicas."""
+    return DatabaseConnection(
+        name=f"db_{uuid.uuid4().hex[:8]}",
+        url=url,
+        database_type=DatabaseType.SQLITE,
+        replicas_json=json.dumps(replicas),
+    )
+
+
+@pytest.fixture
+async def router():
+    """Create a replica router and close the engines it opened afterwards."""
+    yield ReplicaRouter(health_interval=5, idle_timeout=60)
+    await engine_registry.close()
+
+
+async def test_weighted_choice(router, tmp_path, monkeypatch):
+    """Test that the replica is picked at random by weight among usable replicas."""
+    first = _sqlite_file(tmp_path / "first.db")
+    second = _sqlite_file(tmp_path / "second.db")
+    connection = _connection(_sqlite_file(tmp_path / "primary.db"), [
+        {"url": first, "weight": 3},
+        {"url": second},
+    ])
+    choices = []
+
+    def choose(population, weights):
+        choices.append(([r.url for r in population], weights))
+        return [population[-1]]
+
+    monkeypatch.setattr(replica_router_module.random, "choices", choose)
+
+    engine = await router.get_engine(connection)
+
+    assert choices == [([first, second], [3, 1])]
+    assert str(engine.url).endswith("second.db")
+    assert router.stats()["routed"] == 1
+
+
+async def test_lagging_replicas_fall_back_to_primary(router, tmp_path):
+    """Test that the primary is used when every replica lags too far behind."""
+    replica = _sqlite_file(tmp_path / "replica.db")
+    connection = _connection(_sqlite_file(tmp_path / "primary.db"), [{"url": replica}])
+    await router.get_engine(connection)
+    router._sets[connection.name].replicas[0].lag_seconds = 3600
+
+    engine = await router.get_engine(connection)
+
+    assert str(engine.url).endswith("primary.db")
+    assert router.stats()["primaryFallbacks"] == 1
+
+
+async def test_failed_connect_ejects_until_probe_succeeds(router, tmp_path):
+    """Test that a replica failing to connect leaves rotation until a probe succeeds."""
+    missing = tmp_path / "missing" / "replica.db"
+    connection = _connection(
+        _sqlite_file(tmp_path / "primary.db"), [{"url": f"sqlite:///{missing}"}]
+    )
+    engine = await router.get_engine(connection)
+
+    with pytest.raises(OperationalError):
+        async with engine.connect():
+            pass
+
+    replica = router._sets[connection.name].replicas[0]
+    assert not replica.healthy
+    assert router.stats()["ejections"] == 1
+    assert str((await router.get_engine(connection)).url).endswith("primary.db")
+
+    await router.check_health()
+    assert not replica.healthy
+
+    missing.parent.mkdir()
+    await router.check_health()
+    assert replica.healthy
+    assert replica.lag_seconds == 0.0
+    assert str((await router.get_engine(connection)).url).endswith("replica.db")
+
+
+class _MySQLConnection:
+    """Stand-in for a MySQL connection failing the first statement it runs."""
+
+    def __init__(self, error: Exception):
+        """Initialize connection."""
+        self.error = error
+        self.statements: list[str] = []
+
+    async def execute(self, statement):
+        """Record the statement and fail the first one."""
+        self.statements.append(str(statement))
+        if len(self.statements) == 1:
+            raise self.error
+        return self
+
+    def mappings(self):
+        """Get the result rows as mappings."""
+        return self
+
+    def first(self):
+        """Get a status row of a replica 4 seconds behind."""
+        return {"Seconds_Behind_Master": 4}
+
+
+async def test_mysql_lag_falls_back_on_syntax_error():
+    """Test that servers not knowing SHOW REPLICA STATUS are asked with SHOW SLAVE STATUS."""
+    conn = _MySQLConnection(
+        ProgrammingError("SHOW REPLICA STATUS", None, Exception(1064, "syntax error"))
+    )
+
+    assert await _query_lag(conn, DatabaseType.MYSQL) == 4.0
+    assert conn.statements == ["SHOW REPLICA STATUS", "SHOW SLAVE STATUS"]
+
+
+async def test_mysql_lag_raises_other_errors():
+    """Test that errors other than a syntax error are not retried."""
+    error = OperationalError("SHOW REPLICA STATUS", None, Exception(2013, "lost connection"))
+    conn = _MySQLConnection(error)
+
+    with pytest.raises(OperationalError):
+        await _query_lag(conn, DatabaseType.MYSQL)
+    assert conn.statements == ["SHOW REPLICA STATUS"]
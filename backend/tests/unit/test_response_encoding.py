@@ -0,0 +1,53 @@
+"""Tests for the JSON encoding of query results."""
+
+import json
+import math
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from app.models.schemas import QueryResult
+from app.services.response_encoding import encode_result
+
+COLUMNS = [{"name": "v", "dataType": "any"}]
+
+
+def _result(rows: list[tuple]) -> dict:
+    """Create a query result with row tuples of one column."""
+    return {
+        "columns": COLUMNS,
+        "rows": rows,
+        "rowCount": len(rows),
+        "executionTimeMs": 1,
+        "sql": "SELECT v FROM t",
+    }
+
+
+async def test_matches_model_serialization():
+    """Test that the fast path writes values the way the response model does."""
+    values = [
+        Decimal("12.50"),
+        datetime(2024, 5, 1, 12, 30, tzinfo=UTC),
+        date(2024, 5, 1),
+        timedelta(seconds=90),
+        b"text",
+        math.nan,
+        math.inf,
+        None,
+    ]
+    result = _result([(value,) for value in values])
+
+    encoded = json.loads(await encode_result(QueryResult, result))
+    expected = QueryResult.model_validate(
+        {**result, "rows": [{"v": value} for value in values]}
+    ).model_dump(mode="json", by_alias=True)
+
+    assert encoded == expected
+
+
+async def test_non_utf8_bytes_replaced():
+    """Test that bytes that are not UTF-8 are encoded with replacement characters."""
+    result = _result([(b"\xff\x00",), (b"ok",)])
+
+    encoded = json.loads(await encode_result(QueryResult, result))
+
+    assert [row["v"] for row in encoded["rows"]] == ["\ufffd\x00", "ok"]
@@ -0,0 +1,140 @@
+"""Tests for the two-tier query result cache."""
+
+import os
+import pickle
+from datetime import datetime
+
+from app.models.database import DatabaseConnection, DatabaseType
+from app.services import result_cache as result_cache_module
+from app.services.result_cache import ResultCache, connection_version
+
+
+def _value(rows: int = 1) -> dict:
+    """Create a query result with the given number of rows."""
+    return {"rows": [{"id": i} for i in range(rows)], "rowCount": rows}
+
+
+def _size(value: dict) -> int:
+    """Get the size of a cached entry."""
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+async def test_memory_tier_evicts_least_recently_used_bytes():
+    """Test that entries are evicted by total size, least recently used first."""
+    value = _value()
+    cache = ResultCache(max_memory_bytes=2 * _size(value), max_entry_bytes=1 << 20)
+    await cache.put("a", value)
+    await cache.put("b", value)
+    assert await cache.get("a", 60) is not None
+
+    await cache.put("c", value)
+
+    assert await cache.get("b", 60) is None
+    assert await cache.get("a", 60) is not None
+    assert await cache.get("c", 60) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memoryBytes"] == 2 * _size(value)
+
+
+async def test_oversized_entry_not_cached():
+    """Test that a result larger than max_entry_bytes is not stored."""
+    cache = ResultCache(max_memory_bytes=1 << 20, max_entry_bytes=_size(_value()))
+
+    await cache.put("key", _value(100))
+
+    assert await cache.get("key", 60) is None
+    assert cache.stats()["stores"] == 0
+
+
+async def test_ttl_expiry(monkeypatch):
+    """Test that an entry older than the caller's TTL is dropped."""
+    now = 1000.0
+    monkeypatch.setattr(result_cache_module.time, "time", lambda: now)
+    cache = ResultCache(max_memory_bytes=1 << 20, max_entry_bytes=1 << 20)
+    await cache.put("key", _value())
+
+    now += 10
+    cached = await cache.get("key", 10)
+    assert cached is not None
+    assert cached.age_ms == 10000
+
+    now += 1
+    assert await cache.get("key", 10) is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["memoryEntries"] == 0
+
+
+async def test_invalidate_drops_connection_entries(tmp_path):
+    """Test that invalidate removes a connection's entries from both tiers only."""
+    cache = ResultCache(1 << 20, 1 << 20, disk_dir=tmp_path, max_disk_bytes=1 << 20)
+    dropped = cache.make_key("db", "SELECT 1")
+    kept = cache.make_key("other", "SELECT 1")
+    await cache.put(dropped, _value())
+    await cache.put(kept, _value())
+
+    await cache.invalidate("db")
+
+    assert await cache.get(dropped, 60) is None
+    assert await cache.get(kept, 60) is not None
+    assert [path.stem for path in tmp_path.glob("*.pkl")] == [kept]
+
+
+def test_key_changes_with_connection_version():
+    """Test that a connection pointed at another target gets other cache keys."""
+    connection = DatabaseConnection(
+        name="db",
+        url="sqlite:///a.db",
+        database_type=DatabaseType.SQLITE,
+        updated_at=datetime(2024, 1, 1),
+    )
+    before = connection_version(connection)
+    connection.url = "sqlite:///b.db"
+    after_url = connection_version(connection)
+    connection.updated_at = datetime(2024, 1, 2)
+    after_update = connection_version(connection)
+
+    assert len({before, after_url, after_update}) == 3
+    assert ResultCache.make_key("db", "SELECT 1", version=before) != ResultCache.make_key(
+        "db", "SELECT 1", version=after_url
+    )
+
+
+async def test_disk_tier_shared_between_caches(tmp_path):
+    """Test that a result written by one cache is served from disk by another."""
+    writer = ResultCache(1 << 20, 1 << 20, disk_dir=tmp_path, max_disk_bytes=1 << 20)
+    reader = ResultCache(1 << 20, 1 << 20, disk_dir=tmp_path, max_disk_bytes=1 << 20)
+    await writer.put("key", _value(3))
+
+    cached = await reader.get("key", 60)
+
+    assert cached.value == _value(3)
+    assert reader.stats()["diskHits"] == 1
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+async def test_disk_write_failure_leaves_no_entry(tmp_path, monkeypatch):
+    """Test that a write failing before the rename leaves neither entry nor temp file."""
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(result_cache_module.os, "replace", fail)
+    cache = ResultCache(1 << 20, 1 << 20, disk_dir=tmp_path, max_disk_bytes=1 << 20)
+
+    await cache.put("key", _value())
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prune_disk_removes_oldest_entries(tmp_path):
+    """Test that pruning removes the oldest files until the tier fits its budget."""
+    cache = ResultCache(1 << 20, 1 << 20, disk_dir=tmp_path, max_disk_bytes=1 << 20)
+    for age, key in enumerate(["newest", "middle", "oldest"]):
+        cache._write_disk(key, 0.0, b"x" * 100)
+        mtime = 1_000_000 - age * 100
+        os.utime(tmp_path / f"{key}.pkl", (mtime, mtime))
+    cache.max_disk_bytes = 2 * (100 + result_cache_module._HEADER.size)
+
+    cache._prune_disk()
+
+    assert sorted(path.stem for path in tmp_path.glob("*.pkl")) == ["middle", "newest"]
@@ -0,0 +1,107 @@
+"""Tests for single-flight execution."""
+
+import asyncio
+
+import pytest
+from app.services.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    """Test that calls with the same key in flight run fn once."""
+    group = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    tasks = [asyncio.create_task(group.do("key", fn)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [1, 1, 1]
+    assert calls == 1
+    assert group.stats()["coalesced"] == 2
+    assert group.in_flight() == 0
+
+
+async def test_key_released_after_execution():
+    """Test that a call after the execution ended starts a fresh one."""
+    group = SingleFlight()
+    results = iter([1, 2])
+
+    async def fn():
+        return next(results)
+
+    assert await group.do("key", fn) == 1
+    assert await group.do("key", fn) == 2
+
+
+async def test_error_propagates_to_every_waiter():
+    """Test that every waiter gets the exception of the shared execution."""
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(group.do("key", fn)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert group.stats()["failed"] == 1
+    assert group.in_flight() == 0
+
+
+async def test_cancelled_waiter_leaves_others_running():
+    """Test that cancelling one waiter does not cancel the shared execution."""
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(group.do("key", fn))
+    second = asyncio.create_task(group.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    assert first.cancelled()
+    assert group.stats()["abandoned"] == 0
+
+
+async def test_last_waiter_cancels_execution():
+    """Test that the execution is cancelled when its last waiter leaves."""
+    group = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fn():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    task = asyncio.create_task(group.do("key", fn))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    async with asyncio.timeout(1):
+        await cancelled.wait()
+    await asyncio.sleep(0)
+    assert group.stats()["abandoned"] == 1
+    assert group.in_flight() == 0
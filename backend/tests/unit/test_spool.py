@@ -0,0 +1,63 @@
+"""Tests for on-disk result spools."""
+
+import pytest
+from app.services.spool import ResultSpool
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """Create a finished spool of rows 0-24 written in frames of 10, 10 and 5."""
+    spool = ResultSpool(tmp_path / "result.spool")
+    for start in (0, 10, 20):
+        spool.append([(i, f"row {i}") for i in range(start, min(start + 10, 25))])
+    spool.finish()
+    yield spool
+    spool.remove()
+
+
+def test_append_counts_rows_and_bytes(spool):
+    """Test that appended frames are counted and sized like the file."""
+    assert spool.row_count == 25
+    assert spool.size_bytes == spool.path.stat().st_size
+
+
+@pytest.mark.parametrize(("offset", "limit"), [(0, 5), (8, 4), (5, 20), (19, 2), (20, 5)])
+def test_read_across_frames(spool, offset, limit):
+    """Test that a page is read from every frame holding part of it."""
+    rows = spool.read(offset, limit)
+
+    assert [row[0] for row in rows] == list(range(offset, offset + limit))
+
+
+def test_read_past_end(spool):
+    """Test that reads are cut at the last row."""
+    assert [row[0] for row in spool.read(22, 10)] == [22, 23, 24]
+    assert spool.read(25, 10) == []
+    assert spool.read(0, 0) == []
+
+
+def test_iter_batches(spool):
+    """Test that all rows are read back in batches independent of the frames."""
+    batches = list(spool.iter_batches(7))
+
+    assert [len(batch) for batch in batches] == [7, 7, 7, 4]
+    assert [row[0] for batch in batches for row in batch] == list(range(25))
+
+
+def test_empty_spool(tmp_path):
+    """Test that a spool without rows finishes and reads nothing."""
+    spool = ResultSpool(tmp_path / "empty.spool")
+    spool.append([])
+    spool.finish()
+
+    assert spool.row_count == 0
+    assert spool.read(0, 10) == []
+    spool.remove()
+
+
+def test_remove_deletes_file(spool):
+    """Test that removing a spool deletes its file, also when called twice."""
+    spool.remove()
+    spool.remove()
+
+    assert not spool.path.exists()
@@ -0,0 +1,193 @@
+"""Tests for SQL validation and row limits."""
+
+import pytest
+from app.config import settings
+from app.models.database import DatabaseType
+from app.services.sql_validator import (
+    DEFAULT_ROW_LIMIT,
+    SQLParseCache,
+    SQLValidationError,
+    get_sql_fingerprint,
+    normalize_sql,
+    validate_and_transform_sql,
+)
+
+
+@pytest.mark.parametrize(
+    ("sql", "expected"),
+    [
+        ("SELECT * FROM t", f"SELECT * FROM t LIMIT {DEFAULT_ROW_LIMIT}"),
+        ("SELECT * FROM t;", f"SELECT * FROM t LIMIT {DEFAULT_ROW_LIMIT}"),
+        ("SELECT * FROM t -- note", f"SELECT * FROM t LIMIT {DEFAULT_ROW_LIMIT} -- note"),
+        ("SELECT * FROM t OFFSET 5", f"SELECT * FROM t LIMIT {DEFAULT_ROW_LIMIT} OFFSET 5"),
+        ("(SELECT 1) UNION (SELECT 2)", f"(SELECT 1) UNION (SELECT 2) LIMIT {DEFAULT_ROW_LIMIT}"),
+        ("SELECT * FROM t LIMIT 5", "SELECT * FROM t LIMIT 5"),
+        ("SELECT * FROM (SELECT * FROM u LIMIT 5) AS s", (
+            f"SELECT * FROM (SELECT * FROM u LIMIT 5) AS s LIMIT {DEFAULT_ROW_LIMIT}"
+        )),
+    ],
+)
+def test_adds_missing_limit(sql, expected):
+    """Test that a top-level LIMIT is added only when the query has none."""
+    assert validate_and_transform_sql(sql, database_type=DatabaseType.SQLITE) == expected
+
+
+def test_lowers_limit_above_max():
+    """Test that a literal LIMIT above the maximum is lowered in place."""
+    sql = validate_and_transform_sql("select * from t limit 999999")
+
+    assert sql == f"select * from t limit {settings.query_max_rows}"
+
+
+def test_lowers_fetch_first_above_max():
+    """Test that FETCH FIRST is bounded like LIMIT."""
+    sql = validate_and_transform_sql(
+        "select * from t fetch first 5000000 rows only",
+        database_type=DatabaseType.POSTGRESQL,
+    )
+
+    assert sql == f"select * from t fetch first {settings.query_max_rows} rows only"
+
+
+def test_explicit_max_limit():
+    """Test that a caller-supplied maximum overrides the setting."""
+    sql = validate_and_transform_sql("select * from t limit 50", limit=10, max_limit=20)
+
+    assert sql == "select * from t limit 20"
+
+
+def test_wraps_parameterized_limit():
+    """Test that a LIMIT that cannot be checked is bounded from outside."""
+    sql = validate_and_transform_sql("select * from t limit :n", params={"n": 3})
+
+    assert sql == (
+        f"SELECT * FROM (select * from t limit :n\n) AS _limited LIMIT {settings.query_max_rows}"
+    )
+
+
+def test_no_limit_when_unbounded():
+    """Test that limit=None leaves the query unbounded."""
+    assert validate_and_transform_sql("select * from t", limit=None) == "select * from t"
+
+
+@pytest.mark.parametrize(
+    ("sql", "statement_type"),
+    [
+        ("DELETE FROM t", "DELETE"),
+        ("INSERT INTO t VALUES (1)", "INSERT"),
+        ("DROP TABLE t", "DROP"),
+        ("SELECT * INTO u FROM t", "SELECT INTO"),
+        ("SELECT * FROM t FOR UPDATE", "SELECT FOR UPDATE"),
+        ("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d", "DELETE"),
+    ],
+)
+def test_rejects_non_read_only(sql, statement_type):
+    """Test that statements that write or lock are rejected."""
+    with pytest.raises(SQLValidationError) as exc_info:
+        validate_and_transform_sql(sql, database_type=DatabaseType.POSTGRESQL)
+
+    assert exc_info.value.details["statementType"] == statement_type
+
+
+def test_rejects_multiple_statements():
+    """Test that only one statement is accepted."""
+    with pytest.raises(SQLValidationError) as exc_info:
+        validate_and_transform_sql("SELECT 1; SELECT 2")
+
+    assert exc_info.value.details == {"statementCount": 2}
+
+
+def test_rejects_empty_sql():
+    """Test that empty SQL is rejected."""
+    with pytest.raises(SQLValidationError, match="Empty SQL query"):
+        validate_and_transform_sql("  ;")
+
+
+def test_rejects_syntax_error_with_position():
+    """Test that a syntax error reports where parsing failed."""
+    with pytest.raises(SQLValidationError) as exc_info:
+        validate_and_transform_sql("SELECT FROM WHERE")
+
+    assert exc_info.value.message.startswith("Failed to parse SQL")
+    assert exc_info.value.details["line"] == 1
+
+
+def test_rejects_mismatched_parameters():
+    """Test that params must name exactly the placeholders of the query."""
+    with pytest.raises(SQLValidationError) as exc_info:
+        validate_and_transform_sql("SELECT * FROM t WHERE id = :id", params={"name": "x"})
+
+    assert exc_info.value.details == {"missing": ["id"], "unexpected": ["name"]}
+
+
+@pytest.mark.parametrize(("sql", "database_type", "placeholder"), [
+    ("SELECT * FROM t WHERE id = ?", DatabaseType.SQLITE, "?"),
+    ("SELECT * FROM t WHERE id = ?", DatabaseType.MYSQL, "?"),
+    ("SELECT * FROM t WHERE id = $1", DatabaseType.POSTGRESQL, "$1"),
+])
+def test_rejects_unnamed_placeholders(sql, database_type, placeholder):
+    """Test that positional placeholders are refused instead of reported as missing."""
+    with pytest.raises(SQLValidationError) as exc_info:
+        validate_and_transform_sql(sql, database_type=database_type, params={"id": 1})
+
+    assert exc_info.value.message == "Only named bind parameters (:name) are supported"
+    assert exc_info.value.details == {"placeholders": [placeholder]}
+
+
+def test_parse_cache_hits_and_evicts():
+    """Test that repeated texts are parsed once and the least recently used is evicted."""
+    cache = SQLParseCache(max_entries=2)
+    first = cache.parse("SELECT 1", None)
+
+    assert cache.parse("SELECT 1", None) is first
+    cache.parse("SELECT 2", None)
+    cache.parse("SELECT 3", None)
+
+    assert cache.parse("SELECT 1", None) is not first
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 4, 2)
+    assert stats["entries"] == 2
+
+
+def test_parse_cache_keys_on_dialect():
+    """Test that the same text is parsed separately per dialect."""
+    cache = SQLParseCache(max_entries=10)
+
+    assert cache.parse("SELECT 1", "sqlite") is not cache.parse("SELECT 1", "postgres")
+
+
+def test_parse_cache_keeps_syntax_errors():
+    """Test that a syntax error is cached and raised again without parsing."""
+    cache = SQLParseCache(max_entries=10)
+    parsed = cache.parse("SELECT FROM WHERE", None)
+
+    assert parsed.error is not None
+    assert cache.parse("SELECT FROM WHERE", None) is parsed
+
+
+def test_cached_rejection_raises_fresh_error():
+    """Test that callers adding details do not change the cached rejection."""
+    for _ in range(2):
+        with pytest.raises(SQLValidationError) as exc_info:
+            validate_and_transform_sql("DELETE FROM t")
+        assert "extra" not in exc_info.value.details
+        exc_info.value.details["extra"] = True
+
+
+def test_fingerprint_ignores_literals():
+    """Test that queries differing only in literals share a fingerprint."""
+    first = get_sql_fingerprint("SELECT * FROM t WHERE id = 1 AND x IN (1, 2, 3)")
+    second = get_sql_fingerprint("select * from t where id=2 and x in (4)")
+
+    assert first == second == "SELECT * FROM t WHERE id = ? AND x IN (?)"
+
+
+def test_fingerprint_of_unparsable_sql():
+    """Test that SQL that cannot be parsed has no fingerprint."""
+    assert get_sql_fingerprint("SELECT FROM WHERE") is None
+
+
+def test_normalize_sql_keeps_literals():
+    """Test that normalization drops comments and spacing but not literal values."""
+    assert normalize_sql("select  *  from t -- note") == normalize_sql("SELECT * FROM t")
+    assert normalize_sql("SELECT 'a'") != normalize_sql("SELECT 'A'")
@@ -18,9 +18,9 @@ export default function MetadataTree({ metadata }: MetadataTreeProps) {
     label: (
       <div>
         <strong>{item.name}</strong>
-        {item.type === "table" && item.rowCount !== undefined && (
+        {item.type === "table" && item.rowCount != null && (
           <span style={{ marginLeft: "8px", color: "#666" }}>
-            ({item.rowCount} rows)
+            ({item.rowCountKind === "estimated" ? "~" : ""}{item.rowCount} rows)
           </span>
         )}
       </div>
@@ -4,8 +4,13 @@ import axios, { AxiosInstance, AxiosError } from "axios";
 import { DatabaseConnection, DatabaseConnectionInput } from "../types/database";
 import { DatabaseMetadataResponse } from "../types/metadata";
 import {
+  BindParams,
   QueryInput,
   QueryResult,
+  QueryPlanResult,
+  QueryJobInput,
+  QueryJobStatus,
+  QueryJobResultPage,
   QueryHistoryEntry,
   NaturalLanguageInput,
   NaturalLanguageResult,
@@ -86,6 +91,48 @@ export const queryApi = {
     return response.data;
   },
 
+  /** Get the estimated plan and guardrail warnings of a query without running it */
+  explain: async (databaseName: string, sql: string, params?: BindParams): Promise<QueryPlanResult> => {
+    const response = await apiClient.post<QueryPlanResult>(`/dbs/${databaseName}/query/explain`, { sql, params });
+    return response.data;
+  },
+
+  /** Submit a query to run in the background */
+  submitJob: async (databaseName: string, job: QueryJobInput): Promise<QueryJobStatus> => {
+    const response = await apiClient.post<QueryJobStatus>(`/dbs/${databaseName}/jobs`, job);
+    return response.data;
+  },
+
+  /** Get the status of a query job */
+  getJob: async (databaseName: string, jobId: string): Promise<QueryJobStatus> => {
+    const response = await apiClient.get<QueryJobStatus>(`/dbs/${databaseName}/jobs/${jobId}`);
+    return response.data;
+  },
+
+  /** Get a page of a finished query job's result */
+  getJobResult: async (
+    databaseName: string,
+    jobId: string,
+    offset: number = 0,
+    limit: number = 500
+  ): Promise<QueryJobResultPage> => {
+    const response = await apiClient.get<QueryJobResultPage>(
+      `/dbs/${databaseName}/jobs/${jobId}/result`,
+      { params: { offset, limit } }
+    );
+    return response.data;
+  },
+
+  /** Cancel a query job and discard its result */
+  deleteJob: async (databaseName: string, jobId: string): Promise<void> => {
+    await apiClient.delete(`/dbs/${databaseName}/jobs/${jobId}`);
+  },
+
+  /** Cancel a running query by its queryId */
+  cancel: async (databaseName: string, queryId: string): Promise<void> => {
+    await apiClient.delete(`/dbs/${databaseName}/queries/${queryId}`);
+  },
+
   /** Get query history for a database */
   getHistory: async (databaseName: string, limit: number = 50): Promise<QueryHistoryEntry[]> => {
     const response = await apiClient.get<QueryHistoryEntry[]>(
@@ -12,6 +12,29 @@ export enum ConnectionStatus {
   ERROR = "error",
 }
 
+export interface ConnectionOptions {
+  cacheTtlSeconds?: number;
+  historyKeepLast?: number;
+  historyMaxAgeDays?: number | null;
+  maxConcurrentQueries?: number;
+  maxQueuedQueries?: number;
+  statementTimeoutSeconds?: number;
+  readOnly?: boolean;
+  searchPath?: string | null;
+  applicationName?: string;
+  sqlMode?: string | null;
+  explainPolicy?: 'off' | 'warn' | 'reject' | 'job';
+  explainMaxCost?: number | null;
+  explainMaxRows?: number | null;
+  largeTableRows?: number;
+  replicaMaxLagSeconds?: number;
+}
+
+export interface ReplicaEndpoint {
+  url: string;
+  weight?: number;
+}
+
 export interface DatabaseConnection {
   name: string;
   url: string;
@@ -21,10 +44,14 @@ export interface DatabaseConnection {
   updatedAt: string;
   lastConnectedAt?: string;
   status: ConnectionStatus;
+  options?: ConnectionOptions;
+  replicas?: ReplicaEndpoint[];
 }
 
 export interface DatabaseConnectionInput {
   url: string;
   description?: string;
+  options?: ConnectionOptions;
+  replicas?: ReplicaEndpoint[];
 }
 
@@ -17,7 +17,8 @@ export interface TableMetadata {
   type: "table" | "view";
   schemaName: string;
   columns: ColumnMetadata[];
-  rowCount?: number;
+  rowCount?: number | null;
+  rowCountKind?: "estimated" | "exact" | null;
 }
 
 export interface DatabaseMetadataResponse {
@@ -4,13 +4,25 @@
 
 export type QuerySource = 'manual' | 'natural_language';
 
+export type BindParams = Record<string, string | number | boolean | null>;
+
 export interface QueryInput {
   sql: string;
+  params?: BindParams;
+  pageSize?: number;
+  continuationToken?: string | null;
+  cache?: 'bypass' | 'prefer' | 'only';
+  format?: 'rows' | 'columnar';
+  queryId?: string;
+  timeoutSeconds?: number;
 }
 
 export interface QueryColumn {
   name: string;
   dataType: string;
+  precision?: number | null;
+  scale?: number | null;
+  nullable?: boolean | null;
 }
 
 export interface QueryResult {
@@ -19,6 +31,97 @@ export interface QueryResult {
   rowCount: number;
   executionTimeMs: number;
   sql: string;
+  continuationToken?: string | null;
+  cached?: boolean;
+  cacheAgeMs?: number | null;
+  queryId?: string | null;
+  warnings?: string[] | null;
+  spilled?: boolean;
+  spillId?: string | null;
+  spillBytes?: number | null;
+  totalRows?: number | null;
+}
+
+/**
+ * One result column in columnar format: either `values`, or `dictionary`
+ * with per-row `indices`. `nullBitmap` is base64; bit i % 8 of byte
+ * i / 8 is set when row i is null.
+ */
+export interface ColumnVector {
+  values?: any[] | null;
+  dictionary?: string[] | null;
+  indices?: (number | null)[] | null;
+  nullBitmap?: string | null;
+}
+
+export interface ColumnarQueryResult {
+  format: 'columnar';
+  columns: QueryColumn[];
+  data: ColumnVector[];
+  rowCount: number;
+  executionTimeMs: number;
+  sql: string;
+  continuationToken?: string | null;
+  cached?: boolean;
+  cacheAgeMs?: number | null;
+  queryId?: string | null;
+  warnings?: string[] | null;
+  spilled?: boolean;
+  spillId?: string | null;
+  spillBytes?: number | null;
+  totalRows?: number | null;
+}
+
+export interface FullTableScan {
+  table: string;
+  rowCount: number | null;
+}
+
+export interface QueryPlanResult {
+  sql: string;
+  estimatedRows: number | null;
+  estimatedCost: number | null;
+  fullScans: FullTableScan[];
+  warnings: string[];
+  policy: 'off' | 'warn' | 'reject' | 'job';
+  plan: any;
+}
+
+export type QueryJobState = 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+
+export interface QueryJobInput {
+  sql: string;
+  params?: BindParams;
+  timeoutSeconds?: number;
+}
+
+export interface QueryJobStatus {
+  jobId: string;
+  databaseName: string;
+  sql: string;
+  params: BindParams | null;
+  status: QueryJobState;
+  createdAt: string;
+  startedAt: string | null;
+  finishedAt: string | null;
+  expiresAt: string | null;
+  columns: QueryColumn[] | null;
+  rowCount: number;
+  executionTimeMs: number | null;
+  spoolBytes: number | null;
+  error: { code: string; message: string; details?: Record<string, any> | null } | null;
+}
+
+export interface QueryJobResultPage {
+  jobId: string;
+  format: 'rows' | 'columnar';
+  columns: QueryColumn[];
+  rows?: Record<string, any>[] | null;
+  data?: ColumnVector[] | null;
+  rowCount: number;
+  totalRows: number;
+  offset: number;
+  nextOffset: number | null;
 }
 
 export interface QueryHistoryEntry {